@@ -1,61 +1,256 @@
-from flask import Flask, request, jsonify
-from werkzeug.utils import secure_filename
-import pandas as pd
-import os
-from relic.loan_model import train_and_analyze
-from config import UPLOAD_FOLDER, ALLOWED_EXTENSIONS
+from flask import Flask, request, jsonify, Response, g
+from flask.json.provider import DefaultJSONProvider
+from flask.wrappers import Request
+import io
+import time
+import functools
+import tempfile
+from relic.explanation_store import ExplanationStore
+from relic.result_cache import ResultCache, analysis_cache_key, hash_upload
+from config import (
+    UPLOAD_SPOOL_MAX_BYTES, ALLOWED_EXTENSIONS, BULK_CHUNK_SIZE, BULK_CHUNK_SIZE_MAX,
+    ANALYSIS_WORKERS, ANALYSIS_QUEUE_DEPTH, JOB_RESULT_TTL,
+    RESULT_CACHE_MAX_BYTES, RESULT_CACHE_TTL, RESULT_CACHE_DIR,
+    EXPLANATION_STORE_SIZE, PREDICT_BATCH_MAX_ITEMS, METRICS_ENABLED,
+    PROFILING_ENABLED, PROFILE_TOKEN, PROFILE_DIR, PROFILE_MAX_FILES,
+    FAIRNESS_MONITOR_ENABLED,
+)
 from flask import Flask
 from flask_cors import CORS
-from predict.predict_data import predict
+from predict.predict_data import (
+    predict, predict_file, predict_many, predict_stream, predict_rows, model_registry, fairness_monitor,
+    MODEL_TYPES,
+)
+from ingest.tabular import detect_format
+from jobs.job_queue import JobQueue, QueueFullError, run_analysis
+from telemetry import metrics
+from telemetry.profiling import RequestProfiler
 import json
 
+
+class TimedJSONProvider(DefaultJSONProvider):
+    # Every jsonify() goes through dumps(); time it as its own stage.
+    def dumps(self, obj, **kwargs):
+        with metrics.stage("json_serialization"):
+            return super().dumps(obj, **kwargs)
+
+
+class SpooledRequest(Request):
+    # Uploads stay in memory up to UPLOAD_SPOOL_MAX_BYTES (werkzeug's default is
+    # 500 KB) and only then roll over to an unnamed temporary file.
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_BYTES, mode="rb+")
+
+
 app = Flask(__name__)
+app.json = TimedJSONProvider(app)
+app.request_class = SpooledRequest
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 CORS(app, resources={r"/*": {"origins": "*"}})
 
+analysis_jobs = JobQueue(
+    max_workers=ANALYSIS_WORKERS,
+    max_queue_depth=ANALYSIS_QUEUE_DEPTH,
+    result_ttl=JOB_RESULT_TTL,
+    on_stage=metrics.observe_stage,
+)
+
+result_cache = ResultCache(
+    max_bytes=RESULT_CACHE_MAX_BYTES,
+    ttl=RESULT_CACHE_TTL,
+    disk_dir=RESULT_CACHE_DIR,
+)
+
+def build_explanations(state, include=("shap", "tree")):
+    # relic.loan_model (sklearn training, shap, matplotlib) is imported on the
+    # first analysis so prediction-only workers start without it.
+    from relic.loan_model import build_explanations
+    timer = metrics.StageTimer()
+    try:
+        return build_explanations(state, include=include, progress=timer)
+    finally:
+        timer.finish()
+
+explanation_store = ExplanationStore(
+    max_entries=EXPLANATION_STORE_SIZE,
+    builder=build_explanations,
+)
+
+request_profiler = RequestProfiler(PROFILE_DIR, max_profiles=PROFILE_MAX_FILES)
+
+SCORED_OUTPUT_MIMETYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+def route_label():
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+if METRICS_ENABLED:
+    @app.before_request
+    def start_request_metrics():
+        g.request_started = time.perf_counter()
+        if request.content_length:
+            metrics.upload_bytes.inc(request.content_length, route=route_label())
+
+    @app.after_request
+    def record_request_metrics(response):
+        route, method, status = route_label(), request.method, response.status_code
+        started = g.get("request_started", time.perf_counter())
+
+        def finished():
+            metrics.http_latency.observe(time.perf_counter() - started, route=route)
+            metrics.http_requests.inc(route=route, method=method, status=str(status))
+            if status >= 500:
+                metrics.http_errors.inc(route=route, method=method)
+
+        # Streamed bodies are produced after this hook; observe those once sent.
+        if response.is_streamed:
+            response.call_on_close(finished)
+        else:
+            finished()
+        return response
+
+def profiling_requested():
+    if not PROFILING_ENABLED:
+        return False
+    value = request.headers.get("X-Profile")
+    if not value:
+        return False
+    return PROFILE_TOKEN is None or value == PROFILE_TOKEN
+
+def profiled(view):
+    # Runs the view under cProfile + tracemalloc when the request opts in; the
+    # report id comes back in X-Profile-Id. Streamed bodies are produced after
+    # the view returns, so only the work done before streaming is profiled.
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not profiling_requested():
+            return view(*args, **kwargs)
+        rv, report = request_profiler.run(lambda: app.make_response(view(*args, **kwargs)),
+                                          label=f"{request.method} {request.path}")
+        if report is None:
+            rv.headers["X-Profile-Id"] = "busy"
+        else:
+            rv.headers["X-Profile-Id"] = report["profile_id"]
+            rv.headers["X-Profile-Url"] = f"/profiles/{report['profile_id']}"
+        return rv
+    return wrapper
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def take_upload_stream(file):
+    # Flask closes every uploaded file as soon as the view returns, which is
+    # before a streamed response has been consumed. Hand the real stream to
+    # the caller and leave an empty one behind for Flask to close.
+    stream = file.stream
+    file.stream = io.BytesIO()
+    return stream
+
+def chain_first(first, rest, upload_stream, output_format):
+    try:
+        yield first
+        yield from rest
+    except Exception as e:
+        # Headers are already sent, so the status can no longer say 500.
+        app.logger.error(f"Prediction stream error: {e}")
+        if output_format != "ndjson":
+            # CSV has no room for an error record: re-raise so the server drops
+            # the connection before the final chunk and the client sees a
+            # truncated transfer instead of a complete file.
+            raise
+        # NDJSON ends with an error record instead of the remaining rows.
+        yield json.dumps({"error": f"An error occurred during prediction: {e}"}) + "\n"
+    finally:
+        upload_stream.close()
+
 @app.route('/analyze', methods=['POST'])
+@profiled
 def analyze():
     if 'file' not in request.files:
         return jsonify({"error": "No file part in the request."}), 400
     
     file = request.files['file']
     model_type = request.form.get('model_type', 'logistic') 
+    bias_threshold = request.form.get('bias_threshold', 0.15, type=float)
+    run_async = request.form.get('async', 'false').lower() == 'true'
+    explain = request.form.get('explain', 'true').lower() == 'true'
 
     if file.filename == '':
         return jsonify({"error": "No selected file."}), 400
 
-    if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+    if not (file and allowed_file(file.filename)):
+        return jsonify({"error": "File type not allowed."}), 400
+
+    file_format = detect_format(file.filename, file.stream)
+    analysis_id = analysis_cache_key(hash_upload(file.stream), model_type, bias_threshold)
+    # Results without images are cached separately from full ones.
+    cache_key = analysis_id if explain else f"{analysis_id}:lite"
+
+    cached = result_cache.get(cache_key)
+    # A lite result is only useful while its fitted model is still around.
+    if cached is not None and (explain or analysis_id in explanation_store):
+        return jsonify({**cached, "cache_hit": True}), 200
 
+    def publish(output):
+        results, explain_state = output
+        if isinstance(results, dict) and "error" in results:
+            return results
+        if explain_state is not None:
+            explanation_store.put(analysis_id, explain_state)
+            results = {
+                **results,
+                "analysis_id": analysis_id,
+                "explanations_url": f"/analyze/{analysis_id}/explanations",
+            }
+        result_cache.put(cache_key, results)
+        return results
+
+    if run_async:
         try:
-            df = pd.read_csv(filepath)
-            
-            results = train_and_analyze(df, model_type=model_type)
-
-            os.remove(filepath) 
-            
-            if isinstance(results, dict) and "error" in results:
-                return jsonify(results), 500
+            job_id = analysis_jobs.submit(
+                run_analysis, file.read(), model_type,
+                bias_threshold=bias_threshold,
+                explain=explain,
+                file_format=file_format,
+                on_result=publish,
+            )
+        except QueueFullError as e:
+            return jsonify({"error": str(e)}), 503
+        return jsonify({
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": f"/jobs/{job_id}",
+            "cache_hit": False,
+        }), 202
+
+    try:
+        from relic.loan_model import fit_and_analyze, read_dataset
+
+        with metrics.stage("parsing"):
+            df = read_dataset(file.stream, file_format)
         
-            return jsonify(results), 200
+        timer = metrics.StageTimer()
+        try:
+            results, explain_state = fit_and_analyze(df, model_type=model_type, bias_threshold=bias_threshold,
+                                                     progress=timer, explain=explain)
+        finally:
+            timer.finish()
 
-        except Exception as e:
-            if os.path.exists(filepath):
-                os.remove(filepath)
-            app.logger.error(f"Analysis error: {e}")
-            return jsonify({"error": f"An error occurred during analysis: {e}"}), 500
+        results = publish((results, None if explain else explain_state))
+        if isinstance(results, dict) and "error" in results:
+            return jsonify(results), 500
 
-    else:
-        return jsonify({"error": "File type not allowed."}), 400
+        return jsonify({**results, "cache_hit": False}), 200
+
+    except Exception as e:
+        app.logger.error(f"Analysis error: {e}")
+        return jsonify({"error": f"An error occurred during analysis: {e}"}), 500
     
 
 @app.route('/predict-bulk', methods=['POST'])
+@profiled
 def predict_bulk():
     if 'file' not in request.files:
         return jsonify({"error": "No file part in the request."}), 400
@@ -63,15 +258,52 @@ def predict_bulk():
     file = request.files['file']
     model_type = request.form.get('model_type', 'logistic_regression') 
     bias_flag = request.form.get('bias_flag', 'false').lower() == 'true'
+    stream = request.form.get('stream', 'false').lower() == 'true'
+    chunk_size = request.form.get('chunk_size', BULK_CHUNK_SIZE, type=int)
+    output_format = request.form.get('output', '').lower()
+    id_column = request.form.get('id_column')
 
     if file.filename == '':
         return jsonify({"error": "No selected file."}), 400
 
+    if output_format and output_format not in SCORED_OUTPUT_MIMETYPES:
+        return jsonify({"error": f"Unsupported output format: {output_format}"}), 400
+
+    if model_type not in MODEL_TYPES:
+        return jsonify({"error": f"Unknown model_type: {model_type!r}; expected one of {list(MODEL_TYPES)}."}), 400
+
+    if chunk_size is None or not 1 <= chunk_size <= BULK_CHUNK_SIZE_MAX:
+        return jsonify({"error": f"chunk_size must be an integer between 1 and {BULK_CHUNK_SIZE_MAX}."}), 400
+
     if file and allowed_file(file.filename):
         try:
-            df = pd.read_csv(file)
+            file_format = detect_format(file.filename, file.stream)
+            if output_format:
+                upload_stream = take_upload_stream(file)
+                rows = predict_rows(upload_stream, model_type=model_type, bias_flag=bias_flag,
+                                    output_format=output_format, id_column=id_column,
+                                    chunk_size=chunk_size, file_format=file_format)
+                # Score the first chunk before committing to a 200 so bad
+                # uploads (missing columns, unknown id column) still get a JSON error.
+                try:
+                    first = next(rows, "")
+                except ValueError as e:
+                    upload_stream.close()
+                    return jsonify({"error": str(e)}), 400
+                except Exception:
+                    upload_stream.close()
+                    raise
+                return Response(
+                    chain_first(first, rows, upload_stream, output_format),
+                    mimetype=SCORED_OUTPUT_MIMETYPES[output_format]
+                )
+
+            if stream:
+                result = predict_stream(file.stream, model_type=model_type, bias_flag=bias_flag,
+                                        chunk_size=chunk_size, file_format=file_format)
+                return jsonify(result), 200
 
-            result = predict(df, model_type=model_type, bias_flag=bias_flag)
+            result = predict_file(file.stream, model_type=model_type, bias_flag=bias_flag, file_format=file_format)
             return jsonify(result), 200
 
         except Exception as e:
@@ -92,6 +324,9 @@ def predict_single():
     if not applicant_data:
         return jsonify({"error": "No applicant data provided."}), 400
 
+    if model_type not in MODEL_TYPES:
+        return jsonify({"error": f"Unknown model_type: {model_type!r}; expected one of {list(MODEL_TYPES)}."}), 400
+
     try:
         result = predict(applicant_data, model_type=model_type, bias_flag=bias_flag)
         return jsonify(result), 200
@@ -99,6 +334,119 @@ def predict_single():
         app.logger.error(f"Prediction error: {e}")
         return jsonify({"error": f"An error occurred during prediction: {e}"}), 500
 
+
+@app.route('/predict-batch', methods=['POST'])
+def predict_batch():
+    data = request.get_json(silent=True)
+    if isinstance(data, dict) and 'applicants' in data:
+        options, applicants = data, data['applicants']
+    elif isinstance(data, (list, dict)):
+        # A bare applicants list or columnar object; options come from the query string.
+        options, applicants = request.args, data
+    else:
+        return jsonify({"error": "Request body must be a JSON array or object of applicants."}), 400
+
+    model_type = options.get('model_type', 'logistic_regression')
+    bias_flag = str(options.get('bias_flag', 'false')).lower() == 'true'
+
+    if model_type not in MODEL_TYPES:
+        return jsonify({"error": f"Unknown model_type: {model_type!r}; expected one of {list(MODEL_TYPES)}."}), 400
+
+    if not applicants:
+        return jsonify({"error": "No applicants provided."}), 400
+
+    try:
+        result = predict_many(applicants, model_type=model_type, bias_flag=bias_flag,
+                              max_items=PREDICT_BATCH_MAX_ITEMS)
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Batch prediction error: {e}")
+        return jsonify({"error": f"An error occurred during prediction: {e}"}), 500
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id."}), 404
+    return jsonify(job), 200
+
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    status = analysis_jobs.cancel(job_id)
+    if status is None:
+        return jsonify({"error": "Unknown job id."}), 404
+    return jsonify({"job_id": job_id, "status": status}), 200
+
+
+@app.route('/jobs', methods=['GET'])
+def job_stats():
+    return jsonify(analysis_jobs.stats()), 200
+
+
+@app.route('/analyze/<analysis_id>/explanations', methods=['GET'])
+def analysis_explanations(analysis_id):
+    include = [name.strip() for name in request.args.get('include', 'shap,tree').split(',') if name.strip()]
+    unknown = [name for name in include if name not in ("shap", "tree")]
+    if unknown:
+        return jsonify({"error": f"Unknown explanation artifacts: {unknown}"}), 400
+
+    try:
+        artifacts = explanation_store.get_artifacts(analysis_id, include=include)
+    except Exception as e:
+        app.logger.error(f"Explanation error: {e}")
+        return jsonify({"error": f"An error occurred while building explanations: {e}"}), 500
+
+    if artifacts is None:
+        return jsonify({"error": "Unknown or expired analysis id; run /analyze with explain=false again."}), 404
+    return jsonify({"analysis_id": analysis_id, **artifacts}), 200
+
+
+@app.route('/analyze/cache', methods=['GET'])
+def result_cache_stats():
+    return jsonify(result_cache.stats()), 200
+
+
+@app.route('/model-registry', methods=['GET'])
+def model_registry_stats():
+    return jsonify(model_registry.stats()), 200
+
+@app.route('/fairness/live', methods=['GET'])
+def live_fairness():
+    if not FAIRNESS_MONITOR_ENABLED:
+        return jsonify({"error": "Fairness monitoring is disabled."}), 404
+    windows = request.args.get('windows', type=int)
+    report = fairness_monitor.report(windows=windows)
+    model = request.args.get('model')
+    if model:
+        report["models"] = {k: v for k, v in report["models"].items() if k == model}
+    return jsonify(report), 200
+
+@app.route('/profiles', methods=['GET'])
+def list_profiles():
+    if not profiling_requested():
+        return jsonify({"error": "Profiling is disabled."}), 404
+    return jsonify({"profiles": request_profiler.list()}), 200
+
+
+@app.route('/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    if not profiling_requested():
+        return jsonify({"error": "Profiling is disabled."}), 404
+    report = request_profiler.get(profile_id)
+    if report is None:
+        return jsonify({"error": "Unknown profile id."}), 404
+    return jsonify(report), 200
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    if not METRICS_ENABLED:
+        return jsonify({"error": "Metrics are disabled."}), 404
+    return Response(metrics.registry.render(), mimetype="text/plain; version=0.0.4")
+
 if __name__ == '__main__':
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
     app.run(debug=True)
\ No newline at end of file
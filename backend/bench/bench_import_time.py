@@ -0,0 +1,88 @@
+"""
+Startup budget: import time and memory of the app module in a fresh interpreter.
+
+Runs `python -X importtime -c "import app"` (best of --repeat), prints the
+slowest imports by cumulative time, and fails (exit 1) when the import takes
+longer than --budget-ms or pulls in any of the analysis-only packages, which
+must stay lazy so prediction workers start fast.
+
+Run from backend/:
+    python -m bench.bench_import_time [--module app] [--budget-ms 1500] [--top 15]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only /analyze needs these; importing the app must not.
+LAZY_MODULES = ("shap", "matplotlib", "fairlearn", "sklearn", "scipy")
+
+PROBE = """
+import json, resource, sys
+import {module}
+print(json.dumps({{
+    "loaded": [m for m in {lazy!r} if m in sys.modules],
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}}))
+"""
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # header line
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(module):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module, lazy=LAZY_MODULES)],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+    rows = parse_importtime(proc.stderr)
+    total_us = next(cum for name, _, cum in rows if name == module)
+    return {"total_us": total_us, "rows": rows, **json.loads(proc.stdout.strip().splitlines()[-1])}
+
+
+def run(module, budget_ms, top, repeat):
+    best = min((measure(module) for _ in range(repeat)), key=lambda r: r["total_us"])
+
+    print(f"import {module}: {best['total_us'] / 1000:.0f} ms (budget {budget_ms:.0f} ms), "
+          f"max RSS {best['max_rss_kb'] / 1024:.0f} MB")
+    # Top-level packages only, so nested imports are not counted twice.
+    top_level = {}
+    for name, _, cumulative in best["rows"]:
+        root = name.split(".")[0]
+        top_level[root] = max(top_level.get(root, 0), cumulative)
+    for name, cumulative in sorted(top_level.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"  {name:<32} {cumulative / 1000:8.1f} ms")
+
+    failures = []
+    if best["total_us"] / 1000 > budget_ms:
+        failures.append(f"import time {best['total_us'] / 1000:.0f} ms exceeds the {budget_ms:.0f} ms budget")
+    if best["loaded"]:
+        failures.append(f"analysis-only packages imported at startup: {best['loaded']}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return not failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    raise SystemExit(0 if run(args.module, args.budget_ms, args.top, args.repeat) else 1)
@@ -0,0 +1,113 @@
+"""
+Ingestion benchmark: parse time and peak memory of the old full pd.read_csv
+path against ingest.tabular (projected columns, declared dtypes) on
+synthetic files.
+
+For each schema a CSV and a Parquet file of --rows rows are generated with
+bench.synthetic_data (kept in --data-dir and reused). Every case runs in a
+fresh interpreter; peak memory is the growth of max RSS over the read.
+
+  german_credit   columns a biased logistic_regression upload needs (predict path)
+  loan_approval   columns train_fair reads (training path)
+
+Cases:
+  pandas_full         pd.read_csv, every column, inferred dtypes (the old path)
+  pandas_projected    ingest with CSV_ENGINE=pandas
+  arrow_projected     ingest, Arrow CSV reader
+  parquet_projected   ingest on the Parquet copy
+
+Run from backend/:
+    python -m bench.bench_ingest --rows 2000000 --output ingest_results.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from bench.bench_suite import metric
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCHEMAS = ("german_credit", "loan_approval")
+CASES = ("pandas_full", "pandas_projected", "arrow_projected", "parquet_projected")
+
+PROBE = """
+import json, os, resource, sys, time
+os.environ["CSV_ENGINE"] = {engine!r}
+import pandas as pd
+from ingest import tabular
+
+def spec():
+    if {schema!r} == "german_credit":
+        from predict.predict_data import load_model_bundle, upload_columns
+        return upload_columns(load_model_bundle("logistic_regression", bias_flag=True))
+    sys.path.insert(0, "train")
+    from train.train_fair import COLUMN_MAP, COLUMN_DTYPES
+    return tabular.column_spec(COLUMN_MAP, COLUMN_DTYPES)
+
+columns, dtypes = spec()
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t0 = time.perf_counter()
+if {case!r} == "pandas_full":
+    df = pd.read_csv({path!r})
+else:
+    df = tabular.read_table({path!r}, tabular.detect_format({path!r}), columns, dtypes)
+seconds = time.perf_counter() - t0
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": seconds, "peak_kb": after - before, "rows": len(df), "columns": df.shape[1]}}))
+"""
+
+
+def dataset_paths(schema, rows, data_dir):
+    from bench.synthetic_data import write_dataset
+    os.makedirs(data_dir, exist_ok=True)
+    paths = {}
+    for ext in ("csv", "parquet"):
+        path = os.path.join(data_dir, f"{schema}_{rows}.{ext}")
+        if not os.path.exists(path):
+            print(f"generating {path}")
+            write_dataset(schema, path, rows)
+        paths[ext] = path
+    return paths
+
+
+def run_case(schema, case, paths):
+    path = paths["parquet" if case == "parquet_projected" else "csv"]
+    engine = "pandas" if case == "pandas_projected" else "arrow"
+    proc = subprocess.run(
+        [sys.executable, "-c", PROBE.format(schema=schema, case=case, path=path, engine=engine)],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{schema}/{case} failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run(args):
+    results = {}
+    for schema in args.schemas:
+        paths = dataset_paths(schema, args.rows, args.data_dir)
+        for case in args.cases:
+            best = min((run_case(schema, case, paths) for _ in range(args.repeat)), key=lambda r: r["seconds"])
+            results[f"ingest/{schema}/{case}/seconds"] = metric(best["seconds"], "s")
+            results[f"ingest/{schema}/{case}/peak_mb"] = metric(best["peak_kb"] / 1024, "MB")
+            print(f"{schema:<14} {case:<18} {best['seconds']:8.3f} s  {best['peak_kb'] / 1024:8.1f} MB  "
+                  f"{best['rows']:,} rows x {best['columns']} cols")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": {"rows": args.rows, "repeat": args.repeat}, "results": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--schemas", nargs="+", default=list(SCHEMAS), choices=SCHEMAS)
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=CASES)
+    parser.add_argument("--data-dir", default=tempfile.gettempdir())
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", help="write results JSON here")
+    run(parser.parse_args())
@@ -0,0 +1,118 @@
+"""
+Benchmark: legacy prepare_input vs the precompiled InputAdapter.
+
+Run from backend/:
+    python -m bench.bench_prepare_input [--rows 100000 1000000] [--repeat 3]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from predict.input_adapter import build_input_adapter
+from predict.predict_data import load_model_bundle
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "train", "datasets")
+
+CASES = {
+    "fair": (False, "loan_approval_dataset.csv"),
+    "biased": (True, "german_credit_data.csv"),
+}
+
+
+def legacy_prepare_input(df, feature_order, column_mappings=None, value_mappings=None):
+    # Verbatim copy of predict_data.prepare_input before the InputAdapter.
+    df = df.copy()
+
+    df.columns = [c.lower().strip() for c in df.columns]
+
+    if column_mappings:
+        normalized_map = {k.lower().strip(): v.lower().strip()
+                          for k, v in column_mappings.items()}
+        df = df.rename(columns=normalized_map)
+
+    if value_mappings:
+        for col, mapping in value_mappings.items():
+            if col in df.columns:
+                df[col] = (
+                    df[col]
+                    .astype(str)
+                    .str.lower()
+                    .str.strip()
+                    .map(mapping)
+                    .fillna(-1)
+                    .astype(int)
+                )
+
+    missing = [c for c in feature_order if c not in df.columns]
+    if missing:
+        raise KeyError(f"Missing after mapping: {missing}")
+
+    X = df[feature_order].copy()
+
+    for col in X.columns:
+        X[col] = pd.to_numeric(X[col], errors="coerce").fillna(-1)
+
+    return X
+
+
+def legacy_args(adapter):
+    """
+    legacy_prepare_input arguments covering what it handled: the input
+    features (derived ones did not exist yet) and the normalized value
+    mapping keys the adapter compares against.
+    """
+    return adapter.input_features, adapter.column_mappings, adapter.value_mappings
+
+
+def upsample(df, rows, seed=0):
+    idx = np.random.default_rng(seed).integers(0, len(df), size=rows)
+    return df.iloc[idx].reset_index(drop=True)
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(rows_list, repeat):
+    results = []
+    for name, (bias_flag, csv_name) in CASES.items():
+        bundle = load_model_bundle("logistic_regression", bias_flag=bias_flag)
+        adapter = build_input_adapter(bundle)
+        args = legacy_args(adapter)
+        base = pd.read_csv(os.path.join(DATASETS_DIR, csv_name))
+
+        for rows in rows_list:
+            df = upsample(base, rows)
+
+            expected = legacy_prepare_input(df, *args).to_numpy(dtype=np.float64)
+            if not np.array_equal(adapter.transform(df)[:, adapter.input_index], expected):
+                raise AssertionError(f"{name}: adapter output differs from legacy prepare_input")
+
+            legacy = best_of(lambda: legacy_prepare_input(df, *args), repeat)
+            compiled = best_of(lambda: adapter.transform(df), repeat)
+            results.append({
+                "case": name,
+                "rows": rows,
+                "legacy_s": legacy,
+                "adapter_s": compiled,
+                "speedup": legacy / compiled,
+            })
+            print(f"{name:>6} {rows:>9,} rows  legacy {legacy * 1000:9.1f} ms  "
+                  f"adapter {compiled * 1000:9.1f} ms  x{legacy / compiled:5.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
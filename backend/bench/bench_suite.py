@@ -0,0 +1,270 @@
+"""
+Benchmark suite for the prediction, training and analysis hot paths.
+
+Cases:
+  predict_single/<variant>          per-call latency (p50 / p95, microseconds) and the p50
+                                    overhead of the live fairness monitor
+  predict_bulk/<variant>/<rows>     predict_bulk throughput (rows per second)
+                                    on the bundled dataset resampled to 1k / 100k / 1M rows
+  train/<variant>                   train_and_save_model wall time, into a temp dir
+  analyze/<model_type>/<stage>      train_and_analyze time per progress stage
+                                    (preprocessing, training, fairness, bootstrap, shap,
+                                    plot_render) and total
+
+Timings are the best of --repeat runs. Results are written as JSON
+(--output) with the machine they were taken on under "meta"; with
+--baseline, every metric is compared against a previous results file and
+changes worse than --threshold (a fraction, 0.2 = 20%) are flagged as
+regressions and the run exits with status 1.
+
+bench/baseline.json is the committed reference run; its "meta" says which
+machine it came from, and timings only compare on similar hardware. After
+an intended performance change, or to get a baseline for your own machine,
+regenerate it with the default arguments and commit it with the change:
+    python -m bench.bench_suite --output bench/baseline.json --notes "<what changed>"
+
+Run from backend/:
+    python -m bench.bench_suite --baseline bench/baseline.json --threshold 0.2
+    python -m bench.bench_suite --output bench_results.json
+    python -m bench.bench_suite --only predict_bulk --rows 1000 100000
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from predict import predict_data
+from predict.predict_data import load_model_bundle, predict_bulk, predict_single
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "train", "datasets")
+
+VARIANTS = {
+    "fair": (False, "loan_approval_dataset.csv"),
+    "biased": (True, "german_credit_data.csv"),
+}
+
+ANALYZE_STAGES = ("preprocessing", "training", "fairness", "bootstrap", "shap", "plot_render")
+
+CASES = ("predict_single", "predict_bulk", "train", "analyze")
+
+
+def read_dataset(filename):
+    return pd.read_csv(os.path.join(DATASETS_DIR, filename))
+
+
+def resample(df, rows, seed=0):
+    idx = np.random.default_rng(seed).integers(0, len(df), rows)
+    return df.iloc[idx].reset_index(drop=True)
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def metric(value, unit, higher_is_better=False):
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+def cpu_model():
+    """CPU model name (from /proc/cpuinfo on Linux), else whatever platform reports."""
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or None
+
+
+# -------------------------
+# Cases
+# -------------------------
+
+def bench_predict_single(calls):
+    results = {}
+    for variant, (bias_flag, filename) in VARIANTS.items():
+        bundle = load_model_bundle("logistic_regression", bias_flag=bias_flag)
+        adapter = bundle["input_adapter"]
+        # Applicants send the raw features; derived ones are computed per call.
+        features = adapter.to_frame(read_dataset(filename))[adapter.input_features]
+        payloads = features.head(calls).to_dict(orient="records")
+        payloads = (payloads * (calls // len(payloads) + 1))[:calls]
+
+        for payload in payloads[:50]:  # warm-up
+            predict_single(payload, bundle)
+        latencies = single_latencies(payloads, bundle)
+        results[f"predict_single/{variant}/p50"] = metric(float(np.percentile(latencies, 50)), "us")
+        results[f"predict_single/{variant}/p95"] = metric(float(np.percentile(latencies, 95)), "us")
+
+        # What the live fairness monitor adds to each call.
+        monitored = predict_data.FAIRNESS_MONITOR_ENABLED
+        predict_data.FAIRNESS_MONITOR_ENABLED = not monitored
+        try:
+            toggled = single_latencies(payloads, bundle)
+        finally:
+            predict_data.FAIRNESS_MONITOR_ENABLED = monitored
+        on, off = (latencies, toggled) if monitored else (toggled, latencies)
+        overhead = float(np.percentile(on, 50) - np.percentile(off, 50))
+        results[f"predict_single/{variant}/monitor_overhead_p50"] = metric(overhead, "us")
+    return results
+
+
+def single_latencies(payloads, bundle):
+    """Per-call predict_single latency in microseconds."""
+    latencies = []
+    for payload in payloads:
+        t0 = time.perf_counter()
+        predict_single(payload, bundle)
+        latencies.append(time.perf_counter() - t0)
+    return np.array(latencies) * 1e6
+
+
+def bench_predict_bulk(row_counts, repeat):
+    results = {}
+    for variant, (bias_flag, filename) in VARIANTS.items():
+        bundle = load_model_bundle("logistic_regression", bias_flag=bias_flag)
+        base = read_dataset(filename)
+        for rows in row_counts:
+            df = resample(base, rows)
+            seconds = best_of(lambda: predict_bulk(df, bundle), repeat)
+            results[f"predict_bulk/{variant}/{rows}"] = metric(rows / seconds, "rows/s", higher_is_better=True)
+    return results
+
+
+def bench_train(repeat):
+    # Imported here: the training scripts pull in imblearn and fairlearn.
+    from train import train_biased, train_fair
+    scripts = {"fair": train_fair, "biased": train_biased}
+
+    results = {}
+    for variant, (_, filename) in VARIANTS.items():
+        csv_path = os.path.join(DATASETS_DIR, filename)
+
+        def run():
+            with tempfile.TemporaryDirectory() as out_dir, contextlib.redirect_stdout(io.StringIO()):
+                scripts[variant].train_and_save_model(csv_path, out_dir=out_dir)
+
+        results[f"train/{variant}"] = metric(best_of(run, repeat), "s")
+    return results
+
+
+def bench_analyze(repeat):
+    from relic.loan_model import train_and_analyze
+
+    df = read_dataset(VARIANTS["biased"][1])
+    results = {}
+    for model_type in ("logistic", "tree"):
+        best = {}
+        for _ in range(repeat):
+            marks = []
+            t0 = time.perf_counter()
+            train_and_analyze(df, model_type, progress=lambda stage: marks.append((stage, time.perf_counter())))
+            end = time.perf_counter()
+
+            # Each stage runs from its own progress report to the next one.
+            timings = {"total": end - t0}
+            for (stage, start), (_, stop) in zip(marks, marks[1:] + [(None, end)]):
+                timings[stage] = stop - start
+            for name, seconds in timings.items():
+                best[name] = min(best.get(name, float("inf")), seconds)
+
+        for name in (*ANALYZE_STAGES, "total"):
+            if name in best:
+                results[f"analyze/{model_type}/{name}"] = metric(best[name], "s")
+    return results
+
+
+# -------------------------
+# Baseline comparison
+# -------------------------
+
+def compare(results, baseline, threshold):
+    """[(name, old, new, change, regressed)] for metrics present in both runs."""
+    rows = []
+    for name, new in results.items():
+        old = baseline.get(name)
+        if old is None or not old["value"]:
+            continue
+        change = (new["value"] - old["value"]) / old["value"]
+        worse = -change if new["higher_is_better"] else change
+        rows.append((name, old["value"], new["value"], change, worse > threshold))
+    return rows
+
+
+def run(args):
+    cases = args.only or CASES
+    results = {}
+    if "predict_single" in cases:
+        results.update(bench_predict_single(args.single_calls))
+    if "predict_bulk" in cases:
+        results.update(bench_predict_bulk(args.rows, args.repeat))
+    if "train" in cases:
+        results.update(bench_train(args.repeat))
+    if "analyze" in cases:
+        results.update(bench_analyze(args.repeat))
+
+    for name, m in results.items():
+        print(f"{name:<40} {m['value']:>14,.3f} {m['unit']}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "processor": cpu_model(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "repeat": args.repeat,
+            "notes": args.notes,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if not args.baseline:
+        return True
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+
+    regressions = 0
+    print(f"\nvs baseline {args.baseline} (threshold {args.threshold:.0%}):")
+    for name, old, new, change, regressed in compare(results, baseline, args.threshold):
+        regressions += regressed
+        print(f"{name:<40} {old:>14,.3f} -> {new:>14,.3f}  {change:+7.1%}"
+              f"{'  REGRESSION' if regressed else ''}")
+    print(f"{regressions} regression(s)")
+    return regressions == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", nargs="+", choices=CASES)
+    parser.add_argument("--rows", nargs="+", type=int, default=[1000, 100000, 1000000])
+    parser.add_argument("--single-calls", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--notes", help="free text stored in the results' meta (machine, load, purpose)")
+    args = parser.parse_args()
+    raise SystemExit(0 if run(args) else 1)
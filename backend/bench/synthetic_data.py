@@ -0,0 +1,311 @@
+"""
+Synthetic datasets with the schema of the bundled german-credit and
+loan-approval CSVs, at any size.
+
+The bundled file is profiled once: the label rate, and per label class the
+level frequencies of every categorical column (strings, plus integer columns
+with few distinct values) and a quantile grid of every numeric column.
+Rows are then drawn label first, every other column conditionally on the
+label. Marginals and each column's association with the label follow the
+source; correlations between feature columns are not modelled.
+
+Group bias: with --group-rates the label is instead drawn from a fixed
+positive rate per level of --group-column (e.g. Sex female=0.4,male=0.8),
+the group itself from its source marginal. The ground-truth selection rate
+of every group, and so the expected demographic parity difference, is then
+known exactly; it is written next to the output as <output>.meta.json.
+
+Rows are generated and appended chunk by chunk, so the output can be larger
+than memory. Chunk i is drawn from SeedSequence([seed, i]); the same seed
+and chunk size always give the same file.
+
+Run from backend/:
+    python -m bench.synthetic_data german_credit 1000000 /tmp/german_1m.csv
+    python -m bench.synthetic_data loan_approval 5000000 /tmp/loans.parquet --seed 7
+    python -m bench.synthetic_data german_credit 100000 /tmp/biased.csv --group-rates female=0.4,male=0.8
+"""
+import argparse
+import contextlib
+import json
+import math
+import os
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "train", "datasets")
+
+SCHEMAS = {
+    "german_credit": {
+        "file": "german_credit_data.csv",
+        "label": "Risk",
+        "positive": "good",
+        "id_column": "Unnamed: 0",
+        "group_column": "Sex",
+    },
+    "loan_approval": {
+        "file": "loan_approval_dataset.csv",
+        "label": " loan_status",
+        "positive": " Approved",
+        "id_column": "loan_id",
+        "group_column": " self_employed",
+    },
+}
+
+# integer columns with at most this many distinct values are sampled as levels
+MAX_INT_LEVELS = 12
+
+QUANTILE_GRID = np.linspace(0.0, 1.0, 201)
+
+CHUNK_ROWS = 100_000
+
+
+# -------------------------
+# Profiling
+# -------------------------
+
+def _level_probs(series):
+    counts = series.value_counts(dropna=False)
+    return {
+        "levels": [None if pd.isna(v) else (v.item() if hasattr(v, "item") else v) for v in counts.index],
+        "probs": (counts / counts.sum()).to_numpy().tolist(),
+    }
+
+
+def _value_step(values):
+    """Largest integer step every value is a multiple of (e.g. 100000 for income_annum)."""
+    values = np.unique(np.abs(values.astype(np.int64)))
+    values = values[values > 0]
+    return int(reduce(math.gcd, values.tolist(), 0)) or 1
+
+
+def profile_dataset(df, label, positive, id_column=None):
+    """Per-column sampling parameters, conditional on the label, for generate_chunk()."""
+    y = df[label] == positive
+    columns = []
+    for name in df.columns:
+        col = df[name]
+        if name == id_column:
+            columns.append({"name": name, "kind": "id", "start": int(col.min())})
+        elif name == label:
+            negatives = df.loc[~y, label]
+            columns.append({
+                "name": name, "kind": "label", "positive": positive,
+                "negative": negatives.iloc[0] if len(negatives) else f"not {positive}",
+                "positive_rate": float(y.mean()),
+            })
+        elif pd.api.types.is_numeric_dtype(col) and col.nunique() > MAX_INT_LEVELS:
+            is_int = pd.api.types.is_integer_dtype(col)
+            columns.append({
+                "name": name, "kind": "numeric", "integer": bool(is_int),
+                "step": _value_step(col.dropna().to_numpy()) if is_int else None,
+                "quantiles": {
+                    cls: np.quantile(col[mask].dropna(), QUANTILE_GRID).tolist()
+                    for cls, mask in (("positive", y), ("negative", ~y))
+                },
+            })
+        else:
+            columns.append({
+                "name": name, "kind": "categorical",
+                "integer": bool(pd.api.types.is_integer_dtype(col)),
+                "overall": _level_probs(col),
+                "by_label": {
+                    cls: _level_probs(col[mask])
+                    for cls, mask in (("positive", y), ("negative", ~y))
+                },
+            })
+    return {"columns": columns}
+
+
+def load_profile(schema):
+    spec = SCHEMAS[schema]
+    df = pd.read_csv(os.path.join(DATASETS_DIR, spec["file"]))
+    return profile_dataset(df, spec["label"], spec["positive"], spec["id_column"])
+
+
+def group_positive_rates(profile, group_column):
+    """P(label positive | group) in the source data, from the profiled frequencies."""
+    label = next(c for c in profile["columns"] if c["kind"] == "label")
+    group = next(c for c in profile["columns"] if c["name"] == group_column)
+    p = label["positive_rate"]
+
+    def level_prob(dist, level):
+        return dict(zip(map(str, dist["levels"]), dist["probs"])).get(str(level), 0.0)
+
+    rates = {}
+    for level, prob in zip(group["overall"]["levels"], group["overall"]["probs"]):
+        rates[level] = level_prob(group["by_label"]["positive"], level) * p / prob if prob else 0.0
+    return rates
+
+
+# -------------------------
+# Generation
+# -------------------------
+
+def _level_array(dist, integer):
+    if integer:
+        return np.asarray(dist["levels"], dtype=np.int64)
+    return np.array([np.nan if v is None else v for v in dist["levels"]], dtype=object)
+
+
+def _sample_levels(dist, n, rng, integer):
+    idx = rng.choice(len(dist["levels"]), size=n, p=dist["probs"])
+    return _level_array(dist, integer)[idx]
+
+
+def _sample_numeric(column, cls, n, rng):
+    values = np.interp(rng.random(n), QUANTILE_GRID, column["quantiles"][cls])
+    if not column["integer"]:
+        return values
+    step = column["step"]
+    return (np.rint(values / step) * step).astype(np.int64)
+
+
+def generate_chunk(profile, n, rng, first_row=0, group_column=None, group_rates=None):
+    """
+    n synthetic rows as a DataFrame with the profiled columns in source order.
+    group_rates (level -> positive rate) switches on group bias for group_column.
+    """
+    columns = profile["columns"]
+    label = next(c for c in columns if c["kind"] == "label")
+
+    out = {}
+    if group_rates:
+        group = next(c for c in columns if c["name"] == group_column)
+        dist = group["overall"]
+        idx = rng.choice(len(dist["levels"]), size=n, p=dist["probs"])
+        out[group_column] = _level_array(dist, group["integer"])[idx]
+        rates = {**group_positive_rates(profile, group_column), **group_rates}
+        level_rates = np.array([rates[level] for level in dist["levels"]], dtype=float)
+        positive = rng.random(n) < level_rates[idx]
+    else:
+        positive = rng.random(n) < label["positive_rate"]
+
+    n_pos = int(positive.sum())
+    for column in columns:
+        name, kind = column["name"], column["kind"]
+        if name in out:
+            continue
+        if kind == "id":
+            out[name] = np.arange(first_row, first_row + n, dtype=np.int64) + column["start"]
+        elif kind == "label":
+            out[name] = np.where(positive, column["positive"], column["negative"]).astype(object)
+        else:
+            if kind == "numeric":
+                pos = _sample_numeric(column, "positive", n_pos, rng)
+                neg = _sample_numeric(column, "negative", n - n_pos, rng)
+            else:
+                pos = _sample_levels(column["by_label"]["positive"], n_pos, rng, column["integer"])
+                neg = _sample_levels(column["by_label"]["negative"], n - n_pos, rng, column["integer"])
+            values = np.empty(n, dtype=pos.dtype if pos.dtype == neg.dtype else object)
+            values[positive] = pos
+            values[~positive] = neg
+            out[name] = values
+
+    return pd.DataFrame({c["name"]: out[c["name"]] for c in columns})
+
+
+def _arrow_schema(profile):
+    import pyarrow as pa
+    fields = []
+    for column in profile["columns"]:
+        if column["kind"] == "id" or column.get("integer"):
+            dtype = pa.int64()
+        elif column["kind"] == "numeric":
+            dtype = pa.float64()
+        else:
+            dtype = pa.string()
+        fields.append(pa.field(column["name"], dtype))
+    return pa.schema(fields)
+
+
+def write_dataset(schema, path, rows, seed=0, chunk_rows=CHUNK_ROWS,
+                  group_column=None, group_rates=None, file_format=None):
+    """
+    Streams `rows` synthetic rows of `schema` to path (CSV, or Parquet when the
+    path ends in .parquet or file_format="parquet") and writes <path>.meta.json.
+    Returns the metadata dict.
+    """
+    profile = load_profile(schema)
+    group_column = group_column or SCHEMAS[schema]["group_column"]
+    file_format = file_format or ("parquet" if path.endswith(".parquet") else "csv")
+
+    writer = None
+    if file_format == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        arrow_schema = _arrow_schema(profile)
+        writer = pq.ParquetWriter(path, arrow_schema)
+
+    try:
+        with (open(path, "w", encoding="utf-8", newline="") if writer is None else contextlib.nullcontext()) as f:
+            for i, start in enumerate(range(0, rows, chunk_rows)):
+                rng = np.random.default_rng(np.random.SeedSequence([seed, i]))
+                chunk = generate_chunk(profile, min(chunk_rows, rows - start), rng, first_row=start,
+                                       group_column=group_column, group_rates=group_rates)
+                if writer is None:
+                    chunk.to_csv(f, header=(i == 0), index=False, na_rep="NA")
+                else:
+                    writer.write_table(pa.Table.from_pandas(chunk, schema=arrow_schema, preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+
+    expected = {str(k): v for k, v in group_positive_rates(profile, group_column).items()}
+    if group_rates:
+        expected.update({str(k): v for k, v in group_rates.items()})
+    rates = list(expected.values())
+    meta = {
+        "schema": schema,
+        "rows": rows,
+        "seed": seed,
+        "chunk_rows": chunk_rows,
+        "format": file_format,
+        "group_column": group_column,
+        "group_bias_injected": bool(group_rates),
+        "expected_positive_rate_by_group": expected,
+        "expected_demographic_parity_difference": max(rates) - min(rates) if rates else None,
+    }
+    with open(f"{path}.meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def parse_group_rates(text, profile, group_column):
+    """'female=0.4,male=0.8' -> {level: rate}, matching levels with surrounding spaces ignored."""
+    if not text:
+        return None
+    group = next((c for c in profile["columns"] if c["name"] == group_column), None)
+    if group is None:
+        raise ValueError(f"Unknown group column: {group_column!r}")
+    levels = {str(v).strip(): v for v in group["overall"]["levels"] if v is not None}
+
+    rates = {}
+    for item in text.split(","):
+        key, _, rate = item.partition("=")
+        if key.strip() not in levels:
+            raise ValueError(f"Unknown level {key.strip()!r} for {group_column!r}; have {sorted(levels)}")
+        rate = float(rate)
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"Rate for {key.strip()!r} must be within [0, 1].")
+        rates[levels[key.strip()]] = rate
+    return rates
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("schema", choices=sorted(SCHEMAS))
+    parser.add_argument("rows", type=int)
+    parser.add_argument("output", help="output path; .parquet writes Parquet, anything else CSV")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--group-column", help="column the group rates apply to (default per schema)")
+    parser.add_argument("--group-rates", help="inject bias: comma-separated level=positive_rate")
+    args = parser.parse_args()
+
+    group_column = args.group_column or SCHEMAS[args.schema]["group_column"]
+    rates = parse_group_rates(args.group_rates, load_profile(args.schema), group_column)
+    meta = write_dataset(args.schema, args.output, args.rows, seed=args.seed, chunk_rows=args.chunk_rows,
+                         group_column=group_column, group_rates=rates)
+    print(json.dumps(meta, indent=2))
@@ -3,6 +3,81 @@ import os
 # Base directory for file storage
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
-# Upload folder configuration
-UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
-ALLOWED_EXTENSIONS = {'csv'}
\ No newline at end of file
+# Uploaded files are parsed straight from the request: each one is buffered in
+# memory up to UPLOAD_SPOOL_MAX_BYTES and spills to an anonymous temporary file
+# (unlinked, so never shared between requests) only beyond that
+UPLOAD_SPOOL_MAX_BYTES = int(os.environ.get("UPLOAD_SPOOL_MAX_BYTES", 64 * 1024 * 1024))
+ALLOWED_EXTENSIONS = {'csv', 'parquet', 'pq', 'arrow', 'feather', 'ipc'}
+
+# Maximum number of unpickled model bundles kept in memory by the predict registry
+MODEL_CACHE_SIZE = int(os.environ.get("MODEL_CACHE_SIZE", 8))
+
+# Rows per chunk when /predict-bulk streams an upload instead of loading it whole
+BULK_CHUNK_SIZE = int(os.environ.get("BULK_CHUNK_SIZE", 50000))
+
+# Largest chunk_size a /predict-bulk request may ask for
+BULK_CHUNK_SIZE_MAX = int(os.environ.get("BULK_CHUNK_SIZE_MAX", 500000))
+
+# Background /analyze jobs: worker processes, max queued + running jobs, and how
+# long (seconds) finished job results are kept for polling
+ANALYSIS_WORKERS = int(os.environ.get("ANALYSIS_WORKERS", 2))
+ANALYSIS_QUEUE_DEPTH = int(os.environ.get("ANALYSIS_QUEUE_DEPTH", 16))
+JOB_RESULT_TTL = int(os.environ.get("JOB_RESULT_TTL", 3600))
+
+# /analyze result cache: total size of cached results (bytes), entry lifetime
+# (seconds), and an optional directory to also keep them on local disk
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+RESULT_CACHE_TTL = int(os.environ.get("RESULT_CACHE_TTL", 24 * 3600))
+RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR") or None
+
+# Fitted analyses kept for on-demand SHAP / tree images (/analyze with explain=false)
+EXPLANATION_STORE_SIZE = int(os.environ.get("EXPLANATION_STORE_SIZE", 32))
+
+# SHAP stage: stratified caps on the background (reference) rows and on the
+# explained rows, and the TreeSHAP variant for decision trees
+# ("interventional" explains against that background; "path_dependent" is
+# faster but ignores it and uses the tree's own training cover instead)
+SHAP_BACKGROUND_SIZE = int(os.environ.get("SHAP_BACKGROUND_SIZE", 100))
+SHAP_EXPLAIN_SIZE = int(os.environ.get("SHAP_EXPLAIN_SIZE", 1000))
+SHAP_TREE_ALGORITHM = os.environ.get("SHAP_TREE_ALGORITHM", "interventional")
+
+# Maximum applicants accepted by one /predict-batch request
+PREDICT_BATCH_MAX_ITEMS = int(os.environ.get("PREDICT_BATCH_MAX_ITEMS", 10000))
+
+# Model file format the predict server loads: "pickle" (bundle.pkl) or
+# "artifact" (model.json + params.bin, loaded without unpickling sklearn)
+MODEL_ARTIFACT_FORMAT = os.environ.get("MODEL_ARTIFACT_FORMAT", "pickle")
+
+# Prometheus metrics at /metrics plus request timing hooks; set to 0 to disable
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+
+# Opt-in request profiling (cProfile + tracemalloc) for /analyze and /predict-bulk:
+# requests sending "X-Profile: <PROFILE_TOKEN>" (any value when no token is set)
+# are profiled and the report kept in PROFILE_DIR, newest PROFILE_MAX_FILES only
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "0") == "1"
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(BASE_DIR, "profiles"))
+PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", 50))
+
+# CSV parser for uploads and training files: "arrow" (multithreaded pyarrow
+# reader) or "pandas" (pd.read_csv); Parquet / Arrow files always use pyarrow
+CSV_ENGINE = os.environ.get("CSV_ENGINE", "arrow")
+
+# Live fairness monitoring of scored rows (/fairness/live): per-group counters
+# kept for FAIRNESS_WINDOWS windows of FAIRNESS_WINDOW_SECONDS each, at most
+# FAIRNESS_MAX_GROUPS groups per sensitive feature. With FAIRNESS_MONITOR_DIR
+# set, worker processes share their counters through that directory
+FAIRNESS_MONITOR_ENABLED = os.environ.get("FAIRNESS_MONITOR_ENABLED", "1") != "0"
+FAIRNESS_WINDOW_SECONDS = int(os.environ.get("FAIRNESS_WINDOW_SECONDS", 300))
+FAIRNESS_WINDOWS = int(os.environ.get("FAIRNESS_WINDOWS", 12))
+FAIRNESS_MAX_GROUPS = int(os.environ.get("FAIRNESS_MAX_GROUPS", 16))
+FAIRNESS_MONITOR_DIR = os.environ.get("FAIRNESS_MONITOR_DIR") or None
+
+# Bootstrap confidence intervals for the /analyze fairness slice metrics:
+# replicates (0 disables them), confidence level, threads drawing replicates,
+# and the most groups a slice may have to get intervals (per-value slices such
+# as raw loan amounts have a row or two per group; their gaps are degenerate)
+BOOTSTRAP_REPLICATES = int(os.environ.get("BOOTSTRAP_REPLICATES", 1000))
+BOOTSTRAP_CONFIDENCE = float(os.environ.get("BOOTSTRAP_CONFIDENCE", 0.95))
+BOOTSTRAP_WORKERS = int(os.environ.get("BOOTSTRAP_WORKERS", os.cpu_count() or 1))
+BOOTSTRAP_MAX_GROUPS = int(os.environ.get("BOOTSTRAP_MAX_GROUPS", 64))
\ No newline at end of file
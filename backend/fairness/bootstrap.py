@@ -0,0 +1,117 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from fairness.slice_engine import FN, FP, TN, TP
+
+
+# ============================================================
+# BOOTSTRAP CONFIDENCE INTERVALS FOR SLICE METRICS
+# ============================================================
+#
+# Every slice metric is a function of the per-group TP/TN/FP/FN counts, so
+# resampling the n test rows with replacement only changes those counts: one
+# bootstrap replicate of a slice is a Multinomial(n, counts / n) draw over its
+# groups x 4 cells. rng.multinomial(n, p, size=B) gives all B replicates as
+# one (B, groups, 4) integer matrix, and the metrics are computed on all of
+# them at once. The cost is O(B x groups), independent of n.
+#
+# Replicates are drawn in fixed-size blocks, each from its own SeedSequence
+# child, and the blocks (slices, and blocks of replicates for slices with
+# many groups) run on a thread pool; numpy releases the GIL for most of that
+# array work. Results depend on the seed only, not on the worker count.
+# Intervals are percentile intervals; a metric undefined in a replicate (e.g.
+# fewer than two groups drawn) is left out of that metric's percentiles.
+
+METRICS = (
+    "selection_rate_gap",
+    "statistical_parity_ratio",
+    "equal_opportunity_difference",
+    "average_odds_difference",
+)
+
+# cells (replicates x groups x 4) per block, bounds the temporary arrays
+BLOCK_CELLS = 1 << 21
+
+
+def _spread(values):
+    """(max - min, min, max) over groups (last axis) ignoring NaN; NaN with fewer than two groups."""
+    valid = ~np.isnan(values)
+    high = np.where(valid, values, -np.inf).max(axis=-1)
+    low = np.where(valid, values, np.inf).min(axis=-1)
+    enough = valid.sum(axis=-1) >= 2
+    return np.where(enough, high - low, np.nan), np.where(enough, low, np.nan), np.where(enough, high, np.nan)
+
+
+def replicate_metrics(counts):
+    """
+    Slice metrics (as in slice_engine.slice_summary) for a (replicates,
+    groups, 4) count array: {metric: (replicates,) float array, NaN where
+    undefined}.
+    """
+    counts = counts.astype(np.float64)
+    tp, tn, fp, fn = counts[..., TP], counts[..., TN], counts[..., FP], counts[..., FN]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        selection = (tp + fp) / (tp + tn + fp + fn)
+        tpr = tp / (tp + fn)
+        fpr = fp / (fp + tn)
+        sel_gap, sel_low, sel_high = _spread(selection)
+        parity_ratio = np.where(sel_high != 0, sel_low / sel_high, np.nan)
+    tpr_gap = _spread(tpr)[0]
+    fpr_gap = _spread(fpr)[0]
+    return {
+        "selection_rate_gap": sel_gap,
+        "statistical_parity_ratio": parity_ratio,
+        "equal_opportunity_difference": tpr_gap,
+        "average_odds_difference": (tpr_gap + fpr_gap) / 2,
+    }
+
+
+def _block_metrics(counts, replicates, seed_seq):
+    n = int(counts.sum())
+    draws = np.random.default_rng(seed_seq).multinomial(n, counts.ravel() / n, size=replicates)
+    return replicate_metrics(draws.reshape(replicates, *counts.shape))
+
+
+def _interval(values, confidence):
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return None
+    tail = (1 - confidence) / 2 * 100
+    lower, upper = np.percentile(values, [tail, 100 - tail])
+    return {"lower": float(lower), "upper": float(upper)}
+
+
+def bootstrap_intervals(slice_counts, replicates=1000, confidence=0.95, seed=42, max_workers=None,
+                        max_groups=None):
+    """
+    slice_counts: dict slice name -> (groups, 4) TP/TN/FP/FN count array, as
+    slice_confusion_counts returns. Returns dict slice name -> {metric:
+    {"lower", "upper"} or None}. Slices with more than max_groups groups
+    (e.g. raw amounts) get no intervals.
+    """
+    jobs = []
+    for (name, counts), slice_seed in zip(slice_counts.items(), np.random.SeedSequence(seed).spawn(len(slice_counts))):
+        counts = np.asarray(counts, dtype=np.int64)
+        if counts.sum() == 0 or (max_groups is not None and len(counts) > max_groups):
+            continue
+        block = max(1, BLOCK_CELLS // counts.size)
+        starts = range(0, replicates, block)
+        for start, block_seed in zip(starts, slice_seed.spawn(len(starts))):
+            jobs.append((name, counts, min(block, replicates - start), block_seed))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        blocks = list(pool.map(lambda job: (job[0], _block_metrics(*job[1:])), jobs))
+
+    draws = {}
+    for name, metrics in blocks:
+        for metric, values in metrics.items():
+            draws.setdefault(name, {}).setdefault(metric, []).append(values)
+
+    return {
+        name: {
+            metric: _interval(np.concatenate(draws[name][metric]), confidence) if name in draws else None
+            for metric in METRICS
+        }
+        for name in slice_counts
+    }
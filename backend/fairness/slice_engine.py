@@ -0,0 +1,208 @@
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+# VECTORIZED FAIRNESS SLICE ENGINE
+# ============================================================
+#
+# Every slice feature is encoded to integer group codes once; TP/TN/FP/FN for
+# every group of every slice then come out of a single np.bincount over
+# (slice offset + group code) * 4 + confusion cell. All per-group and
+# per-slice metrics are derived from those counts.
+
+TP, TN, FP, FN = 0, 1, 2, 3
+
+# confusion cell indexed by 2 * y_pred + y_true
+_CELL = np.array([TN, FN, FP, TP], dtype=np.int64)
+
+# rows per bincount block, bounds the temporary arrays for huge test sets
+BLOCK_ROWS = 1 << 20
+
+
+def encode_groups(values, sort=False):
+    """
+    Integer group code per row plus the group labels.
+
+    sort=False keeps groups in order of first appearance (like Series.unique());
+    sort=True orders them like a sorted groupby (categories in category order).
+    Missing values get code -1 and are left out of every group.
+    """
+    codes, uniques = pd.factorize(values, sort=sort, use_na_sentinel=True)
+    return codes.astype(np.int64, copy=False), list(uniques)
+
+
+def confusion_cells(y_true, y_pred):
+    y_true = np.asarray(y_true).astype(np.int64, copy=False)
+    y_pred = np.asarray(y_pred).astype(np.int64, copy=False)
+    return _CELL[2 * y_pred + y_true]
+
+
+def slice_confusion_counts(slice_codes, y_true, y_pred):
+    """
+    slice_codes: dict name -> (codes, n_groups) as returned by encode_groups.
+    Returns dict name -> int64 array (n_groups, 4) of TP, TN, FP, FN counts.
+    """
+    names = list(slice_codes)
+    sizes = [slice_codes[name][1] for name in names]
+    offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+    total_groups = int(offsets[-1])
+
+    cells = confusion_cells(y_true, y_pred)
+    n = len(cells)
+    counts = np.zeros(total_groups * 4, dtype=np.int64)
+
+    for start in range(0, n, BLOCK_ROWS):
+        stop = min(start + BLOCK_ROWS, n)
+        block_cells = cells[start:stop]
+        keys = []
+        for name, offset in zip(names, offsets[:-1]):
+            codes = slice_codes[name][0][start:stop]
+            key = (offset + codes) * 4 + block_cells
+            keys.append(key[codes >= 0])
+        if keys:
+            counts += np.bincount(np.concatenate(keys), minlength=total_groups * 4)
+
+    counts = counts.reshape(total_groups, 4)
+    return {
+        name: counts[offsets[i]:offsets[i + 1]]
+        for i, name in enumerate(names)
+    }
+
+
+def _ratio(num, den):
+    """num / den per group as Python floats, None where den is 0."""
+    return [float(a / b) if b != 0 else None for a, b in zip(num.tolist(), den.tolist())]
+
+
+def group_metrics(counts):
+    """Per-group metrics (lists aligned with the group labels) from a (n_groups, 4) count array."""
+    tp, tn, fp, fn = counts[:, TP], counts[:, TN], counts[:, FP], counts[:, FN]
+    count = tp + tn + fp + fn
+    return {
+        "count": count.tolist(),
+        "TP": tp.tolist(),
+        "TN": tn.tolist(),
+        "FP": fp.tolist(),
+        "FN": fn.tolist(),
+        "accuracy": _ratio(tp + tn, count),
+        "selection_rate": _ratio(tp + fp, count),
+        "TPR": _ratio(tp, tp + fn),
+        "FPR": _ratio(fp, fp + tn),
+        "TNR": _ratio(tn, tn + fp),
+        "FNR": _ratio(fn, fn + tp),
+        "Precision": _ratio(tp, tp + fp),
+        "Negative_Predictive_Value": _ratio(tn, tn + fn),
+        "False_Discovery_Rate": _ratio(fp, tp + fp),
+        "False_Omission_Rate": _ratio(fn, tn + fn),
+    }
+
+
+def _spread(values):
+    values = [v for v in values if v is not None]
+    return float(max(values) - min(values)) if len(values) > 1 else None
+
+
+def slice_summary(metrics):
+    """
+    Slice-level gaps from group_metrics() output: selection rate gap /
+    demographic parity difference, statistical parity ratio (min / max
+    selection rate), equal opportunity difference (TPR gap) and average odds
+    difference (mean of the TPR and FPR gaps).
+    """
+    sel = [v for v in metrics["selection_rate"] if v is not None]
+    sel_gap = _spread(sel)
+    tpr_gap = _spread(metrics["TPR"])
+    fpr_gap = _spread(metrics["FPR"])
+    return {
+        "selection_rate_gap": sel_gap if sel_gap is not None else 0.0,
+        "demographic_parity_difference": sel_gap if sel_gap is not None else 0.0,
+        "statistical_parity_ratio": float(min(sel) / max(sel)) if len(sel) > 1 and max(sel) != 0 else None,
+        "equal_opportunity_difference": tpr_gap,
+        "average_odds_difference": float((tpr_gap + fpr_gap) / 2) if tpr_gap is not None and fpr_gap is not None else None,
+    }
+
+
+def compute_slices(slice_values, y_true, y_pred, sort=False):
+    """
+    slice_values: dict slice name -> per-row group values (Series / array).
+    Returns dict slice name -> {"groups": labels, "counts": (n_groups, 4)
+    TP/TN/FP/FN array, "metrics": group_metrics(), "summary": slice_summary()},
+    computed in one counting pass.
+    """
+    encoded = {}
+    labels = {}
+    for name, values in slice_values.items():
+        codes, uniques = encode_groups(values, sort=sort)
+        encoded[name] = (codes, len(uniques))
+        labels[name] = uniques
+
+    counts = slice_confusion_counts(encoded, y_true, y_pred)
+
+    slices = {}
+    for name in slice_values:
+        metrics = group_metrics(counts[name])
+        slices[name] = {
+            "groups": labels[name],
+            "counts": counts[name],
+            "metrics": metrics,
+            "summary": slice_summary(metrics),
+        }
+    return slices
+
+
+# ============================================================
+# FROZEN SLICE BINS
+# ============================================================
+#
+# Training keeps, per slice feature, the quartile edges pd.qcut picked on the
+# test split (or the sorted category levels of a non-numeric feature) with
+# the group labels. New rows are binned against them with np.searchsorted,
+# so their groups carry the same keys as the training-time fairness_slices.
+#
+#   {"edges": [...], "labels": [...]}   numeric, right-closed bins
+#   {"levels": [...], "labels": [...]}  categorical
+
+def quantile_bins(values, q=4):
+    """Edges and interval labels of pd.qcut(values, q, duplicates="drop")."""
+    categories, edges = pd.qcut(np.asarray(values, dtype=np.float64), q=q, duplicates="drop", retbins=True)
+    return {"edges": edges.tolist(), "labels": [str(c) for c in categories.categories]}
+
+
+def level_bins(values):
+    levels = np.sort(pd.unique(pd.Series(values).dropna()))
+    return {"levels": levels.tolist(), "labels": [str(level) for level in levels.tolist()]}
+
+
+def slice_bins(df, features):
+    """Frozen bins per feature: quartiles of numeric columns, levels of the others."""
+    return {
+        feature: quantile_bins(df[feature]) if pd.api.types.is_numeric_dtype(df[feature]) else level_bins(df[feature])
+        for feature in features
+    }
+
+
+def level_codes(values, levels):
+    """Index of each value in the sorted levels array, -1 for values not in it."""
+    values = np.asarray(values)
+    levels = np.asarray(levels)
+    if not len(levels):
+        return np.full(len(values), -1, dtype=np.int64)
+    idx = np.searchsorted(levels, values).clip(0, len(levels) - 1)
+    return np.where(levels[idx] == values, idx, -1).astype(np.int64)
+
+
+def bin_codes(values, bins):
+    """
+    Group code per value under frozen bins (see above). Numeric values
+    outside the training edges go to the end bins; missing values and unseen
+    levels get -1.
+    """
+    if "levels" in bins:
+        return level_codes(values, bins["levels"])
+    values = np.asarray(values, dtype=np.float64)
+    if not bins["labels"]:
+        return np.full(len(values), -1, dtype=np.int64)
+    codes = np.searchsorted(np.asarray(bins["edges"][1:-1]), values, side="left").astype(np.int64)
+    codes[np.isnan(values)] = -1
+    return codes
@@ -0,0 +1,363 @@
+import csv
+import os
+
+import pandas as pd
+
+from config import CSV_ENGINE
+
+
+# ============================================================
+# COLUMNAR INGESTION
+# ============================================================
+#
+# One reader for uploads and training files: CSV (Arrow's multithreaded
+# parser, or pandas with CSV_ENGINE=pandas), Parquet and Arrow IPC / Feather.
+# Callers pass the columns they need as normalized names (lower-cased,
+# stripped) and optional dtypes for them; only those columns are parsed and
+# materialized, and declared dtypes skip type inference.
+#
+#   dtypes: {normalized name: "float64" | "string"}
+#
+# A "float64" column holding values that do not parse as numbers is re-read
+# with its type inferred, so the caller's own coercion still sees them. The
+# chunked Arrow CSV reader cannot re-read, so it reads every column as a
+# string and iter_frames casts the "float64" ones per chunk; a chunk column
+# Arrow cannot cast goes through pd.to_numeric(errors="coerce") instead, so
+# values that do not parse become NaN, as the caller's coercion makes them.
+#
+# Peak memory: a whole-file CSV read holds the Arrow table and the pandas copy
+# of its float columns at the same time (string columns stay Arrow-backed), so
+# when nearly every column is wanted it peaks about as high as a plain
+# pd.read_csv, and higher on small files; the saving comes from projection.
+# Parquet is read and converted one column at a time.
+
+FILE_FORMATS = {
+    "csv": "csv",
+    "parquet": "parquet",
+    "pq": "parquet",
+    "arrow": "arrow",
+    "feather": "arrow",
+    "ipc": "arrow",
+}
+
+_ARROW_TYPES = {"float64": "float64", "string": "string"}
+_PANDAS_TYPES = {"float64": "float64", "string": str}
+
+# bytes per block handed to the Arrow CSV parser threads (smaller blocks
+# lower the parser's peak memory, see bench.bench_ingest)
+CSV_BLOCK_SIZE = 1 << 20
+
+
+def normalize(name):
+    return str(name).lower().strip()
+
+
+def column_spec(column_map, dtypes=None):
+    """
+    (columns, dtypes) for read_table from a COLUMN_MAP-style dict
+    {key: [accepted header names]} and {key: dtype}.
+    """
+    columns = set()
+    spec = {}
+    for key, options in column_map.items():
+        for name in options:
+            columns.add(normalize(name))
+            if dtypes and key in dtypes:
+                spec[normalize(name)] = dtypes[key]
+    return columns, spec
+
+
+def detect_format(filename=None, source=None):
+    """"csv", "parquet" or "arrow" from the file extension, else from the leading bytes."""
+    if filename:
+        ext = os.path.splitext(str(filename))[1].lstrip(".").lower()
+        if ext in FILE_FORMATS:
+            return FILE_FORMATS[ext]
+    if source is not None and not isinstance(source, (str, os.PathLike)):
+        head = _peek(source, 6)
+        if head.startswith(b"PAR1"):
+            return "parquet"
+        if head.startswith(b"ARROW1") or head.startswith(b"\xff\xff\xff\xff"):
+            return "arrow"
+    return "csv"
+
+
+def _peek(source, n):
+    pos = source.tell()
+    head = source.read(n)
+    source.seek(pos)
+    return head
+
+
+def _rewind(source):
+    if not isinstance(source, (str, os.PathLike)):
+        source.seek(0)
+
+
+def csv_header(source):
+    """
+    Header names of a CSV path or binary file object, which is left where it
+    was. Blank and repeated names are renamed the way pd.read_csv does
+    ("Unnamed: 0", "name.1"), and the Arrow reader is given these names.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            line = f.readline()
+    else:
+        pos = source.tell()
+        line = source.readline()
+        source.seek(pos)
+    if not line.strip():
+        raise ValueError("File is empty.")
+    names = []
+    seen = {}
+    for i, name in enumerate(next(csv.reader([line.decode("utf-8-sig")]))):
+        name = name if name.strip() else f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        seen.setdefault(name, 0)
+        names.append(name)
+    return names
+
+
+def column_names(source, file_format="csv"):
+    """Column names of a path or binary file object, which is left where it was."""
+    if file_format == "csv":
+        return csv_header(source)
+    pos = None if isinstance(source, (str, os.PathLike)) else source.tell()
+    try:
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+            return pq.read_schema(source).names
+        if file_format == "arrow":
+            return _open_ipc(source).schema.names
+        raise ValueError(f"Unsupported file format: {file_format}")
+    finally:
+        if pos is not None:
+            source.seek(pos)
+
+
+def _csv_read_options(names):
+    import pyarrow.csv as pacsv
+    return pacsv.ReadOptions(use_threads=True, block_size=CSV_BLOCK_SIZE, column_names=names, skip_rows=1)
+
+
+def _project(names, columns):
+    """Names whose normalized form is wanted, in file order (all when columns is None)."""
+    if columns is None:
+        return list(names)
+    return [n for n in names if normalize(n) in columns]
+
+
+def _types_for(names, dtypes, type_names):
+    return {n: type_names[dtypes[normalize(n)]] for n in names if dtypes and normalize(n) in dtypes}
+
+
+# -------------------------
+# Whole-file reads
+# -------------------------
+
+def read_table(source, file_format="csv", columns=None, dtypes=None):
+    """DataFrame of the wanted columns of a path or binary file object."""
+    if file_format == "csv":
+        if CSV_ENGINE == "pandas":
+            return _read_csv_pandas(source, columns, dtypes)
+        table = _read_csv_arrow(source, columns, dtypes)
+    elif file_format == "parquet":
+        return _read_parquet(source, columns, dtypes)
+    elif file_format == "arrow":
+        table = _read_ipc(source)
+        table = _cast(table.select(_project(table.column_names, columns)), dtypes)
+    else:
+        raise ValueError(f"Unsupported file format: {file_format}")
+    # Parse buffers the Arrow allocator keeps cached would otherwise add to
+    # the pandas copy of the float columns made next.
+    _release_unused()
+    frame = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+    _release_unused()
+    return frame
+
+
+def _release_unused():
+    import pyarrow as pa
+    pa.default_memory_pool().release_unused()
+
+
+def _read_csv_arrow(source, columns, dtypes):
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    names = csv_header(source)
+    include = _project(names, columns)
+    types = _types_for(include, dtypes, _ARROW_TYPES)
+    read_options = _csv_read_options(names)
+    try:
+        return pacsv.read_csv(source, read_options=read_options, convert_options=pacsv.ConvertOptions(
+            include_columns=include, column_types=types, strings_can_be_null=True))
+    except pa.ArrowInvalid:
+        numeric = {n for n, t in types.items() if t != "string"}
+        if not numeric:
+            raise
+    # Some "float64" column has non-numeric values: let Arrow infer those.
+    _rewind(source)
+    types = {n: t for n, t in types.items() if n not in numeric}
+    return pacsv.read_csv(source, read_options=read_options, convert_options=pacsv.ConvertOptions(
+        include_columns=include, column_types=types, strings_can_be_null=True))
+
+
+def _read_parquet(source, columns, dtypes):
+    # Parquet is stored by column: reading and converting one column at a time
+    # keeps a single column's Arrow copy alive next to the frame, instead of
+    # the whole table next to the pandas copy of its float columns.
+    import pyarrow.parquet as pq
+    parquet = pq.ParquetFile(source)
+    data = {}
+    for name in _project(parquet.schema_arrow.names, columns):
+        table = _cast(parquet.read(columns=[name]), dtypes)
+        data[name] = table.column(0).to_pandas()
+        del table
+        _release_unused()
+    return pd.DataFrame(data, copy=False)
+
+
+def _read_csv_pandas(source, columns, dtypes):
+    names = csv_header(source)
+    include = _project(names, columns)
+    types = _types_for(include, dtypes, _PANDAS_TYPES)
+    try:
+        return pd.read_csv(source, usecols=include, dtype=types)
+    except ValueError:
+        if not any(t != str for t in types.values()):
+            raise
+    _rewind(source)
+    types = {n: t for n, t in types.items() if t == str}
+    return pd.read_csv(source, usecols=include, dtype=types)
+
+
+def _read_ipc(source):
+    return _open_ipc(source).read_all()
+
+
+def _open_ipc(source):
+    """Reader for Arrow IPC in the file or the stream format."""
+    import pyarrow as pa
+    try:
+        return pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        _rewind(source)
+        return pa.ipc.open_stream(source)
+
+
+def _cast(table, dtypes):
+    """Casts columns to their declared type where the values allow it."""
+    import pyarrow as pa
+    if not dtypes:
+        return table
+    for i, field in enumerate(table.schema):
+        dtype = dtypes.get(normalize(field.name))
+        if dtype is None or str(field.type) == _ARROW_TYPES[dtype]:
+            continue
+        try:
+            table = table.set_column(i, field.name, table.column(i).cast(_ARROW_TYPES[dtype]))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass
+    return table
+
+
+# -------------------------
+# Chunked reads
+# -------------------------
+
+def iter_frames(source, file_format="csv", columns=None, dtypes=None, chunk_size=50000):
+    """DataFrames of chunk_size rows (the last one shorter) with the wanted columns."""
+    if file_format == "csv" and CSV_ENGINE == "pandas":
+        yield from _iter_csv_pandas(source, columns, dtypes, chunk_size)
+        return
+    for table in _rebatch(_iter_batches(source, file_format, columns, dtypes, chunk_size), chunk_size):
+        table, dirty = _cast_numeric(table, dtypes)
+        frame = table.to_pandas(split_blocks=True, self_destruct=True)
+        for name in dirty:
+            frame[name] = pd.to_numeric(frame[name], errors="coerce").astype("float64")
+        yield frame
+
+
+def _cast_numeric(table, dtypes):
+    """
+    (table, names): declared "float64" string columns cast in Arrow, and the
+    names of those holding values Arrow cannot parse, left for pd.to_numeric.
+    """
+    import pyarrow as pa
+    dirty = []
+    if not dtypes:
+        return table, dirty
+    for i, field in enumerate(table.schema):
+        if dtypes.get(normalize(field.name)) != "float64" or not pa.types.is_string(field.type):
+            continue
+        try:
+            table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+        except pa.ArrowInvalid:
+            dirty.append(field.name)
+    return table, dirty
+
+
+def _iter_batches(source, file_format, columns, dtypes, chunk_size):
+    """(schema, record batch iterator) for the wanted columns."""
+    import pyarrow as pa
+
+    if file_format == "csv":
+        import pyarrow.csv as pacsv
+        names = csv_header(source)
+        include = _project(names, columns)
+        reader = pacsv.open_csv(
+            source,
+            read_options=_csv_read_options(names),
+            # Types are fixed from the first block on, so every column is read
+            # as a string: a later block cannot contradict them, and a value
+            # that is not a number cannot fail a declared float64 column.
+            convert_options=pacsv.ConvertOptions(
+                include_columns=include,
+                column_types={n: "string" for n in include},
+                strings_can_be_null=True,
+            ),
+        )
+        return reader.schema, reader
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(source)
+        include = _project(parquet.schema_arrow.names, columns)
+        # Parquet columns are typed already; not cast per batch, so every batch keeps the file schema.
+        batches = parquet.iter_batches(batch_size=chunk_size, columns=include)
+        return parquet.schema_arrow.empty_table().select(include).schema, batches
+    if file_format == "arrow":
+        table = _read_ipc(source)
+        table = _cast(table.select(_project(table.column_names, columns)), dtypes)
+        return table.schema, iter(table.to_batches(max_chunksize=chunk_size))
+    raise ValueError(f"Unsupported file format: {file_format}")
+
+
+def _rebatch(schema_and_batches, chunk_size):
+    """Tables of exactly chunk_size rows (the last one shorter) from record batches of any size."""
+    import pyarrow as pa
+
+    schema, batches = schema_and_batches
+    pending, rows = [], 0
+    for batch in batches:
+        pending.append(batch)
+        rows += batch.num_rows
+        while rows >= chunk_size:
+            table = pa.Table.from_batches(pending, schema=schema)
+            yield table.slice(0, chunk_size)
+            rest = table.slice(chunk_size)
+            pending, rows = rest.to_batches(), rest.num_rows
+    if rows:
+        yield pa.Table.from_batches(pending, schema=schema)
+
+
+def _iter_csv_pandas(source, columns, dtypes, chunk_size):
+    include = _project(csv_header(source), columns)
+    # numeric types stay inferred per chunk: a chunk cannot be re-read
+    types = {n: t for n, t in _types_for(include, dtypes, _PANDAS_TYPES).items() if t == str}
+    with pd.read_csv(source, usecols=include, dtype=types, chunksize=chunk_size) as reader:
+        yield from reader
@@ -0,0 +1,257 @@
+import io
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, CancelledError
+
+
+# ============================================================
+# WORKER SIDE
+# ============================================================
+
+_progress_queue = None
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _run_job(job_id, fn, args, kwargs):
+    def report(stage):
+        _progress_queue.put((job_id, stage))
+
+    report("started")
+    return fn(*args, progress=report, **kwargs)
+
+
+def run_analysis(payload: bytes, model_type, bias_threshold=0.15, explain=True, progress=None, file_format="csv"):
+    """
+    Job body for /analyze: parse the uploaded file bytes and run the analysis.
+    Returns (results, explain_state); the state is only sent back when
+    explain=False, so the parent can build the images later on demand.
+    """
+    # Imported here so the parent process doesn't pay for shap/matplotlib.
+    from relic.loan_model import fit_and_analyze, read_dataset
+
+    progress("parsing")
+    df = read_dataset(io.BytesIO(payload), file_format)
+    results, explain_state = fit_and_analyze(df, model_type=model_type, bias_threshold=bias_threshold,
+                                             progress=progress, explain=explain)
+    return results, (None if explain else explain_state)
+
+
+# ============================================================
+# JOB QUEUE
+# ============================================================
+
+class QueueFullError(Exception):
+    pass
+
+
+class JobQueue:
+    """
+    In-memory job queue backed by a bounded process pool.
+
+    submit() returns a job id immediately; get() reports status
+    (queued / running / done / failed / cancelled), the last stage the worker
+    reported and, once finished, the result or error. At most max_queue_depth
+    jobs may be queued or running at once. Finished jobs are forgotten after
+    result_ttl seconds.
+
+    Queued jobs are cancelled outright. A running job cannot be interrupted
+    inside the pool, so cancelling it marks it cancelled and its result is
+    discarded when the worker finishes; until then it still holds a worker
+    and counts toward max_queue_depth.
+
+    on_stage, if given, is called in the parent as on_stage(stage, seconds)
+    whenever a reported stage of a job ends (the next stage is reported or the
+    job completes), so stage timings survive the process boundary.
+    """
+
+    def __init__(self, max_workers=2, max_queue_depth=16, result_ttl=3600, mp_context="spawn",
+                 on_stage=None):
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.result_ttl = result_ttl
+        self.mp_context = mp_context
+        self.on_stage = on_stage
+
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._progress_queue = None
+        self._listener = None
+
+    def _ensure_started(self):
+        if self._executor is not None:
+            return
+        ctx = multiprocessing.get_context(self.mp_context)
+        self._progress_queue = ctx.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(self._progress_queue,),
+        )
+        self._listener = threading.Thread(target=self._listen, daemon=True)
+        self._listener.start()
+
+    def _listen(self):
+        while True:
+            message = self._progress_queue.get()
+            if message is None:
+                return
+            job_id, stage = message
+            now = time.time()
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job["status"] not in ("queued", "running"):
+                    continue
+                if job["status"] == "queued":
+                    job["status"] = "running"
+                    job["started_at"] = now
+                ended = (job["stage"], now - job["stage_started_at"]) if job["stage"] else None
+                job["stage"] = stage
+                job["stage_started_at"] = now
+            self._stage_ended(ended)
+
+    def _stage_ended(self, ended):
+        # "started" only marks the pickup by a worker; it is not a stage of the job.
+        if ended is not None and self.on_stage is not None and ended[0] != "started":
+            self.on_stage(*ended)
+
+    def submit(self, fn, *args, on_result=None, **kwargs):
+        """
+        Queue fn(*args, progress=callback, **kwargs) in the pool; fn must be importable.
+        on_result, if given, is called in the parent with the value fn returned,
+        and what it returns is published as the job's result.
+        """
+        with self._lock:
+            self._expire_finished()
+            active = sum(1 for j in self._jobs.values() if self._in_flight(j))
+            if active >= self.max_queue_depth:
+                raise QueueFullError(f"Job queue is full ({self.max_queue_depth} jobs pending).")
+
+            self._ensure_started()
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": "queued",
+                "stage": None,
+                "stage_started_at": None,
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+                "future": None,
+                "on_result": on_result,
+            }
+            future = self._executor.submit(_run_job, job_id, fn, args, kwargs)
+            self._jobs[job_id]["future"] = future
+
+        future.add_done_callback(lambda f, job_id=job_id: self._finish(job_id, f))
+        return job_id
+
+    @staticmethod
+    def _in_flight(job):
+        # A cancelled job whose worker is still running keeps its future until _finish.
+        return job["status"] in ("queued", "running") or job["future"] is not None
+
+    def _finish(self, job_id, future):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job["future"] = None
+            on_result = job.pop("on_result", None)
+            if job["status"] == "cancelled":
+                return
+
+        status, result, error = "done", None, None
+        try:
+            result = future.result()
+            if on_result is not None:
+                result = on_result(result)
+        except CancelledError:
+            status = "cancelled"
+        except Exception as e:
+            status, error = "failed", str(e)
+        else:
+            if isinstance(result, dict) and "error" in result:
+                status, result, error = "failed", None, result["error"]
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] == "cancelled":
+                return
+            job["status"] = status
+            job["result"] = result
+            job["error"] = error
+            job["finished_at"] = time.time()
+            ended = None
+            if status == "done":
+                if job["stage"]:
+                    ended = (job["stage"], job["finished_at"] - job["stage_started_at"])
+                job["stage"] = "done"
+        self._stage_ended(ended)
+
+    def get(self, job_id, include_result=True):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            info = {k: v for k, v in job.items() if k not in ("future", "on_result", "stage_started_at")}
+        if not include_result:
+            info.pop("result", None)
+        return info
+
+    def cancel(self, job_id):
+        """Returns the job's status after cancelling, or None for an unknown id."""
+        future = None
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job["status"] in ("queued", "running"):
+                future = job["future"]
+                job["status"] = "cancelled"
+                job["finished_at"] = time.time()
+            status = job["status"]
+
+        # Outside the lock: cancel() runs _finish synchronously when it succeeds.
+        if future is not None:
+            future.cancel()
+        return status
+
+    def _expire_finished(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["finished_at"] is not None and now - job["finished_at"] > self.result_ttl
+            and not self._in_flight(job)
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            in_flight = sum(1 for job in self._jobs.values() if self._in_flight(job))
+        return {
+            "max_workers": self.max_workers,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": in_flight,
+            "jobs": counts,
+        }
+
+    def shutdown(self, wait=True):
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self._progress_queue.put(None)
+        self._executor = None
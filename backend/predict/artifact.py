@@ -0,0 +1,330 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from predict.fast_scorer import LogisticScorer, _sigmoid_array, bundle_clip
+from predict.input_adapter import build_input_adapter
+
+
+# ============================================================
+# PICKLE-FREE MODEL ARTIFACT
+# ============================================================
+#
+# An artifact is two files next to bundle.pkl:
+#
+#   params.bin  every numeric array (coefficients, scaler statistics, tree
+#               node arrays) back to back, each 64-byte aligned, so the whole
+#               file can be memory-mapped and sliced without copying
+#   model.json  format version, model kind, feature order, training_metrics
+#               and the dtype / shape / offset of every array in params.bin
+#
+# Loading needs numpy only: no unpickling and no sklearn import.
+
+ARTIFACT_VERSION = 1
+SIDECAR_NAME = "model.json"
+PARAMS_NAME = "params.bin"
+ALIGNMENT = 64
+
+
+class ArtifactModel:
+    """
+    Scores from the arrays of an artifact. predict_proba returns the same
+    (rows, 2) class probabilities sklearn would, so the model can stand in for
+    the estimator anywhere a bundle is used.
+
+    Rows are first standardized with the stored scaler statistics, if any.
+    kind "linear": p = sigmoid(x . coef + intercept)
+    kind "tree":   the row walks the node arrays from the root, going left while
+                   x[feature] <= threshold; p is the leaf's positive-class share.
+                   Inputs are compared as float32, like sklearn's tree code.
+    """
+
+    def __init__(self, kind, arrays, feature_order):
+        self.kind = kind
+        self.arrays = arrays
+        self.feature_order = list(feature_order)
+        self.classes_ = np.array([0, 1])
+
+    def positive_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if "scaler_mean" in self.arrays:
+            X = X - self.arrays["scaler_mean"]
+        if "scaler_scale" in self.arrays:
+            X = X / self.arrays["scaler_scale"]
+        if self.kind == "linear":
+            return self._linear_proba(X)
+        if self.kind == "tree":
+            return self._tree_proba(X)
+        raise ValueError(f"Unsupported artifact kind: {self.kind}")
+
+    def predict_proba(self, X):
+        p = self.positive_proba(X)
+        return np.column_stack([1.0 - p, p])
+
+    def _linear_proba(self, X):
+        a = self.arrays
+        return _sigmoid_array(X @ a["coef"] + float(a["intercept"][0]))
+
+    def _tree_proba(self, X):
+        a = self.arrays
+        left, right = a["children_left"], a["children_right"]
+        feature, threshold = a["feature"], a["threshold"]
+
+        X = X.astype(np.float32)
+        rows = np.arange(len(X))
+        node = np.zeros(len(X), dtype=np.int64)
+        active = rows[left[node] >= 0]
+        # One step down the tree per iteration for every row not yet at a leaf.
+        while len(active):
+            current = node[active]
+            go_left = X[active, feature[current]] <= threshold[current]
+            node[active] = np.where(go_left, left[current], right[current])
+            active = active[left[node[active]] >= 0]
+        return np.asarray(a["positive_share"][node], dtype=np.float64)
+
+
+def model_arrays(bundle):
+    """(kind, {name: array}) for the bundle's model and scaler."""
+    model = bundle["model"]
+    arrays = {}
+
+    tree = getattr(model, "tree_", None)
+    if tree is not None:
+        if len(model.classes_) != 2:
+            raise ValueError("Only binary decision trees can be exported.")
+        value = np.asarray(tree.value[:, 0, :], dtype=np.float64)
+        arrays["children_left"] = np.asarray(tree.children_left, dtype=np.int64)
+        arrays["children_right"] = np.asarray(tree.children_right, dtype=np.int64)
+        arrays["feature"] = np.asarray(tree.feature, dtype=np.int64)
+        arrays["threshold"] = np.asarray(tree.threshold, dtype=np.float64)
+        arrays["positive_share"] = value[:, 1] / value.sum(axis=1)
+        kind = "tree"
+    elif getattr(model, "coef_", None) is not None:
+        if model.coef_.shape[0] != 1:
+            raise ValueError("Only binary linear models can be exported.")
+        arrays["coef"] = np.asarray(model.coef_[0], dtype=np.float64)
+        arrays["intercept"] = np.asarray(model.intercept_, dtype=np.float64).reshape(1)
+        kind = "linear"
+    else:
+        raise ValueError(f"No artifact export for {type(model).__name__}.")
+
+    scaler = bundle.get("scaler")
+    if scaler is not None:
+        if getattr(scaler, "with_mean", True) and getattr(scaler, "mean_", None) is not None:
+            arrays["scaler_mean"] = np.asarray(scaler.mean_, dtype=np.float64)
+        if getattr(scaler, "with_std", True) and getattr(scaler, "scale_", None) is not None:
+            arrays["scaler_scale"] = np.asarray(scaler.scale_, dtype=np.float64)
+
+    return kind, arrays
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _write_atomic(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def export_artifact(bundle, out_dir):
+    """
+    Writes params.bin and model.json for a bundle into out_dir and returns the
+    sidecar path. The sidecar is written last, so a reader that sees a new
+    model.json always finds the matching params.bin.
+    """
+    kind, arrays = model_arrays(bundle)
+
+    index = {}
+    buffer = bytearray()
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        buffer.extend(b"\0" * (-len(buffer) % ALIGNMENT))
+        index[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": len(buffer),
+        }
+        buffer.extend(array.tobytes())
+
+    os.makedirs(out_dir, exist_ok=True)
+    _write_atomic(os.path.join(out_dir, PARAMS_NAME), bytes(buffer))
+
+    sidecar = {
+        "format_version": ARTIFACT_VERSION,
+        "kind": kind,
+        "model_class": type(bundle["model"]).__name__,
+        "feature_order": list(bundle["feature_order"]),
+        "params_sha256": hashlib.sha256(buffer).hexdigest(),
+        "arrays": index,
+        "training_metrics": bundle.get("training_metrics", {}),
+    }
+    sidecar_path = os.path.join(out_dir, SIDECAR_NAME)
+    _write_atomic(sidecar_path, json.dumps(sidecar, default=_json_default).encode("utf-8"))
+    return sidecar_path
+
+
+def load_artifact(path, verify=False):
+    """
+    Bundle dict (model, scaler, feature_order, training_metrics, scorer,
+    input_adapter) from a model.json path or the directory holding it.
+    Arrays are read-only views into a memory map of params.bin; verify=True
+    also checks params.bin against the digest recorded in the sidecar.
+    """
+    sidecar_path = path if path.endswith(".json") else os.path.join(path, SIDECAR_NAME)
+    with open(sidecar_path, "r", encoding="utf-8") as f:
+        sidecar = json.load(f)
+
+    if sidecar.get("format_version") != ARTIFACT_VERSION:
+        raise ValueError(f"Unsupported artifact version: {sidecar.get('format_version')}")
+
+    params_path = os.path.join(os.path.dirname(sidecar_path), PARAMS_NAME)
+    if os.path.getsize(params_path):
+        buffer = np.memmap(params_path, dtype=np.uint8, mode="r")
+    else:
+        buffer = np.zeros(0, dtype=np.uint8)
+
+    if verify and hashlib.sha256(buffer).hexdigest() != sidecar["params_sha256"]:
+        raise ValueError(f"{params_path} does not match {sidecar_path}.")
+
+    arrays = {}
+    for name, spec in sidecar["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        start = spec["offset"]
+        stop = start + count * dtype.itemsize
+        arrays[name] = buffer[start:stop].view(dtype).reshape(spec["shape"])
+
+    model = ArtifactModel(sidecar["kind"], arrays, sidecar["feature_order"])
+    bundle = {
+        "model": model,
+        "scaler": None,
+        "feature_order": sidecar["feature_order"],
+        "training_metrics": sidecar.get("training_metrics", {}),
+    }
+    bundle["scorer"] = compile_artifact_scorer(model, clip=bundle_clip(bundle),
+                                               derived=bundle["training_metrics"].get("derived_features"))
+    bundle["input_adapter"] = build_input_adapter(bundle)
+    return bundle
+
+
+def compile_artifact_scorer(model, clip=None, derived=None):
+    """LogisticScorer with the scaler folded in (see fast_scorer), or None for trees."""
+    if model.kind != "linear":
+        return None
+    a = model.arrays
+    weights = np.asarray(a["coef"], dtype=np.float64)
+    bias = float(a["intercept"][0])
+    if "scaler_scale" in a:
+        weights = weights / a["scaler_scale"]
+    if "scaler_mean" in a:
+        bias -= float(np.dot(weights, a["scaler_mean"]))
+    return LogisticScorer(model.feature_order, weights, bias, clip=clip, derived=derived)
+
+
+# ============================================================
+# EXPORT / ROUND-TRIP CHECK
+# ============================================================
+
+def bundle_dirs(model_dir):
+    for variant in sorted(os.listdir(model_dir)):
+        variant_dir = os.path.join(model_dir, variant)
+        if not os.path.isdir(variant_dir):
+            continue
+        for model_type in sorted(os.listdir(variant_dir)):
+            bundle_dir = os.path.join(variant_dir, model_type)
+            if os.path.exists(os.path.join(bundle_dir, "bundle.pkl")):
+                yield f"{variant}/{model_type}", bundle_dir
+
+
+def sample_inputs(bundle, n=10000, seed=0):
+    """
+    Random feature rows around the data the model was fit on: Gaussian around
+    the scaler statistics for linear models, and around every split threshold
+    (plus the threshold values themselves) for trees.
+    """
+    rng = np.random.default_rng(seed)
+    k = len(bundle["feature_order"])
+    model, scaler = bundle["model"], bundle.get("scaler")
+
+    tree = getattr(model, "tree_", None)
+    if tree is not None:
+        X = rng.normal(size=(n, k))
+        for j in range(k):
+            cuts = tree.threshold[tree.feature == j]
+            if len(cuts):
+                X[:, j] = rng.choice(cuts, n) + rng.choice([-1.0, 0.0, 1.0], n) * rng.random(n)
+        return X
+
+    mean = getattr(scaler, "mean_", np.zeros(k))
+    scale = getattr(scaler, "scale_", np.ones(k))
+    return mean + scale * rng.normal(scale=2.0, size=(n, k))
+
+
+def verify_round_trip(bundle, bundle_dir, n=10000):
+    """Max abs difference between sklearn and artifact probabilities on sample_inputs()."""
+    loaded = load_artifact(bundle_dir, verify=True)
+    if loaded["feature_order"] != list(bundle["feature_order"]):
+        raise AssertionError("feature_order differs after round trip")
+    if json.dumps(loaded["training_metrics"], sort_keys=True) != json.dumps(
+            bundle.get("training_metrics", {}), sort_keys=True, default=_json_default):
+        raise AssertionError("training_metrics differ after round trip")
+
+    import pandas as pd
+    X = sample_inputs(bundle, n)
+    # The estimators see inputs clipped to the training fences; the scorer clips itself.
+    clip = bundle_clip(bundle)
+    X_clipped = np.clip(X, *clip) if clip is not None else X
+    frame = pd.DataFrame(X_clipped, columns=bundle["feature_order"])
+    scaler = bundle.get("scaler")
+    expected = bundle["model"].predict_proba(scaler.transform(frame) if scaler is not None else frame)[:, 1]
+
+    diffs = {"model": float(np.abs(loaded["model"].positive_proba(X_clipped) - expected).max())}
+    if loaded["scorer"] is not None:
+        diffs["scorer"] = float(np.abs(loaded["scorer"].predict_proba(X) - expected).max())
+    return diffs
+
+
+if __name__ == "__main__":
+    # Run from backend/:
+    #   python -m predict.artifact export           write model.json + params.bin next to every bundle.pkl
+    #   python -m predict.artifact verify           compare the shipped model.json files against the pickled bundles
+    #   python -m predict.artifact verify --fresh   same, for a fresh export into a temporary directory
+    import argparse
+    import tempfile
+    import joblib
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["export", "verify"])
+    parser.add_argument("--model-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"))
+    parser.add_argument("--tolerance", type=float, default=1e-12)
+    parser.add_argument("--fresh", action="store_true",
+                        help="verify a new export in a temporary directory instead of the shipped artifacts")
+    args = parser.parse_args()
+
+    failed = False
+    for name, bundle_dir in bundle_dirs(args.model_dir):
+        bundle = joblib.load(os.path.join(bundle_dir, "bundle.pkl"))
+        if args.command == "export":
+            export_artifact(bundle, bundle_dir)
+            print(f"{name:<32} exported")
+            continue
+        if args.fresh:
+            with tempfile.TemporaryDirectory() as tmp:
+                export_artifact(bundle, tmp)
+                diffs = verify_round_trip(bundle, tmp)
+        else:
+            diffs = verify_round_trip(bundle, bundle_dir)
+        ok = all(d <= args.tolerance for d in diffs.values())
+        failed |= not ok
+        print(f"{name:<32} {'ok' if ok else 'MISMATCH'}  "
+              + "  ".join(f"{k} max|diff| {v:.2e}" for k, v in diffs.items()))
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,156 @@
+import math
+
+import numpy as np
+
+from predict.input_adapter import DERIVE_OPS, derive_scalar
+
+
+# ============================================================
+# COMPILED LOGISTIC SCORER
+# ============================================================
+
+class LogisticScorer:
+    """
+    Logistic regression bundle with the StandardScaler folded into the
+    coefficients, so scoring is a single dot product plus a sigmoid:
+
+        z = sum(coef_i * (x_i - mean_i) / scale_i) + intercept
+          = sum((coef_i / scale_i) * x_i) + (intercept - sum(coef_i * mean_i / scale_i))
+
+    clip (lower, upper arrays, see clip_arrays) bounds every input to the
+    outlier fences the model was trained with before it is weighted.
+
+    derived (training_metrics["derived_features"]) names the features that
+    score_dict rebuilds from the clipped raw inputs instead of reading them
+    from the payload, like InputAdapter.derive does for arrays.
+    """
+
+    def __init__(self, feature_order, weights, bias, threshold=0.5, clip=None, derived=None):
+        self.feature_order = list(feature_order)
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.threshold = threshold
+        self.clip = clip
+        self.derived = {f: spec for f, spec in (derived or {}).items() if f in self.feature_order}
+        for feature, spec in self.derived.items():
+            if spec["op"] not in DERIVE_OPS:
+                raise ValueError(f"Unknown derived feature op: {spec['op']}")
+
+        bounds = [(-math.inf, math.inf)] * len(self.feature_order) if clip is None else \
+            list(zip(clip[0].tolist(), clip[1].tolist()))
+        terms = list(zip(self.weights.tolist(), self.feature_order, bounds))
+        # (weight, feature, lower, upper) for the payload's features, then the derived ones with their recipe
+        self.input_features = [f for f in self.feature_order if f not in self.derived]
+        self._input_terms = [(w, f, lo, hi) for w, f, (lo, hi) in terms if f not in self.derived]
+        self._derived_terms = [(w, self.derived[f], lo, hi) for w, f, (lo, hi) in terms if f in self.derived]
+
+    def decision_function(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if self.clip is not None:
+            X = np.clip(X, *self.clip)
+        return X @ self.weights + self.bias
+
+    def predict_proba(self, X):
+        """Approval probability for each row of a 2-D float array."""
+        z = self.decision_function(X)
+        return _sigmoid_array(z)
+
+    def score_array(self, x):
+        """Approval probability for a single 1-D float array in feature order."""
+        x = np.ascontiguousarray(x, dtype=np.float64)
+        if self.clip is not None:
+            x = np.clip(x, *self.clip)
+        return _sigmoid(float(np.dot(x, self.weights)) + self.bias)
+
+    def score_dict(self, payload: dict):
+        """
+        Approval probability for one applicant dict (keys are matched
+        case-insensitively). Only the raw input features are read; derived
+        features are computed here.
+        """
+        row = {str(k).lower(): v for k, v in payload.items()}
+
+        missing = [f for f in self.input_features if f not in row]
+        if missing:
+            raise KeyError(f"Missing columns in input: {missing}")
+
+        z = self.bias
+        if not self._derived_terms:
+            for w, f, lo, hi in self._input_terms:
+                z += w * min(max(float(row[f]), lo), hi)
+            return _sigmoid(z)
+
+        values = {}
+        for w, f, lo, hi in self._input_terms:
+            x = values[f] = min(max(float(row[f]), lo), hi)
+            z += w * x
+        for w, spec, lo, hi in self._derived_terms:
+            x = derive_scalar(spec, [values[f] for f in spec["inputs"]])
+            z += w * min(max(x, lo), hi)
+        return _sigmoid(z)
+
+
+def _sigmoid(z):
+    # Split on sign so exp never overflows.
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1.0 + e)
+
+
+def _sigmoid_array(z):
+    out = np.empty_like(z)
+    pos = z >= 0
+    out[pos] = 1.0 / (1.0 + np.exp(-z[pos]))
+    e = np.exp(z[~pos])
+    out[~pos] = e / (1.0 + e)
+    return out
+
+
+def clip_arrays(feature_order, clip_bounds):
+    """
+    (lower, upper) float arrays aligned with feature_order from a
+    {feature: [lower, upper]} dict (training_metrics["clip_bounds"]), or None
+    when nothing is clipped. Features without bounds get -inf / inf.
+    """
+    if not clip_bounds:
+        return None
+    lower = np.full(len(feature_order), -np.inf)
+    upper = np.full(len(feature_order), np.inf)
+    for j, feature in enumerate(feature_order):
+        if feature in clip_bounds:
+            lower[j], upper[j] = clip_bounds[feature]
+    return lower, upper
+
+
+def bundle_clip(bundle):
+    return clip_arrays(bundle["feature_order"], bundle.get("training_metrics", {}).get("clip_bounds"))
+
+
+def compile_scorer(bundle):
+    """
+    Build a LogisticScorer from a bundle, or return None when the model is not a
+    binary linear classifier (those keep going through sklearn).
+    """
+    model = bundle.get("model")
+    coef = getattr(model, "coef_", None)
+    intercept = getattr(model, "intercept_", None)
+    if coef is None or intercept is None or not hasattr(model, "predict_proba"):
+        return None
+    if coef.shape[0] != 1 or len(getattr(model, "classes_", [])) != 2:
+        return None
+
+    weights = np.asarray(coef[0], dtype=np.float64)
+    bias = float(intercept[0])
+
+    scaler = bundle.get("scaler")
+    if scaler is not None:
+        scale = getattr(scaler, "scale_", None)
+        mean = getattr(scaler, "mean_", None)
+        if scale is not None and getattr(scaler, "with_std", True):
+            weights = weights / scale
+        if mean is not None and getattr(scaler, "with_mean", True):
+            bias -= float(np.dot(weights, mean))
+
+    return LogisticScorer(bundle["feature_order"], weights, bias, clip=bundle_clip(bundle),
+                          derived=bundle.get("training_metrics", {}).get("derived_features"))
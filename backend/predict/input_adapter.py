@@ -0,0 +1,181 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+# PRECOMPILED INPUT ADAPTER
+# ============================================================
+
+class InputAdapter:
+    """
+    Turns an uploaded frame into the float feature matrix a bundle expects.
+
+    Built once per bundle. Column renames are resolved once per distinct
+    header and cached; categorical columns are mapped by factorizing to
+    integer codes and indexing a small lookup table built from the unique
+    values, so the string normalisation runs per category instead of per row.
+    Every feature is written straight into one preallocated float64 array.
+
+    Semantics match the original prepare_input: headers are lower-cased and
+    stripped, column_mappings renames them, mapped values are compared after
+    str().lower().strip() with unknown values -> -1, and anything that does
+    not coerce to a number -> -1.
+
+    Features named in derived_features (the recipe the trainer stores, see
+    derive()) are not read from the upload; they are rebuilt from the raw
+    input features after those are clipped to clip_bounds, as in training.
+    """
+
+    def __init__(self, feature_order, column_mappings=None, value_mappings=None, derived_features=None,
+                 clip_bounds=None):
+        self.feature_order = list(feature_order)
+        self.column_mappings = {
+            k.lower().strip(): v.lower().strip()
+            for k, v in (column_mappings or {}).items()
+        }
+        # Keys normalized like the values they are compared with (the fair
+        # trainer stores raw category strings such as " Graduate").
+        self.value_mappings = {
+            f: {str(k).lower().strip(): v for k, v in mapping.items()}
+            for f, mapping in (value_mappings or {}).items()
+        }
+        self.derived_features = {f: spec for f, spec in (derived_features or {}).items() if f in self.feature_order}
+        self.input_features = [f for f in self.feature_order if f not in self.derived_features]
+        self.input_index = [self.feature_order.index(f) for f in self.input_features]
+        self.clip_bounds = dict(clip_bounds or {})
+
+        index = {f: j for j, f in enumerate(self.feature_order)}
+        self._derive_plan = []
+        for feature, spec in self.derived_features.items():
+            missing = [f for f in spec["inputs"] if f not in self.input_features]
+            if missing:
+                raise ValueError(f"Derived feature {feature} needs input features {missing}")
+            if spec["op"] not in DERIVE_OPS:
+                raise ValueError(f"Unknown derived feature op: {spec['op']}")
+            self._derive_plan.append((index[feature], spec, [index[f] for f in spec["inputs"]]))
+        self._plans = {}
+
+    def plan(self, columns):
+        """Position of each feature in a header, cached per header signature."""
+        signature = tuple(columns)
+        plan = self._plans.get(signature)
+        if plan is not None:
+            return plan
+
+        positions = {}
+        for i, c in enumerate(signature):
+            name = str(c).lower().strip()
+            name = self.column_mappings.get(name, name)
+            positions.setdefault(name, i)
+
+        missing = [c for c in self.input_features if c not in positions]
+        if missing:
+            raise KeyError(f"Missing after mapping: {missing}")
+
+        plan = [(j, positions[f], self.value_mappings.get(f)) for j, f in zip(self.input_index, self.input_features)]
+        # Headers come from user uploads; don't let the cache grow unbounded.
+        if len(self._plans) >= 64:
+            self._plans.clear()
+        self._plans[signature] = plan
+        return plan
+
+    def source_columns(self):
+        """
+        (columns, dtypes) an upload has to provide, as normalized header names:
+        every header that maps onto a feature, read as a string when the
+        feature has a value mapping and as float64 otherwise (for ingest).
+        """
+        dtypes = {f: "string" if f in self.value_mappings else "float64" for f in self.input_features}
+        for raw, feature in self.column_mappings.items():
+            if feature in dtypes:
+                dtypes[raw] = dtypes[feature]
+        return set(dtypes), dtypes
+
+    def transform(self, df: pd.DataFrame):
+        """Feature matrix of shape (len(df), len(feature_order)), C-contiguous float64."""
+        plan = self.plan(df.columns)
+        X = np.empty((len(df), len(self.feature_order)), dtype=np.float64)
+
+        for j, pos, mapping in plan:
+            col = df.iloc[:, pos]
+            if mapping is not None:
+                X[:, j] = map_codes(col, mapping)
+            else:
+                X[:, j] = coerce_numeric(col)
+
+        self.derive(X)
+        X[np.isnan(X)] = -1.0
+        return X
+
+    def derive(self, X):
+        """
+        Fills the derived feature columns of X (rows, len(feature_order)) in
+        place from its input feature columns and returns X. Recipe entries
+        are {"op": "log1p", "inputs": [a]} or {"op": "ratio", "inputs": [a,
+        b], "fill": value}: a / b. Non-finite results get the recipe's fill
+        value (the training median for the ratio) or -1 like any other value
+        that does not coerce. A no-op for bundles without derived features.
+        """
+        for j, spec, inputs in self._derive_plan:
+            args = [self._clipped(X[:, i], self.feature_order[i]) for i in inputs]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                X[:, j] = DERIVE_OPS[spec["op"]](*args)
+            X[~np.isfinite(X[:, j]), j] = spec.get("fill", -1.0)
+        return X
+
+    def _clipped(self, values, feature):
+        bounds = self.clip_bounds.get(feature)
+        return values if bounds is None else np.clip(values, *bounds)
+
+    def to_frame(self, df: pd.DataFrame):
+        return pd.DataFrame(self.transform(df), columns=self.feature_order, copy=False)
+
+
+# Operations a derived_features recipe may name
+DERIVE_OPS = {
+    "log1p": np.log1p,
+    "ratio": np.divide,
+}
+
+
+def derive_scalar(spec, args):
+    """One derived value from clipped float inputs, as InputAdapter.derive computes it per row."""
+    op = spec["op"]
+    if op not in DERIVE_OPS:
+        raise ValueError(f"Unknown derived feature op: {op}")
+    try:
+        value = math.log1p(args[0]) if op == "log1p" else args[0] / args[1]
+    except (ValueError, ZeroDivisionError):
+        # log1p(x <= -1) and x / 0 are not finite in numpy either
+        value = math.nan
+    return value if math.isfinite(value) else spec.get("fill", -1.0)
+
+
+def map_codes(col: pd.Series, mapping):
+    codes, uniques = pd.factorize(col, use_na_sentinel=True)
+    table = np.empty(len(uniques) + 1, dtype=np.float64)
+    for i, u in enumerate(uniques):
+        table[i] = mapping.get(str(u).lower().strip(), -1)
+    # code -1 (missing) lands on the last slot; astype(str) would have made it "nan"
+    table[-1] = mapping.get("nan", -1)
+    return table[codes]
+
+
+def coerce_numeric(col: pd.Series):
+    """Float view of a column, NaN where a value does not coerce (filled by the caller)."""
+    if not (pd.api.types.is_numeric_dtype(col.dtype) or pd.api.types.is_bool_dtype(col.dtype)):
+        col = pd.to_numeric(col, errors="coerce")
+    return col.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def build_input_adapter(bundle):
+    metrics = bundle.get("training_metrics", {})
+    return InputAdapter(
+        bundle["feature_order"],
+        column_mappings=metrics.get("column_mapping", {}),
+        value_mappings=metrics.get("value_mapping", {}),
+        derived_features=metrics.get("derived_features"),
+        clip_bounds=metrics.get("clip_bounds"),
+    )
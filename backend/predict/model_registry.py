@@ -0,0 +1,148 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import joblib
+
+
+# ============================================================
+# MODEL BUNDLE REGISTRY
+# ============================================================
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Keeps loaded model bundles in memory, keyed by (bias_flag, model_type).
+
+    bundle_name is the file looked up in each model folder: bundle.pkl, or
+    model.json for the pickle-free artifact format (see predict.artifact).
+    Every lookup stats that file. When mtime or size changed, the file is
+    hashed; a new hash means the bundle is reloaded and swapped in under the
+    lock, so callers always get either the old or the new bundle, never a
+    half-loaded one. If the reload fails (e.g. a training run is still writing
+    the file) the previous bundle keeps being served.
+    """
+
+    def __init__(self, model_dir, max_entries=8, loader=None, bundle_name="bundle.pkl"):
+        self.model_dir = model_dir
+        self.max_entries = max_entries
+        self.bundle_name = bundle_name
+        self.loader = loader or joblib.load
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "reloads": 0,
+            "evictions": 0,
+            "load_errors": 0,
+        }
+
+    def bundle_path(self, model_type, bias_flag=False):
+        sub_folder = "biased" if bias_flag else "fair"
+        return os.path.join(self.model_dir, sub_folder, model_type, self.bundle_name)
+
+    def get(self, model_type, bias_flag=False):
+        key = (bool(bias_flag), model_type)
+        path = self.bundle_path(model_type, bias_flag)
+        stat = os.stat(path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_fresh(entry, stat):
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry["bundle"]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Only one thread (re)loads a given key; the others wait and then
+        # pick up whatever it stored.
+        with load_lock:
+            stat = os.stat(path)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and self._is_fresh(entry, stat):
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry["bundle"]
+
+            digest = file_digest(path)
+            if entry is not None and entry["digest"] == digest:
+                # Touched but unchanged: refresh the stat fingerprint only.
+                with self._lock:
+                    entry["mtime_ns"] = stat.st_mtime_ns
+                    entry["size"] = stat.st_size
+                    self._stats["hits"] += 1
+                return entry["bundle"]
+
+            try:
+                bundle = self.loader(path)
+            except Exception:
+                with self._lock:
+                    self._stats["load_errors"] += 1
+                if entry is not None:
+                    return entry["bundle"]
+                raise
+
+            new_entry = {
+                "bundle": bundle,
+                "path": path,
+                "digest": digest,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+            }
+
+            with self._lock:
+                if entry is None:
+                    self._stats["misses"] += 1
+                else:
+                    self._stats["reloads"] += 1
+                self._entries[key] = new_entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._stats["evictions"] += 1
+
+            return bundle
+
+    def _is_fresh(self, entry, stat):
+        return entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size
+
+    def invalidate(self, model_type=None, bias_flag=None):
+        with self._lock:
+            if model_type is None and bias_flag is None:
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                if model_type is not None and key[1] != model_type:
+                    continue
+                if bias_flag is not None and key[0] != bool(bias_flag):
+                    continue
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "bundle_name": self.bundle_name,
+                "entries": [
+                    {
+                        "bias_flag": key[0],
+                        "model_type": key[1],
+                        "digest": entry["digest"],
+                    }
+                    for key, entry in self._entries.items()
+                ],
+            }
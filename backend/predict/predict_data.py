@@ -1,18 +1,100 @@
 import pandas as pd
+import numpy as np
 import joblib
-from sklearn.metrics import accuracy_score
-from fairlearn.metrics import MetricFrame, selection_rate
 import os
-MODEL_DIR = "predict\\models"
+import math
+from config import (
+    MODEL_CACHE_SIZE, BULK_CHUNK_SIZE, MODEL_ARTIFACT_FORMAT,
+    FAIRNESS_MONITOR_ENABLED, FAIRNESS_WINDOW_SECONDS, FAIRNESS_WINDOWS, FAIRNESS_MAX_GROUPS,
+    FAIRNESS_MONITOR_DIR,
+)
+from predict.model_registry import ModelRegistry
+from predict.fast_scorer import bundle_clip, compile_scorer
+from predict.input_adapter import InputAdapter, build_input_adapter
+from predict.artifact import SIDECAR_NAME, load_artifact
+from ingest.tabular import column_names, iter_frames, normalize, read_table
+from telemetry import metrics
+from telemetry.fairness_monitor import FairnessMonitor
+from fairness.slice_engine import bin_codes
 
-def load_model_bundle(model_type: str, bias_flag=False):
-    pwd = os.getcwd()
-    sub_folder = "biased" if bias_flag else "fair"
-    folder = os.path.join(pwd, MODEL_DIR, sub_folder, model_type)
-    bundle = joblib.load(os.path.join(folder, "bundle.pkl"))
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+
+# Bundle folders under models/fair and models/biased
+MODEL_TYPES = ("logistic_regression", "decision_tree")
+
+
+def read_bundle(path):
+    if path.endswith(".json"):
+        bundle = load_artifact(path)
+    else:
+        bundle = joblib.load(path)
+        # Compiled once per (re)load; scorer is None for models without a linear fast path.
+        bundle["scorer"] = compile_scorer(bundle)
+        bundle["input_adapter"] = build_input_adapter(bundle)
+    # "biased/logistic_regression": the key live fairness counters are kept under
+    bundle["model_key"] = os.path.relpath(os.path.dirname(path), MODEL_DIR).replace(os.sep, "/")
+    bundle["monitored_features"] = monitored_features(bundle)
+    bundle["training_fairness"] = training_fairness(bundle)
     return bundle
 
 
+def monitored_features(bundle):
+    """[(feature, column index)] of the bundle's sensitive features that it scores on."""
+    feature_order = list(bundle["feature_order"])
+    sensitive = bundle["training_metrics"].get("sensitive_features") or []
+    return [(f, feature_order.index(f)) for f in sensitive if f in feature_order]
+
+
+def training_fairness(bundle):
+    """The training-time fairness values the live monitor reports alongside its own."""
+    training_metrics = bundle["training_metrics"]
+    return {
+        "feature": training_metrics.get("primary_fairness_axis"),
+        "selection_rates": training_metrics.get("selection_rates"),
+        "selection_rate_gap": training_metrics.get("selection_rate_gap"),
+        "statistical_parity_ratio": training_metrics.get("statistical_parity_ratio"),
+    }
+
+
+model_registry = ModelRegistry(
+    MODEL_DIR,
+    max_entries=MODEL_CACHE_SIZE,
+    loader=read_bundle,
+    bundle_name=SIDECAR_NAME if MODEL_ARTIFACT_FORMAT == "artifact" else "bundle.pkl",
+)
+
+
+def load_model_bundle(model_type: str, bias_flag=False):
+    if model_type not in MODEL_TYPES:
+        raise ValueError(f"Unknown model_type: {model_type!r}; expected one of {list(MODEL_TYPES)}.")
+    return model_registry.get(model_type, bias_flag=bias_flag)
+
+
+fairness_monitor = FairnessMonitor(
+    window_seconds=FAIRNESS_WINDOW_SECONDS,
+    max_windows=FAIRNESS_WINDOWS,
+    max_groups=FAIRNESS_MAX_GROUPS,
+    shared_dir=FAIRNESS_MONITOR_DIR,
+)
+
+
+def monitor_scores(bundle, sensitive, probs):
+    """Feeds scored rows to the live fairness monitor; sensitive is {feature: values}."""
+    if not FAIRNESS_MONITOR_ENABLED or not sensitive or "model_key" not in bundle:
+        return
+    fairness_monitor.observe(bundle["model_key"], sensitive, probs, training=bundle_training_fairness(bundle))
+
+
+def bundle_training_fairness(bundle):
+    return bundle.get("training_fairness") or training_fairness(bundle)
+
+
+def monitor_matrix(bundle, X, probs):
+    features = bundle.get("monitored_features")
+    if features:
+        monitor_scores(bundle, {f: X[:, i] for f, i in features}, probs)
+
+
 def prepare_features(df: pd.DataFrame, feature_order):
     df_cols = [c.lower() for c in df.columns]
     df.columns = df_cols
@@ -25,12 +107,39 @@ def prepare_features(df: pd.DataFrame, feature_order):
 
 
 def predict_single(payload: dict, bundle):
+    metrics.count_rows("single", 1)
+    scorer = bundle.get("scorer")
+    if scorer is not None:
+        # Derives the engineered features itself, so fair bundles stay on this path.
+        prob = scorer.score_dict(payload)
+        monitor_payload(bundle, payload, prob)
+        return {
+            "probability": prob,
+            "approved": int(prob >= 0.5)
+        }
+
+    adapter = bundle.get("input_adapter") or build_input_adapter(bundle)
+    if adapter.derived_features:
+        # The engineered features are rebuilt from the raw ones, as in predict_batch.
+        row = {str(k).lower(): v for k, v in payload.items()}
+        missing = [f for f in adapter.input_features if f not in row]
+        if missing:
+            raise KeyError(f"Missing columns in input: {missing}")
+        X = np.empty((1, len(adapter.feature_order)), dtype=np.float64)
+        X[0, adapter.input_index] = [float(row[f]) for f in adapter.input_features]
+        prob = float(_score_matrix(adapter.derive(X), bundle)[0])
+        monitor_payload(bundle, payload, prob)
+        return {
+            "probability": prob,
+            "approved": int(prob >= 0.5)
+        }
+
     model = bundle["model"]
     scaler = bundle["scaler"]
     feature_order = bundle["feature_order"]
 
     df = pd.DataFrame([payload])
-    X = prepare_features(df, feature_order)
+    X = clip_features(prepare_features(df, feature_order), bundle)
 
     if scaler:
         X_scaled = scaler.transform(X)
@@ -39,73 +148,327 @@ def predict_single(payload: dict, bundle):
 
     prob = float(model.predict_proba(X_scaled)[0][1])
     approved = int(prob >= 0.5)
+    monitor_payload(bundle, payload, prob)
 
     return {
         "probability": prob,
         "approved": approved
     }
 
+def monitor_payload(bundle, payload, prob):
+    """monitor_scores for one applicant dict, without building arrays (see FairnessMonitor.observe_one)."""
+    features = bundle.get("monitored_features")
+    if not FAIRNESS_MONITOR_ENABLED or not features or "model_key" not in bundle:
+        return
+    values = {}
+    for f, _ in features:
+        if f in payload:
+            values[f] = payload[f]
+        else:
+            # keys are matched case-insensitively, like the features themselves
+            values[f] = next((v for k, v in payload.items() if str(k).lower() == f), None)
+    fairness_monitor.observe_one(bundle["model_key"], values, prob, training=bundle_training_fairness(bundle))
+
 def prepare_input(df, feature_order, column_mappings=None, value_mappings=None):
-    df = df.copy()
-
-    df.columns = [c.lower().strip() for c in df.columns]
-    
-    if column_mappings:
-        normalized_map = {k.lower().strip(): v.lower().strip()
-                          for k, v in column_mappings.items()}
-        df = df.rename(columns=normalized_map)
-
-    if value_mappings:
-        for col, mapping in value_mappings.items():
-            if col in df.columns:
-                df[col] = (
-                    df[col]
-                    .astype(str)
-                    .str.lower()
-                    .str.strip()
-                    .map(mapping)
-                    .fillna(-1)
-                    .astype(int)
-                )
-
-    missing = [c for c in feature_order if c not in df.columns]
-    if missing:
-        raise KeyError(f"Missing after mapping: {missing}")
+    adapter = InputAdapter(feature_order,
+                           column_mappings=column_mappings,
+                           value_mappings=value_mappings)
+    return adapter.to_frame(df)
 
-    X = df[feature_order].copy()
 
-    for col in X.columns:
-        X[col] = pd.to_numeric(X[col], errors="coerce").fillna(-1)
+def feature_matrix(df: pd.DataFrame, bundle):
+    adapter = bundle.get("input_adapter") or build_input_adapter(bundle)
+    return adapter.transform(df)
 
-    return X
 
+def score_frame(df: pd.DataFrame, bundle):
+    return score_matrix(feature_matrix(df, bundle), bundle)
 
-def predict_bulk(df: pd.DataFrame, bundle):
+
+def score_matrix(X: np.ndarray, bundle):
+    """Approval probabilities for a (rows, features) float array in feature_order."""
+    with metrics.stage("scoring"):
+        probs = _score_matrix(X, bundle)
+    monitor_matrix(bundle, X, probs)
+    return probs
+
+
+def _score_matrix(X, bundle):
     model = bundle["model"]
     scaler = bundle["scaler"]
-    feature_order = bundle["feature_order"]
-    value_mappings = bundle["training_metrics"].get("value_mapping", {})
-    column_mappings = bundle["training_metrics"].get("column_mapping", {})
 
-    X = prepare_input(df, feature_order,
-                        column_mappings=column_mappings,
-                        value_mappings=value_mappings)
+    scorer = bundle.get("scorer")
+    if scorer is not None:
+        return scorer.predict_proba(X)
 
+    X = pd.DataFrame(clip_features(X, bundle), columns=bundle["feature_order"], copy=False)
     if scaler:
         X_scaled = scaler.transform(X)
     else:
         X_scaled = X
+    return model.predict_proba(X_scaled)[:, 1]
 
-    probs = model.predict_proba(X_scaled)[:, 1]
-    decisions = (probs >= 0.5).astype(int)
 
+def clip_features(X, bundle):
+    """X clipped to the outlier fences stored at training time (unchanged if none)."""
+    clip = bundle_clip(bundle)
+    if clip is None:
+        return X
+    if isinstance(X, pd.DataFrame):
+        return X.clip(lower=clip[0], upper=clip[1], axis=1)
+    return np.clip(X, *clip)
+
+
+def slice_counts(bundle, X, probs):
+    """
+    {feature: (groups, 3) array of row count, approvals and probability sum}
+    with the rows binned by the slice bins stored at training time (empty for
+    bundles trained without them).
+    """
+    bins = bundle["training_metrics"].get("slice_bins") or {}
+    index = {f: i for i, f in enumerate(bundle["feature_order"])}
+    approved = (probs >= 0.5).astype(np.float64)
+    counts = {}
+    for feature, b in bins.items():
+        if feature not in index:
+            continue
+        codes = bin_codes(X[:, index[feature]], b)
+        keep = codes >= 0
+        codes, n = codes[keep], len(b["labels"])
+        counts[feature] = np.stack([
+            np.bincount(codes, minlength=n),
+            np.bincount(codes, weights=approved[keep], minlength=n),
+            np.bincount(codes, weights=probs[keep], minlength=n),
+        ], axis=1)
+    return counts
+
+
+def slice_stats(bundle, counts):
+    """Per-slice row count, approval rate and mean probability, keyed like the training fairness_slices."""
+    bins = bundle["training_metrics"].get("slice_bins") or {}
     return {
+        feature: {
+            label: {
+                "count": int(count),
+                "approval_rate": float(approvals / count),
+                "mean_probability": float(prob_sum / count),
+            }
+            for label, (count, approvals, prob_sum) in zip(bins[feature]["labels"], c.tolist())
+            if count
+        }
+        for feature, c in counts.items()
+    }
+
+
+def predict_bulk(df: pd.DataFrame, bundle):
+    X = feature_matrix(df, bundle)
+    probs = score_matrix(X, bundle)
+    metrics.count_rows("bulk", len(df))
+    decisions = (probs >= 0.5).astype(int)
+
+    result = {
         "average_probability": float(probs.mean()),
         "approval_rate": float(decisions.mean()),
         "row_count": len(df)
     }
+    counts = slice_counts(bundle, X, probs)
+    if counts:
+        result["batch_fairness_slices"] = slice_stats(bundle, counts)
+    return result
+
+
+def batch_rows(batch):
+    """
+    Applicant rows from a /predict-batch payload: either a list of applicant
+    dicts or a columnar dict of equal-length lists.
+    """
+    if isinstance(batch, list):
+        return batch
+    if isinstance(batch, dict):
+        columns = list(batch.values())
+        if not all(isinstance(col, list) for col in columns):
+            raise ValueError("Columnar input must map each column to a list of values.")
+        lengths = {len(col) for col in columns}
+        if len(lengths) > 1:
+            raise ValueError(f"Columnar input has columns of different lengths: {sorted(lengths)}")
+        return [dict(zip(batch.keys(), values)) for values in zip(*columns)]
+    raise ValueError("Applicants must be a list of objects or an object of column lists.")
 
 
+def validate_applicant(applicant, feature_order):
+    """Feature values in feature_order for one applicant, or an error message."""
+    if not isinstance(applicant, dict):
+        return None, "Applicant must be an object."
+
+    row = {str(k).lower(): v for k, v in applicant.items()}
+    missing = [f for f in feature_order if f not in row]
+    if missing:
+        return None, f"Missing columns in input: {missing}"
+
+    values = []
+    invalid = []
+    for f in feature_order:
+        value = row[f]
+        try:
+            if isinstance(value, str) or value is None:
+                raise TypeError
+            value = float(value)
+        except (TypeError, ValueError):
+            invalid.append(f)
+            continue
+        if not math.isfinite(value):
+            invalid.append(f)
+            continue
+        values.append(value)
+    if invalid:
+        return None, f"Non-numeric values for: {invalid}"
+    return values, None
+
+
+def predict_batch(applicants, bundle):
+    """
+    Scores a list of applicant dicts with a single predict_proba call over the
+    valid ones. Results keep the input order; invalid applicants get an
+    "error" entry instead of failing the batch.
+    """
+    adapter = bundle.get("input_adapter") or build_input_adapter(bundle)
+    X = np.empty((len(applicants), len(adapter.feature_order)), dtype=np.float64)
+    valid = np.zeros(len(applicants), dtype=bool)
+    errors = {}
+
+    # Applicants carry the raw features; derived ones are rebuilt below.
+    for i, applicant in enumerate(applicants):
+        values, error = validate_applicant(applicant, adapter.input_features)
+        if error is not None:
+            errors[i] = error
+            continue
+        X[i, adapter.input_index] = values
+        valid[i] = True
+
+    probs = score_matrix(adapter.derive(X[valid]), bundle) if valid.any() else np.empty(0)
+    metrics.count_rows("batch", len(probs))
+    probs = iter(probs.tolist())
+
+    results = []
+    for i in range(len(applicants)):
+        if i in errors:
+            results.append({"index": i, "error": errors[i]})
+            continue
+        prob = next(probs)
+        results.append({"index": i, "probability": prob, "approved": int(prob >= 0.5)})
+
+    return {
+        "results": results,
+        "scored_count": int(valid.sum()),
+        "error_count": len(errors),
+    }
+
+
+def upload_columns(bundle, id_column=None):
+    """(columns, dtypes) to read from an upload: the bundle's features plus the id column."""
+    adapter = bundle.get("input_adapter") or build_input_adapter(bundle)
+    columns, dtypes = adapter.source_columns()
+    if id_column:
+        columns = columns | {id_column.lower().strip()}
+    return columns, dtypes
+
+
+def read_upload(source, bundle, file_format="csv"):
+    """The columns of an upload the bundle needs, timed as the "parsing" stage."""
+    columns, dtypes = upload_columns(bundle)
+    with metrics.stage("parsing"):
+        return read_table(source, file_format, columns, dtypes)
+
+
+def read_chunks(source, bundle, chunk_size=BULK_CHUNK_SIZE, file_format="csv", id_column=None):
+    """The upload in chunks of chunk_size rows, timing the parse of each chunk as the "parsing" stage."""
+    columns, dtypes = upload_columns(bundle, id_column)
+    reader = iter_frames(source, file_format, columns, dtypes, chunk_size)
+    while True:
+        with metrics.stage("parsing"):
+            chunk = next(reader, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def predict_bulk_chunked(source, bundle, chunk_size=BULK_CHUNK_SIZE, file_format="csv"):
+    """
+    Same aggregates as predict_bulk, but reads the upload chunk_size rows at a
+    time and only keeps running totals, so memory does not grow with the file.
+    """
+    prob_sums = []
+    approved = 0
+    row_count = 0
+    counts = {}
+
+    for chunk in read_chunks(source, bundle, chunk_size, file_format):
+        if len(chunk) == 0:
+            continue
+        X = feature_matrix(chunk, bundle)
+        probs = score_matrix(X, bundle)
+        metrics.count_rows("stream", len(chunk))
+        prob_sums.append(float(probs.sum()))
+        approved += int((probs >= 0.5).sum())
+        row_count += len(chunk)
+        for feature, c in slice_counts(bundle, X, probs).items():
+            counts[feature] = counts[feature] + c if feature in counts else c
+
+    if row_count == 0:
+        raise ValueError("Uploaded file contains no rows.")
+
+    result = {
+        "average_probability": math.fsum(prob_sums) / row_count,
+        "approval_rate": approved / row_count,
+        "row_count": row_count
+    }
+    if counts:
+        result["batch_fairness_slices"] = slice_stats(bundle, counts)
+    return result
+
+
+def iter_scored_rows(source, bundle, output_format="csv", id_column=None, chunk_size=BULK_CHUNK_SIZE,
+                     file_format="csv"):
+    """
+    Yields the scored upload as CSV or NDJSON text, one chunk at a time, with
+    one output row per input row (row index, optional id column, probability,
+    approved).
+    """
+    if output_format not in ("csv", "ndjson"):
+        raise ValueError(f"Unsupported output format: {output_format}")
+
+    wanted_id = id_column.lower().strip() if id_column else None
+    # Checked against the header before any row is read or written.
+    if wanted_id and wanted_id not in {normalize(c) for c in column_names(source, file_format)}:
+        raise ValueError(f"ID column not found in input: {id_column}")
+    id_position = None
+    row_offset = 0
+    first = True
+
+    for chunk in read_chunks(source, bundle, chunk_size, file_format, id_column):
+        if len(chunk) == 0:
+            continue
+        if wanted_id and id_position is None:
+            id_position = [normalize(c) for c in chunk.columns].index(wanted_id)
+
+        probs = score_frame(chunk, bundle)
+        metrics.count_rows("rows", len(chunk))
+
+        out = pd.DataFrame({"row": np.arange(row_offset, row_offset + len(chunk))})
+        if wanted_id:
+            out[wanted_id] = chunk.iloc[:, id_position].to_numpy()
+        out["probability"] = probs
+        out["approved"] = (probs >= 0.5).astype(int)
+
+        if output_format == "csv":
+            yield out.to_csv(index=False, header=first)
+        else:
+            lines = out.to_json(orient="records", lines=True)
+            yield lines if lines.endswith("\n") else lines + "\n"
+
+        row_offset += len(chunk)
+        first = False
+
 
 def predict(payload_or_df, model_type="logistic_regression", bias_flag=False):
     bundle = load_model_bundle(model_type, bias_flag=bias_flag)
@@ -125,6 +488,43 @@ def predict(payload_or_df, model_type="logistic_regression", bias_flag=False):
     else:
         raise ValueError("Unsupported input type. Provide dict or DataFrame.")
 
+
+def predict_many(batch, model_type="logistic_regression", bias_flag=False, max_items=None):
+    applicants = batch_rows(batch)
+    if max_items is not None and len(applicants) > max_items:
+        raise ValueError(f"Batch has {len(applicants)} applicants; the limit is {max_items}.")
+    bundle = load_model_bundle(model_type, bias_flag=bias_flag)
+    return {
+        **predict_batch(applicants, bundle),
+        "model_metrics": bundle["training_metrics"]
+    }
+
+
+def predict_file(source, model_type="logistic_regression", bias_flag=False, file_format="csv"):
+    bundle = load_model_bundle(model_type, bias_flag=bias_flag)
+    bulk = predict_bulk(read_upload(source, bundle, file_format), bundle)
+    return {
+        **bulk,
+        **bundle["training_metrics"]
+    }
+
+
+def predict_stream(source, model_type="logistic_regression", bias_flag=False, chunk_size=BULK_CHUNK_SIZE,
+                   file_format="csv"):
+    bundle = load_model_bundle(model_type, bias_flag=bias_flag)
+    bulk = predict_bulk_chunked(source, bundle, chunk_size=chunk_size, file_format=file_format)
+    return {
+        **bulk,
+        **bundle["training_metrics"]
+    }
+
+
+def predict_rows(source, model_type="logistic_regression", bias_flag=False,
+                 output_format="csv", id_column=None, chunk_size=BULK_CHUNK_SIZE, file_format="csv"):
+    bundle = load_model_bundle(model_type, bias_flag=bias_flag)
+    return iter_scored_rows(source, bundle, output_format=output_format,
+                            id_column=id_column, chunk_size=chunk_size, file_format=file_format)
+
 if __name__ == "__main__":
     # Example usage
     sample_payload = {
@@ -0,0 +1,61 @@
+import threading
+from collections import OrderedDict
+
+
+# ============================================================
+# ON-DEMAND EXPLANATION ARTIFACTS
+# ============================================================
+
+class ExplanationStore:
+    """
+    Keeps the explain state of recent analyses (see loan_model.fit_and_analyze)
+    so SHAP and tree images can be produced on request instead of on every
+    /analyze call. Artifacts are computed at most once per analysis and kept
+    alongside the state; the least recently used analyses are evicted first.
+    """
+
+    def __init__(self, max_entries=32, builder=None):
+        self.max_entries = max_entries
+        self.builder = builder
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, analysis_id):
+        with self._lock:
+            return analysis_id in self._entries
+
+    def put(self, analysis_id, state):
+        with self._lock:
+            if analysis_id in self._entries:
+                self._entries.move_to_end(analysis_id)
+                return
+            self._entries[analysis_id] = {
+                "state": state,
+                "artifacts": {},
+                "lock": threading.Lock(),
+            }
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_artifacts(self, analysis_id, include=("shap", "tree")):
+        """Requested artifacts for an analysis, or None if it is unknown or evicted."""
+        with self._lock:
+            entry = self._entries.get(analysis_id)
+            if entry is None:
+                return None
+            self._entries.move_to_end(analysis_id)
+
+        # Per-analysis lock: concurrent requests for the same analysis wait for
+        # the first one instead of all running SHAP.
+        with entry["lock"]:
+            missing = [name for name in include if f"{name}_image" not in entry["artifacts"]]
+            if missing:
+                built = self.builder(entry["state"], include=missing)
+                for name in missing:
+                    # None is cached too (e.g. no tree image for a logistic model)
+                    entry["artifacts"][f"{name}_image"] = built.get(f"{name}_image")
+            return {
+                f"{name}_image": entry["artifacts"].get(f"{name}_image")
+                for name in include
+            }
@@ -6,33 +6,213 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
 from sklearn.tree import DecisionTreeClassifier, export_text
 from sklearn.metrics import accuracy_score
-from fairlearn.metrics import MetricFrame, selection_rate
-import shap
 import base64
 from io import BytesIO
-import matplotlib
-matplotlib.use("Agg")  # Use headless backend BEFORE importing pyplot
-import matplotlib.pyplot as plt
+from fairness.bootstrap import bootstrap_intervals
+from fairness.slice_engine import compute_slices
+from ingest.tabular import column_spec, read_table
+from config import (
+    SHAP_BACKGROUND_SIZE, SHAP_EXPLAIN_SIZE, SHAP_TREE_ALGORITHM,
+    BOOTSTRAP_REPLICATES, BOOTSTRAP_CONFIDENCE, BOOTSTRAP_WORKERS, BOOTSTRAP_MAX_GROUPS,
+)
 
 
-def train_and_analyze(df, model_type, bias_threshold=0.15):
+# ============================================================
+# EXPLANATION ARTIFACTS
+# ============================================================
+#
+# shap and matplotlib are imported on first use: together they cost seconds
+# of import time, and analyses with explain=False never touch them.
+
+def _shap():
+    import shap
+    return shap
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")  # Use headless backend BEFORE importing pyplot
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def stratified_sample_index(labels, n, seed=42):
+    """
+    Row positions of a size-n sample that keeps the class proportions of
+    labels, in original order. Returns every position when n >= len(labels).
+    """
+    labels = np.asarray(labels)
+    if n is None or n >= len(labels):
+        return np.arange(len(labels))
+
+    classes, counts = np.unique(labels, return_counts=True)
+    quotas = np.floor(counts / len(labels) * n).astype(int)
+    # hand out what flooring lost to the largest classes first
+    for i in np.argsort(-counts)[: n - quotas.sum()]:
+        quotas[i] += 1
+
+    rng = np.random.default_rng(seed)
+    picked = [
+        rng.choice(np.flatnonzero(labels == c), size=min(q, cnt), replace=False)
+        for c, q, cnt in zip(classes, quotas, counts)
+    ]
+    return np.sort(np.concatenate(picked))
+
+
+def compute_shap_values(model, background, data, background_labels=None, data_labels=None):
+    """
+    SHAP values for data, using background as the reference set.
+
+    Both sets are capped by stratified sampling (SHAP_BACKGROUND_SIZE,
+    SHAP_EXPLAIN_SIZE). LogisticRegression gets exact linear attributions in
+    closed form, coef * (x - mean(background)) in log-odds space, which is
+    what the generic linear explainer computes. DecisionTreeClassifier uses
+    interventional TreeExplainer against the same capped background; with
+    SHAP_TREE_ALGORITHM="path_dependent" it skips the background and uses the
+    tree's training cover instead, which is faster but not conditioned on
+    the stratified reference set. Anything else falls back to the generic
+    shap.Explainer.
+    """
+    shap = _shap()
+    feature_names = list(data.columns) if hasattr(data, "columns") else None
+    background = np.asarray(background, dtype=float)
+    data = np.asarray(data, dtype=float)
+
+    # without labels every row is one stratum, i.e. a plain random sample
+    if background_labels is None:
+        background_labels = np.zeros(len(background))
+    if data_labels is None:
+        data_labels = np.zeros(len(data))
+    background = background[stratified_sample_index(background_labels, SHAP_BACKGROUND_SIZE)]
+    data = data[stratified_sample_index(data_labels, SHAP_EXPLAIN_SIZE)]
+
+    if isinstance(model, LogisticRegression) and model.coef_.shape[0] == 1:
+        coef = model.coef_[0]
+        mean = background.mean(axis=0)
+        return shap.Explanation(
+            values=(data - mean) * coef,
+            base_values=np.full(len(data), float(model.intercept_[0] + coef @ mean)),
+            data=data,
+            feature_names=feature_names,
+        )
+
+    if isinstance(model, DecisionTreeClassifier):
+        if SHAP_TREE_ALGORITHM == "path_dependent":
+            explainer = shap.TreeExplainer(model, feature_perturbation="tree_path_dependent")
+        else:
+            explainer = shap.TreeExplainer(model, data=background, feature_perturbation="interventional")
+        shap_values = explainer(data)
+        shap_values.feature_names = feature_names
+        return shap_values
+
+    explainer = shap.Explainer(model, background, feature_names=feature_names)
+    return explainer(data)
+
+
+def render_shap_image(shap_values, data, feature_names):
+    plt = _pyplot()
+    plt.figure()
+    _shap().summary_plot(shap_values, pd.DataFrame(data, columns=feature_names), show=False)
+
+    buf = BytesIO()
+    plt.savefig(buf, format="png", bbox_inches='tight', dpi=150)
+    plt.close()  # Close plot to free memory
+    return base64.b64encode(buf.getvalue()).decode('utf-8')
+
+
+def render_tree_image(model, feature_names):
+    plt = _pyplot()
+    plt.figure(figsize=(20, 10))
+    tree.plot_tree(
+        model,
+        feature_names=list(feature_names),
+        class_names=["Rejected", "Approved"],
+        filled=True,
+        rounded=True,
+    )
+    buf_tree = BytesIO()
+    plt.savefig(buf_tree, format="png", bbox_inches="tight", dpi=150)
+    plt.close()
+    return base64.b64encode(buf_tree.getvalue()).decode("utf-8")
+
+
+def build_explanations(state, include=("shap", "tree"), progress=None):
+    """
+    Heavy artifacts for a fitted analysis (see fit_and_analyze's explain state):
+    the SHAP summary plot and, for trees, the rendered tree. Reuses the fitted
+    model; nothing is retrained. progress, if given, is called with "shap"
+    and "plot_render" as those steps start.
+    """
+    report = progress or (lambda stage: None)
+    artifacts = {}
+    shap_values = None
+    if "shap" in include:
+        report("shap")
+        shap_values = compute_shap_values(
+            state["model"], state["background"], state["explain_data"],
+            background_labels=state.get("background_labels"),
+            data_labels=state.get("explain_labels"),
+        )
+    report("plot_render")
+    if shap_values is not None:
+        artifacts["shap_image"] = render_shap_image(shap_values, shap_values.data, state["feature_names"])
+    if "tree" in include and state["model_type"] == "tree":
+        artifacts["tree_image"] = render_tree_image(state["model"], state["feature_names"])
+    return artifacts
+
+
+# ============================================================
+# TRAIN + ANALYZE
+# ============================================================
+
+# Accepted header names (lower-cased) of the columns the analysis uses
+COLUMN_MAP = {
+    "age": ["age"],
+    "income": ["job"],
+    "loan_amount": ["credit amount", "creditamount"],
+    "credit_score": ["duration"],
+    "gender": ["sex"],
+    "approved": ["risk"]
+}
+
+# Parsed as text; the numeric columns keep their inferred types (job is factorized)
+COLUMN_DTYPES = {"gender": "string", "approved": "string"}
+
+
+def read_dataset(source, file_format="csv"):
+    """The columns of an uploaded CSV / Parquet / Arrow file that the analysis reads."""
+    return read_table(source, file_format, *column_spec(COLUMN_MAP, COLUMN_DTYPES))
+
+
+def train_and_analyze(df, model_type, bias_threshold=0.15, progress=None, explain=True):
     """
     Trains the model, calculates metrics, and returns all results,
     including a base64 encoded image of the SHAP plot and fairness slices
     across multiple attributes (gender, job, age, credit, duration).
+
+    progress, if given, is called with the name of each stage as it starts
+    (preprocessing, training, fairness, bootstrap, shap, plot_render).
+    """
+    results, _ = fit_and_analyze(df, model_type, bias_threshold=bias_threshold,
+                                 progress=progress, explain=explain)
+    return results
+
+
+def fit_and_analyze(df, model_type, bias_threshold=0.15, progress=None, explain=True):
+    """
+    Same as train_and_analyze, but also returns the explain state (fitted
+    model, SHAP background and explained rows, feature names) so the SHAP and
+    tree images can be produced later with build_explanations(). With
+    explain=False those stages are skipped and the images are None.
     """
+    report = progress or (lambda stage: None)
+
+    report("preprocessing")
     df = df.copy()
     df.columns = [c.strip().lower() for c in df.columns]
 
     # --- Data Mapping and Preparation (Identical to your original code) ---
-    column_map = {
-        "age": ["age"],
-        "income": ["job"],
-        "loan_amount": ["credit amount", "creditamount"],
-        "credit_score": ["duration"],
-        "gender": ["sex"],
-        "approved": ["risk"]
-    }
+    column_map = COLUMN_MAP
 
     def find_col(possible_names):
         for name in possible_names:
@@ -48,7 +228,7 @@ def train_and_analyze(df, model_type, bias_threshold=0.15):
         gender_col = find_col(column_map["gender"])
         approved_col = find_col(column_map["approved"])
     except KeyError as e:
-        return {"error": str(e)}, None, None, None
+        return {"error": str(e)}, None
 
     # Prepare X, y
     X = df[[age_col, income_col, loan_col, credit_col]].copy()
@@ -62,9 +242,8 @@ def train_and_analyze(df, model_type, bias_threshold=0.15):
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     scaler = StandardScaler()
 
-    tree_image_base64 = None
-
     # --- Model Training ---
+    report("training")
     if model_type == "logistic":
         feature_names = X_train.columns
 
@@ -94,10 +273,7 @@ def train_and_analyze(df, model_type, bias_threshold=0.15):
             "Negative coefficients reduce the odds (e.g., longer loan duration or higher loan amount)."
         )
         # Explainer for Logistic Regression uses scaled data
-        explainer = shap.Explainer(model, X_train_scaled_df)
-        shap_values = explainer(X_test_scaled_df)
-
-        shap_data_for_plot = (shap_values, X_test_scaled_df)
+        shap_background, shap_explain_data = X_train_scaled_df, X_test_scaled_df
 
     else:  # Decision Tree
         model = DecisionTreeClassifier(max_depth=5, random_state=42)
@@ -109,27 +285,18 @@ def train_and_analyze(df, model_type, bias_threshold=0.15):
         decision_logic = "Decision tree rules:\n" + tree_rules
 
         # Explainer for Decision Tree uses unscaled data
-        explainer = shap.Explainer(model, X_train)
-        shap_values = explainer(X_test)
-        shap_data_for_plot = (shap_values, X_test)
-
-        # --- Decision Tree Visualization (sklearn) ---
-        plt.figure(figsize=(20, 10))
-        tree.plot_tree(
-            model,
-            feature_names=list(X.columns),
-            class_names=["Rejected", "Approved"],
-            filled=True,
-            rounded=True,
-        )
-        buf_tree = BytesIO()
-        plt.savefig(buf_tree, format="png", bbox_inches="tight", dpi=150)
-        plt.close()
-        tree_image_base64 = base64.b64encode(buf_tree.getvalue()).decode("utf-8")
+        shap_background, shap_explain_data = X_train, X_test
 
+    explain_state = {
+        "model": model,
+        "model_type": model_type,
+        "background": shap_background,
+        "explain_data": shap_explain_data,
+        "background_labels": y_train.to_numpy(),
+        "explain_labels": y_test.to_numpy(),
+        "feature_names": list(X.columns),
+    }
 
-    def safe_div(a, b):
-        return float(a / b) if b not in (0, None) else None
 
     def to_py(v):
         """Convert numpy / pandas types to native Python types recursively where needed."""
@@ -150,62 +317,7 @@ def train_and_analyze(df, model_type, bias_threshold=0.15):
         return to_py(d)
 
     # --- Fairness: single-feature gender (legacy) & grouped confusion metrics ---
-    sensitive_features_gender = X_test["gender"]
-
-    mf_gender = MetricFrame(
-        metrics={"selection_rate": selection_rate, "accuracy": accuracy_score},
-        y_true=y_test,
-        y_pred=y_pred,
-        sensitive_features=sensitive_features_gender
-    )
-
-    # Build confusion metrics helper
-    def build_confusion_metrics_for_series(series):
-        """
-        series: pandas Series aligned with X_test index; values are group identifiers
-        returns dict of per-group confusion metrics and summary differences
-        """
-        series = series.reindex(X_test.index)  # align just in case
-        fairness_extra_local = {}
-        for g in sorted(series.unique(), key=lambda x: (str(x))):
-            mask = (series == g)
-            y_true_g = y_test[mask]
-            # y_pred is numpy aligned to X_test ordering; create aligned series
-            y_pred_series = pd.Series(y_pred, index=X_test.index)
-            y_pred_g = y_pred_series[mask]
-
-            tp = int(((y_pred_g == 1) & (y_true_g == 1)).sum())
-            tn = int(((y_pred_g == 0) & (y_true_g == 0)).sum())
-            fp = int(((y_pred_g == 1) & (y_true_g == 0)).sum())
-            fn = int(((y_pred_g == 0) & (y_true_g == 1)).sum())
-
-            tpr = safe_div(tp, tp + fn)
-            fpr = safe_div(fp, fp + tn)
-            tnr = safe_div(tn, tn + fp)
-            fnr = safe_div(fn, fn + tp)
-            precision = safe_div(tp, tp + fp)
-            npv = safe_div(tn, tn + fn)
-            fdr = safe_div(fp, tp + fp)
-            forr = safe_div(fn, tn + fn)
-
-            fairness_extra_local[str(g)] = {
-                "TP": tp,
-                "TN": tn,
-                "FP": fp,
-                "FN": fn,
-                "TPR": tpr,
-                "FPR": fpr,
-                "TNR": tnr,
-                "FNR": fnr,
-                "Precision": precision,
-                "Negative_Predictive_Value": npv,
-                "False_Discovery_Rate": fdr,
-                "False_Omission_Rate": forr,
-            }
-
-        # Make sure all values are native python types
-        fairness_extra_local = clean_dict(fairness_extra_local)
-        return fairness_extra_local
+    report("fairness")
 
     # -------------------------
     # Multi-attribute fairness slices
@@ -235,87 +347,72 @@ def train_and_analyze(df, model_type, bias_threshold=0.15):
         #"duration_raw": X_test[credit_col].astype(str),
     }
 
-    # compute each slice
-    for slice_name, series in slice_features.items():
-        # ensure series has same index as X_test
-        series = pd.Series(series, index=X_test.index)
-        # MetricFrame per slice
-        mf = MetricFrame(
-            metrics={"selection_rate": selection_rate, "accuracy": accuracy_score},
-            y_true=y_test,
-            y_pred=y_pred,
-            sensitive_features=series
+    # All slices in one counting pass; groups are sorted the way MetricFrame's
+    # groupby used to order them. The gender slice doubles as the legacy
+    # single-feature fairness axis.
+    slice_results = compute_slices(slice_features, y_test, y_pred, sort=True)
+    gender_summary = slice_results["gender"]["summary"]
+
+    # Percentile bootstrap intervals for the slice metrics; the test split is
+    # small, so single groups move the point estimates a lot.
+    intervals = {}
+    if BOOTSTRAP_REPLICATES > 0:
+        report("bootstrap")
+        intervals = bootstrap_intervals(
+            {name: sliced["counts"] for name, sliced in slice_results.items()},
+            replicates=BOOTSTRAP_REPLICATES,
+            confidence=BOOTSTRAP_CONFIDENCE,
+            max_workers=BOOTSTRAP_WORKERS,
+            max_groups=BOOTSTRAP_MAX_GROUPS,
         )
 
-        by_group = clean_dict(mf.by_group.to_dict())  # numeric types fixed
-        # selection rate gap for this slice
-        try:
-            sel_rates = [v for v in (mf.by_group["selection_rate"].values if hasattr(mf.by_group["selection_rate"], "values") else list(mf.by_group["selection_rate"])) if v is not None]
-            sel_gap = float(max(sel_rates) - min(sel_rates)) if len(sel_rates) > 1 else 0.0
-        except Exception:
-            # fallback using dict values
-            try:
-                sr_vals = [float(v) for v in mf.by_group["selection_rate"].to_dict().values()]
-                sel_gap = float(max(sr_vals) - min(sr_vals)) if len(sr_vals) > 1 else 0.0
-            except Exception:
-                sel_gap = None
-
-        # confusion metrics per group (TP/TN/FP/FN etc.)
-        confusion_per_group = build_confusion_metrics_for_series(series)
-
-        # equal opportunity difference (TPR gap) and average odds (mean of TPR/FPR gaps)
-        tpr_list = [v.get("TPR") for v in confusion_per_group.values() if v.get("TPR") is not None]
-        fpr_list = [v.get("FPR") for v in confusion_per_group.values() if v.get("FPR") is not None]
-        equal_opp_diff = float(max(tpr_list) - min(tpr_list)) if len(tpr_list) > 1 else None
-        avg_odds = float(((max(tpr_list) - min(tpr_list)) + (max(fpr_list) - min(fpr_list))) / 2) if (len(tpr_list) > 1 and len(fpr_list) > 1) else None
-
-        # statistical parity ratio (min / max selection rate) and demographic parity difference
-        try:
-            sel_vals = [v for v in mf.by_group["selection_rate"].tolist() if v is not None]
-            stat_parity_ratio = float(min(sel_vals) / max(sel_vals)) if (len(sel_vals) > 1 and max(sel_vals) != 0) else None
-            demographic_parity_diff = float(max(sel_vals) - min(sel_vals)) if len(sel_vals) > 1 else 0.0
-        except Exception:
-            stat_parity_ratio = None
-            demographic_parity_diff = None
+    for slice_name, sliced in slice_results.items():
+        groups = [str(g) for g in sliced["groups"]]
+        metrics = sliced["metrics"]
+        summary = sliced["summary"]
 
         fairness_slices[slice_name] = {
-            "by_group": by_group,
-            #"fairness_confusion_metrics": confusion_per_group,
-            "selection_rate_gap": to_py(sel_gap) if sel_gap is not None else None,
-            "demographic_parity_difference": to_py(demographic_parity_diff),
-            "statistical_parity_ratio": to_py(stat_parity_ratio),
-            "equal_opportunity_difference": to_py(equal_opp_diff),
-            "average_odds_difference": to_py(avg_odds),
+            "by_group": {
+                "selection_rate": dict(zip(groups, metrics["selection_rate"])),
+                "accuracy": dict(zip(groups, metrics["accuracy"])),
+            },
+            #"fairness_confusion_metrics": {g: {k: metrics[k][i] for k in metrics if k != "count"} for i, g in enumerate(groups)},
+            "selection_rate_gap": summary["selection_rate_gap"],
+            "demographic_parity_difference": summary["demographic_parity_difference"],
+            "statistical_parity_ratio": summary["statistical_parity_ratio"],
+            "equal_opportunity_difference": summary["equal_opportunity_difference"],
+            "average_odds_difference": summary["average_odds_difference"],
         }
+        if slice_name in intervals:
+            fairness_slices[slice_name]["confidence_intervals"] = intervals[slice_name]
 
     # Clean the final fairness_slices dict keys/values to be JSON-safe
     fairness_slices = clean_dict(fairness_slices)
 
-    # --- SHAP Plot Generation (Image as Base64) ---
-    plt.figure()
-    shap.summary_plot(shap_data_for_plot[0], pd.DataFrame(shap_data_for_plot[1], columns=X.columns), show=False)
-
-    buf = BytesIO()
-    plt.savefig(buf, format="png", bbox_inches='tight', dpi=150)
-    plt.close()  # Close plot to free memory
-    shap_image_base64 = base64.b64encode(buf.getvalue()).decode('utf-8')
+    # --- SHAP Plot + Tree Visualization (Images as Base64) ---
+    artifacts = {}
+    if explain:
+        artifacts = build_explanations(explain_state, progress=report)
 
     # --- Final Results Dictionary ---
     results = {
         "accuracy": float(accuracy_score(y_test, y_pred)),
-        "selection_rate_gap": to_py(float(max(mf_gender.by_group["selection_rate"]) - min(mf_gender.by_group["selection_rate"]))) if len(mf_gender.by_group["selection_rate"]) > 1 else 0.0,
-        #"metrics_by_gender": clean_dict(mf_gender.by_group.to_dict()),
-        "bias_flag": bool((max(mf_gender.by_group["selection_rate"]) - min(mf_gender.by_group["selection_rate"])) > bias_threshold) if len(mf_gender.by_group["selection_rate"]) > 1 else False,
+        "selection_rate_gap": gender_summary["selection_rate_gap"],
+        "bias_flag": bool(gender_summary["selection_rate_gap"] > bias_threshold),
         "model_type": model_type,
         "equation": equation_str,
         "coefficients": clean_dict(coef_df.to_dict(orient="records")) if coef_df is not None else None,
         "decision_logic": decision_logic,
-        "tree_image": tree_image_base64 if model_type == "tree" else None,
-        "shap_image": shap_image_base64,
+        "tree_image": artifacts.get("tree_image") if model_type == "tree" else None,
+        "shap_image": artifacts.get("shap_image"),
         #"fairness_confusion_metrics": build_confusion_metrics_for_series(X_test["gender"].astype(str)),
-        "demographic_parity_difference": to_py(float(max(mf_gender.by_group["selection_rate"]) - min(mf_gender.by_group["selection_rate"]))) if len(mf_gender.by_group["selection_rate"]) > 1 else 0.0,
-        "statistical_parity_ratio": to_py(float(min(mf_gender.by_group["selection_rate"]) / max(mf_gender.by_group["selection_rate"]))) if len(mf_gender.by_group["selection_rate"]) > 1 and max(mf_gender.by_group["selection_rate"]) != 0 else None,
-        "fairness_slices": fairness_slices
+        "demographic_parity_difference": gender_summary["demographic_parity_difference"],
+        "statistical_parity_ratio": gender_summary["statistical_parity_ratio"],
+        "fairness_slices": fairness_slices,
+        "bootstrap": {
+            "replicates": BOOTSTRAP_REPLICATES,
+            "confidence_level": BOOTSTRAP_CONFIDENCE,
+        } if intervals else None,
     }
 
-    return results
+    return results, explain_state
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+# ============================================================
+# CONTENT-ADDRESSED ANALYSIS RESULT CACHE
+# ============================================================
+
+def hash_upload(stream, chunk_size=1 << 20):
+    """sha256 of an upload stream; the stream is rewound afterwards."""
+    h = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        h.update(chunk)
+    stream.seek(0)
+    return h.hexdigest()
+
+
+def analysis_cache_key(upload_digest, model_type, bias_threshold):
+    return hashlib.sha256(
+        f"{upload_digest}|{model_type}|{float(bias_threshold)!r}".encode("utf-8")
+    ).hexdigest()
+
+
+class ResultCache:
+    """
+    LRU cache of /analyze results keyed by analysis_cache_key().
+
+    Entries expire after ttl seconds and the cache is bounded by the total size
+    of the serialized results (max_bytes). With disk_dir set, results are also
+    written there as <key>.json so they survive restarts; the disk copy has the
+    same TTL and byte bound, evicting the least recently written files first.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, ttl=24 * 3600, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0}
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry["stored_at"] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return json.loads(entry["payload"])
+                self._drop(key)
+
+        payload = self._read_disk(key, now)
+        with self._lock:
+            if payload is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._store(key, payload, now)
+        return json.loads(payload)
+
+    def put(self, key, result):
+        payload = json.dumps(result)
+        now = time.time()
+        with self._lock:
+            self._store(key, payload, now)
+        self._write_disk(key, payload)
+
+    def _store(self, key, payload, stored_at):
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = {"payload": payload, "size": size, "stored_at": stored_at}
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self._stats["evictions"] += 1
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry["size"]
+
+    # -------------------------
+    # Disk tier
+    # -------------------------
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key, now):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            if now - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key, payload):
+        if not self.disk_dir or len(payload) > self.max_bytes:
+            return
+        path = self._disk_path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+        self._prune_disk()
+
+    def _prune_disk(self):
+        now = time.time()
+        files = []
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if now - st.st_mtime > self.ttl:
+                os.remove(path)
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "disk_dir": self.disk_dir,
+            }
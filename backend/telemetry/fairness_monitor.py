@@ -0,0 +1,351 @@
+import json
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+# LIVE FAIRNESS MONITOR
+# ============================================================
+#
+# Selection rates on the traffic actually scored, per model bundle, per
+# sensitive feature group and per time window. Each (bundle, feature) owns a
+# fixed ring of max_windows x max_groups x (count, approvals, probability sum)
+# counters: a window's slot is reused (zeroed) when time moves past it, and
+# group values beyond max_groups - 1 share the last slot ("other"). A batch
+# update is one pd.factorize plus three np.bincount calls per sensitive
+# feature; a single scored row (observe_one) looks its value's slot up in a
+# per-feature cache and bumps the three counters directly.
+#
+# Counters are plain sums, so snapshots of several processes merge by
+# addition. With shared_dir set every process writes its snapshot there as
+# <pid>-<id>.json (at most every flush_interval seconds) and collect() adds up
+# all of them; windows older than the ring fall out of every report.
+
+COUNT, APPROVALS, PROB_SUM = 0, 1, 2
+
+OTHER_GROUP = "other"
+MISSING_GROUP = "missing"
+
+# raw values per feature whose slot observe_one remembers
+VALUE_SLOT_CACHE_SIZE = 1024
+
+
+def group_label(value):
+    """Group key as training stores it in selection_rates ("0", "1", ...)."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return MISSING_GROUP
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def parity(rates):
+    """(selection_rate_gap, statistical_parity_ratio) over group selection rates."""
+    rates = [r for r in rates if r is not None]
+    if len(rates) < 2:
+        return 0.0, None
+    high, low = max(rates), min(rates)
+    return high - low, (low / high if high != 0 else None)
+
+
+class _FeatureCounters:
+    def __init__(self, max_windows, max_groups):
+        self.max_groups = max_groups
+        self.labels = []
+        self._slots = {}
+        self._value_slots = {}
+        self.window_ids = np.full(max_windows, -1, dtype=np.int64)
+        self.counts = np.zeros((max_windows, max_groups, 3), dtype=np.float64)
+
+    def slot(self, label):
+        slot = self._slots.get(label)
+        if slot is None:
+            if len(self.labels) >= self.max_groups - 1:
+                return self.max_groups - 1
+            slot = self._slots[label] = len(self.labels)
+            self.labels.append(label)
+        return slot
+
+    def value_slot(self, value):
+        """slot(group_label(value)), cached per raw value (keyed with its type: 1 == True)."""
+        key = (type(value), value)
+        try:
+            slot = self._value_slots.get(key)
+        except TypeError:  # unhashable
+            return self.slot(group_label(value))
+        if slot is None:
+            slot = self.slot(group_label(value))
+            if len(self._value_slots) < VALUE_SLOT_CACHE_SIZE:
+                self._value_slots[key] = slot
+        return slot
+
+    def _window_cells(self, window):
+        ring = window % len(self.window_ids)
+        if self.window_ids[ring] != window:
+            self.window_ids[ring] = window
+            self.counts[ring] = 0.0
+        return self.counts[ring]
+
+    def add_one(self, window, value, prob, approved):
+        slot = self.value_slot(value)
+        cells = self._window_cells(window)
+        cells[slot, COUNT] += 1.0
+        cells[slot, APPROVALS] += approved
+        cells[slot, PROB_SUM] += prob
+
+    def add(self, window, groups, probs, approved):
+        codes, uniques = groups
+        labels = [group_label(v) for v in uniques]
+        if (codes < 0).any():
+            labels.append(MISSING_GROUP)  # code -1 picks this last entry
+        slots = np.array([self.slot(label) for label in labels], dtype=np.int64)[codes]
+
+        cells = self._window_cells(window)
+        cells[:, COUNT] += np.bincount(slots, minlength=self.max_groups)
+        cells[:, APPROVALS] += np.bincount(slots, weights=approved, minlength=self.max_groups)
+        cells[:, PROB_SUM] += np.bincount(slots, weights=probs, minlength=self.max_groups)
+
+    def snapshot(self, oldest_window):
+        """{label: {window id: [count, approvals, probability sum]}} for windows >= oldest_window."""
+        labels = self.labels + ([OTHER_GROUP] * (self.max_groups - len(self.labels)))
+        out = {}
+        for ring, window in enumerate(self.window_ids.tolist()):
+            if window < oldest_window:
+                continue
+            for slot in np.flatnonzero(self.counts[ring, :, COUNT]).tolist():
+                out.setdefault(labels[slot], {})[str(window)] = self.counts[ring, slot].tolist()
+        return out
+
+
+class FairnessMonitor:
+    """
+    Live per-group selection rates for scored rows, see the module notes.
+
+    observe() takes the bundle's sensitive feature values for the scored rows
+    and their approval probabilities; report() turns a (merged) snapshot into
+    selection rates, gaps and parity ratios next to the training-time values.
+    """
+
+    def __init__(self, window_seconds=300, max_windows=12, max_groups=16, shared_dir=None,
+                 flush_interval=10.0, threshold=0.5):
+        if max_groups < 2:
+            raise ValueError("max_groups must be at least 2.")
+        self.window_seconds = window_seconds
+        self.max_windows = max_windows
+        self.max_groups = max_groups
+        self.shared_dir = shared_dir
+        self.flush_interval = flush_interval
+        self.threshold = threshold
+
+        self._models = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = 0.0
+        self._name = None
+        self._name_pid = None
+
+    def window_of(self, now):
+        return int(now // self.window_seconds)
+
+    def observe(self, model_key, sensitive, probs, training=None, now=None):
+        """
+        sensitive: {feature: values per scored row}; probs: approval
+        probabilities of the same rows. training: the bundle's training-time
+        fairness values ({"feature": axis, "selection_rates": ...}), reported
+        next to the live values of that feature.
+        """
+        probs = np.asarray(probs, dtype=np.float64)
+        if not len(probs) or not sensitive:
+            return
+        now = time.time() if now is None else now
+        window = self.window_of(now)
+        approved = (probs >= self.threshold).astype(np.float64)
+        groups = {feature: pd.factorize(np.asarray(values), use_na_sentinel=True)
+                  for feature, values in sensitive.items()}
+
+        with self._lock:
+            features = self._features(model_key, training)
+            for feature, (codes, uniques) in groups.items():
+                self._counters(features, feature).add(window, (codes, list(uniques)), probs, approved)
+
+        if self.shared_dir and now - self._last_flush >= self.flush_interval:
+            self.flush(now)
+
+    def observe_one(self, model_key, values, prob, training=None, now=None):
+        """observe() for a single scored row: values is {feature: value}, prob a float."""
+        if not values:
+            return
+        now = time.time() if now is None else now
+        window = int(now // self.window_seconds)
+        prob = float(prob)
+        approved = 1.0 if prob >= self.threshold else 0.0
+
+        with self._lock:
+            features = self._features(model_key, training)
+            for feature, value in values.items():
+                self._counters(features, feature).add_one(window, value, prob, approved)
+
+        if self.shared_dir and now - self._last_flush >= self.flush_interval:
+            self.flush(now)
+
+    def _features(self, model_key, training):
+        """{feature: counters} of a model, created on first use; call with the lock held."""
+        model = self._models.get(model_key)
+        if model is None:
+            model = self._models[model_key] = {"training": None, "features": {}}
+        if training is not None:
+            model["training"] = training
+        return model["features"]
+
+    def _counters(self, features, feature):
+        counters = features.get(feature)
+        if counters is None:
+            counters = features[feature] = _FeatureCounters(self.max_windows, self.max_groups)
+        return counters
+
+    # -------------------------
+    # Snapshots
+    # -------------------------
+
+    def snapshot(self, now=None):
+        """This process's counters for the windows still in the ring, as plain JSON data."""
+        now = time.time() if now is None else now
+        oldest = self.window_of(now) - self.max_windows + 1
+        with self._lock:
+            models = {
+                key: {
+                    "training": model["training"],
+                    "features": {feature: counters.snapshot(oldest)
+                                 for feature, counters in model["features"].items()},
+                }
+                for key, model in self._models.items()
+            }
+        return {"window_seconds": self.window_seconds, "models": models}
+
+    @staticmethod
+    def merge(snapshots):
+        """Sum of several snapshots (same window_seconds)."""
+        merged = {"window_seconds": None, "models": {}}
+        for snap in snapshots:
+            if merged["window_seconds"] is None:
+                merged["window_seconds"] = snap["window_seconds"]
+            elif snap["window_seconds"] != merged["window_seconds"]:
+                raise ValueError("Cannot merge snapshots with different window sizes.")
+            for key, model in snap["models"].items():
+                target = merged["models"].setdefault(key, {"training": None, "features": {}})
+                if model.get("training") is not None:
+                    target["training"] = model["training"]
+                for feature, groups in model["features"].items():
+                    feature_target = target["features"].setdefault(feature, {})
+                    for label, windows in groups.items():
+                        group_target = feature_target.setdefault(label, {})
+                        for window, cells in windows.items():
+                            current = group_target.get(window)
+                            group_target[window] = ([a + b for a, b in zip(current, cells)]
+                                                    if current is not None else list(cells))
+        return merged
+
+    def _snapshot_name(self):
+        # Forked workers inherit the parent's monitor; each process needs its own file.
+        if self._name_pid != os.getpid():
+            self._name_pid = os.getpid()
+            self._name = f"{self._name_pid}-{uuid.uuid4().hex[:8]}.json"
+        return self._name
+
+    def flush(self, now=None):
+        """Writes this process's snapshot to shared_dir (skipped while another flush runs)."""
+        if not self.shared_dir or not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            now = time.time() if now is None else now
+            self._last_flush = now
+            os.makedirs(self.shared_dir, exist_ok=True)
+            path = os.path.join(self.shared_dir, self._snapshot_name())
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(now), f)
+            os.replace(path + ".tmp", path)
+        finally:
+            self._flush_lock.release()
+
+    def collect(self, now=None):
+        """This process's live snapshot merged with the other processes' files in shared_dir."""
+        now = time.time() if now is None else now
+        snapshots = [self.snapshot(now)]
+        if self.shared_dir and os.path.isdir(self.shared_dir):
+            own = self._snapshot_name()
+            horizon = self.max_windows * self.window_seconds
+            for name in os.listdir(self.shared_dir):
+                if not name.endswith(".json") or name == own:
+                    continue
+                path = os.path.join(self.shared_dir, name)
+                try:
+                    if now - os.path.getmtime(path) > horizon:
+                        os.remove(path)
+                        continue
+                    with open(path, "r", encoding="utf-8") as f:
+                        snapshot = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                # left behind by a process running with another window size
+                if snapshot.get("window_seconds") == self.window_seconds:
+                    snapshots.append(snapshot)
+        return self.merge(snapshots)
+
+    # -------------------------
+    # Reports
+    # -------------------------
+
+    def report(self, snapshot=None, windows=None, now=None):
+        """
+        Live selection rates per model and sensitive feature over the last
+        `windows` windows (all retained ones by default), plus the gap and
+        parity ratio across groups and the bundle's training-time values.
+        """
+        now = time.time() if now is None else now
+        snapshot = self.collect(now) if snapshot is None else snapshot
+        windows = self.max_windows if windows is None else max(1, min(int(windows), self.max_windows))
+        current = self.window_of(now)
+        oldest = current - windows + 1
+
+        models = {}
+        for key, model in sorted(snapshot["models"].items()):
+            features = {}
+            for feature, groups in model["features"].items():
+                live = {}
+                for label, per_window in groups.items():
+                    cells = [c for w, c in per_window.items() if oldest <= int(w) <= current]
+                    if not cells:
+                        continue
+                    count, approvals, prob_sum = (sum(values) for values in zip(*cells))
+                    live[label] = {
+                        "count": int(count),
+                        "approvals": int(approvals),
+                        "selection_rate": approvals / count,
+                        "mean_probability": prob_sum / count,
+                    }
+                # rows without a value or past the group cap are not a group of their own
+                gap, ratio = parity([g["selection_rate"] for label, g in live.items()
+                                     if label not in (MISSING_GROUP, OTHER_GROUP)])
+                features[feature] = {
+                    "groups": dict(sorted(live.items())),
+                    "row_count": sum(g["count"] for g in live.values()),
+                    "selection_rate_gap": gap,
+                    "statistical_parity_ratio": ratio,
+                }
+                training = model.get("training") or {}
+                if training.get("feature") == feature:
+                    features[feature]["training"] = {k: v for k, v in training.items() if k != "feature"}
+            models[key] = features
+
+        return {
+            "window_seconds": self.window_seconds,
+            "windows": windows,
+            "since": oldest * self.window_seconds,
+            "until": now,
+            "models": models,
+        }
@@ -0,0 +1,209 @@
+import bisect
+import threading
+import time
+
+
+# ============================================================
+# PROMETHEUS-STYLE METRICS
+# ============================================================
+#
+# Counters and histograms with a fixed label set, rendered in the Prometheus
+# text exposition format. Every update is a dict lookup, a bisect over the
+# bucket bounds and a few additions under one lock per metric, so the
+# instrumentation can stay on in production.
+
+# seconds; covers single predictions up to full analyses with SHAP
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self):
+        with self._lock:
+            values = dict(self._values)
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_label_text(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        # counts per bucket (not cumulative) plus one overflow slot
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0}
+            series["counts"][slot] += 1
+            series["sum"] += value
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    def collect(self):
+        with self._lock:
+            snapshot = {k: (list(s["counts"]), s["sum"]) for k, s in self._series.items()}
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = _label_text(self.labelnames, key, extra=(("le", _number(float(bound))),))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _label_text(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+# ============================================================
+# APP METRICS
+# ============================================================
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "bias_detector_http_requests_total",
+    "HTTP requests by route, method and status code.",
+    ("route", "method", "status"),
+)
+http_errors = registry.counter(
+    "bias_detector_http_request_errors_total",
+    "HTTP requests that ended in a 5xx response.",
+    ("route", "method"),
+)
+http_latency = registry.histogram(
+    "bias_detector_http_request_duration_seconds",
+    "Time from request start until the response body was fully sent.",
+    ("route",),
+)
+stage_latency = registry.histogram(
+    "bias_detector_stage_duration_seconds",
+    "Time spent in internal pipeline stages (parsing, preprocessing, training, "
+    "fairness, bootstrap, shap, plot_render, scoring, json_serialization).",
+    ("stage",),
+)
+rows_scored = registry.counter(
+    "bias_detector_rows_scored_total",
+    "Applicant rows scored, by prediction path.",
+    ("mode",),
+)
+upload_bytes = registry.counter(
+    "bias_detector_upload_bytes_total",
+    "Request body bytes received, by route.",
+    ("route",),
+)
+
+
+def stage(name):
+    """Context manager timing one internal stage."""
+    return stage_latency.time(stage=name)
+
+
+def observe_stage(name, seconds):
+    stage_latency.observe(seconds, stage=name)
+
+
+def count_rows(mode, n):
+    rows_scored.inc(n, mode=mode)
+
+
+class StageTimer:
+    """
+    Progress callback (see loan_model.fit_and_analyze) that records how long
+    each reported stage ran: a stage ends when the next one is reported or
+    when finish() is called.
+    """
+
+    def __init__(self, forward=None):
+        self.forward = forward
+        self._stage = None
+        self._started = None
+
+    def __call__(self, name):
+        self._close()
+        self._stage, self._started = name, time.perf_counter()
+        if self.forward is not None:
+            self.forward(name)
+
+    def finish(self):
+        self._close()
+        self._stage = None
+
+    def _close(self):
+        if self._stage is not None:
+            stage_latency.observe(time.perf_counter() - self._started, stage=self._stage)
@@ -0,0 +1,131 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+
+
+# ============================================================
+# OPT-IN REQUEST PROFILING
+# ============================================================
+
+class RequestProfiler:
+    """
+    Runs a callable under cProfile and tracemalloc and keeps the report.
+
+    Each profile is written to profile_dir as <id>.json (top functions by
+    cumulative time, top allocation sites, peak traced memory, wall time) and
+    <id>.prof (raw pstats, for snakeviz / pstats). Only the newest max_profiles
+    are kept. tracemalloc is process-wide, so one profile runs at a time;
+    run() returns report None when another one is in progress.
+    """
+
+    def __init__(self, profile_dir, max_profiles=50, top_n=30):
+        self.profile_dir = profile_dir
+        self.max_profiles = max_profiles
+        self.top_n = top_n
+        self._busy = threading.Lock()
+
+    def run(self, fn, label="request"):
+        """Returns (fn's result, report dict or None)."""
+        if not self._busy.acquire(blocking=False):
+            return fn(), None
+        try:
+            return self._profile(fn, label)
+        finally:
+            self._busy.release()
+
+    def _profile(self, fn, label):
+        now = time.time()
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}{int(now % 1 * 1000):03d}-{uuid.uuid4().hex[:8]}"
+        profiler = cProfile.Profile()
+        tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            profiler.enable()
+            try:
+                result = fn()
+            finally:
+                profiler.disable()
+            wall = time.perf_counter() - started
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        report = {
+            "profile_id": profile_id,
+            "label": label,
+            "created_at": time.time(),
+            "wall_seconds": wall,
+            "peak_traced_bytes": peak,
+            "top_functions": self._top_functions(profiler),
+            "top_allocations": self._top_allocations(snapshot),
+        }
+        self._save(profile_id, profiler, report)
+        return result, report
+
+    def _top_functions(self, profiler):
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        rows = []
+        for (filename, line, name), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({
+                "function": f"{filename}:{line}({name})",
+                "calls": ncalls,
+                "total_seconds": tottime,
+                "cumulative_seconds": cumtime,
+            })
+        rows.sort(key=lambda r: r["cumulative_seconds"], reverse=True)
+        return rows[: self.top_n]
+
+    def _top_allocations(self, snapshot):
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        return [
+            {"site": str(stat.traceback[0]), "bytes": stat.size, "blocks": stat.count}
+            for stat in snapshot.statistics("lineno")[: self.top_n]
+        ]
+
+    # -------------------------
+    # Storage
+    # -------------------------
+
+    def _save(self, profile_id, profiler, report):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        profiler.dump_stats(os.path.join(self.profile_dir, f"{profile_id}.prof"))
+        path = os.path.join(self.profile_dir, f"{profile_id}.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        os.replace(path + ".tmp", path)
+        self._prune()
+
+    def _prune(self):
+        reports = sorted(name for name in os.listdir(self.profile_dir) if name.endswith(".json"))
+        # ids start with a timestamp, so name order is age order
+        for name in reports[: max(0, len(reports) - self.max_profiles)]:
+            for ext in (".json", ".prof"):
+                try:
+                    os.remove(os.path.join(self.profile_dir, name[: -len(".json")] + ext))
+                except OSError:
+                    pass
+
+    def list(self):
+        if not os.path.isdir(self.profile_dir):
+            return []
+        return sorted((name[: -len(".json")] for name in os.listdir(self.profile_dir)
+                       if name.endswith(".json")), reverse=True)
+
+    def get(self, profile_id):
+        if os.path.basename(profile_id) != profile_id:
+            return None
+        try:
+            with open(os.path.join(self.profile_dir, f"{profile_id}.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except OSError:
+            return None
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The backend modules import each other from backend/ (and the trainers from
+# backend/train), as they do when run from there.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (BACKEND_DIR, os.path.join(BACKEND_DIR, "train")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,17 @@
+import os
+
+import joblib
+import pytest
+
+from predict.artifact import bundle_dirs, verify_round_trip
+from predict.predict_data import MODEL_DIR
+
+TOLERANCE = 1e-12
+
+
+@pytest.mark.filterwarnings("ignore::UserWarning")
+@pytest.mark.parametrize("name, bundle_dir", list(bundle_dirs(MODEL_DIR)))
+def test_shipped_artifact_matches_bundle(name, bundle_dir):
+    bundle = joblib.load(os.path.join(bundle_dir, "bundle.pkl"))
+    diffs = verify_round_trip(bundle, bundle_dir)
+    assert all(diff <= TOLERANCE for diff in diffs.values()), f"{name}: {diffs}"
@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.model_selection import train_test_split
+
+import train_biased
+import train_fair
+from predict.predict_data import predict_bulk, predict_bulk_chunked, read_bundle
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.abspath(train_fair.__file__)), "datasets")
+
+VARIANTS = {
+    "fair": (train_fair, "loan_approval_dataset.csv"),
+    "biased": (train_biased, "german_credit_data.csv"),
+}
+
+
+@pytest.fixture(scope="module")
+def trained(tmp_path_factory):
+    """{(variant, model_type): (bundle, csv path)} trained into a temp dir."""
+    out = {}
+    for variant, (script, filename) in VARIANTS.items():
+        out_dir = str(tmp_path_factory.mktemp(variant))
+        csv_path = os.path.join(DATASETS_DIR, filename)
+        script.train_and_save_model(csv_path, out_dir=out_dir, max_workers=1)
+        for model_type in script.MODEL_TYPES:
+            out[variant, model_type] = (read_bundle(os.path.join(out_dir, model_type, "bundle.pkl")), csv_path)
+    return out
+
+
+@pytest.mark.parametrize("variant, model_type", [
+    (variant, model_type) for variant, (script, _) in VARIANTS.items() for model_type in script.MODEL_TYPES
+])
+def test_batch_slices_match_training_slices(trained, variant, model_type):
+    bundle, csv_path = trained[variant, model_type]
+    training = bundle["training_metrics"]["fairness_slices"]
+
+    whole = predict_bulk(pd.read_csv(csv_path), bundle)["batch_fairness_slices"]
+    with open(csv_path, "rb") as f:
+        chunked = predict_bulk_chunked(f, bundle, chunk_size=300)["batch_fairness_slices"]
+
+    # The whole file covers every group the holdout split had.
+    assert set(whole) == set(training)
+    for feature, groups in training.items():
+        assert set(groups) <= set(whole[feature]), feature
+
+    assert set(chunked) == set(whole)
+    for feature, groups in whole.items():
+        assert set(chunked[feature]) == set(groups), feature
+        for label, stats in groups.items():
+            assert chunked[feature][label]["count"] == stats["count"]
+            assert chunked[feature][label]["approval_rate"] == pytest.approx(stats["approval_rate"])
+
+
+@pytest.mark.parametrize("variant, model_type", [
+    (variant, model_type) for variant, (script, _) in VARIANTS.items() for model_type in script.MODEL_TYPES
+])
+def test_holdout_rows_reproduce_training_slices(trained, variant, model_type):
+    bundle, csv_path = trained[variant, model_type]
+    training = bundle["training_metrics"]["fairness_slices"]
+
+    # The trainers hold out 20% with random_state=42 before any resampling.
+    df = pd.read_csv(csv_path)
+    _, holdout = train_test_split(np.arange(len(df)), test_size=0.2, random_state=42)
+    batch = predict_bulk(df.iloc[holdout], bundle)["batch_fairness_slices"]
+
+    for feature, groups in training.items():
+        assert set(batch[feature]) == set(groups), feature
+        for label, stats in groups.items():
+            assert batch[feature][label]["count"] == stats["count"], (feature, label)
+            # Serving approves at probability >= 0.5, sklearn's predict() sends
+            # ties to the negative class: only linear models are tie-free here.
+            if model_type == "logistic_regression":
+                assert batch[feature][label]["approval_rate"] == pytest.approx(stats["selection_rate"]), \
+                    (feature, label)
@@ -0,0 +1,71 @@
+import io
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from predict.predict_data import (
+    MODEL_TYPES, load_model_bundle, predict_bulk, predict_bulk_chunked, read_upload,
+)
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "train", "datasets")
+CSV = {False: "loan_approval_dataset.csv", True: "german_credit_data.csv"}
+
+
+@pytest.mark.parametrize("bias_flag", [False, True])
+@pytest.mark.parametrize("model_type", MODEL_TYPES)
+@pytest.mark.parametrize("chunk_size", [7, 1000, 1_000_000])
+def test_stream_matches_whole_file(model_type, bias_flag, chunk_size):
+    bundle = load_model_bundle(model_type, bias_flag=bias_flag)
+    path = os.path.join(DATASETS_DIR, CSV[bias_flag])
+
+    with open(path, "rb") as f:
+        whole = predict_bulk(read_upload(f, bundle), bundle)
+    with open(path, "rb") as f:
+        streamed = predict_bulk_chunked(f, bundle, chunk_size=chunk_size)
+
+    assert streamed["row_count"] == whole["row_count"]
+    assert streamed["approval_rate"] == whole["approval_rate"]
+    assert streamed["average_probability"] == pytest.approx(whole["average_probability"], rel=1e-12)
+
+    assert set(streamed["batch_fairness_slices"]) == set(whole["batch_fairness_slices"])
+    for feature, groups in whole["batch_fairness_slices"].items():
+        assert set(streamed["batch_fairness_slices"][feature]) == set(groups)
+        for label, stats in groups.items():
+            got = streamed["batch_fairness_slices"][feature][label]
+            assert got["count"] == stats["count"]
+            assert got["approval_rate"] == pytest.approx(stats["approval_rate"], rel=1e-12)
+            assert got["mean_probability"] == pytest.approx(stats["mean_probability"], rel=1e-12)
+
+
+@pytest.mark.parametrize("cell", [b"unknown", b" 42 ", b"n/a", b""])
+def test_dirty_numeric_cell_is_coerced_in_every_mode(cell):
+    from app import app
+    client = app.test_client()
+    with open(os.path.join(DATASETS_DIR, CSV[False]), "rb") as f:
+        header, first, second, rest = f.read().split(b"\n", 3)
+    # cibil_score of the second row; the value does not parse as a number
+    fields = second.split(b",")
+    fields[7] = cell
+    data = b"\n".join([header, first, b",".join(fields), rest])
+
+    def post(**form):
+        response = client.post("/predict-bulk", data={"file": (io.BytesIO(data), "upload.csv"),
+                                                      "chunk_size": "1000", **form})
+        assert response.status_code == 200, response.get_data()
+        return response
+
+    whole = post().get_json()
+    streamed = post(stream="true").get_json()
+    assert streamed["row_count"] == whole["row_count"] == 4269
+    assert streamed["average_probability"] == pytest.approx(whole["average_probability"], rel=1e-12)
+
+    scored = pd.read_csv(io.BytesIO(post(output="csv").get_data()))
+    lines = post(output="ndjson").get_data(as_text=True).splitlines()
+    assert len(scored) == len(lines) == 4269
+    # NDJSON keeps 10 decimal places
+    assert json.loads(lines[1])["probability"] == pytest.approx(scored["probability"][1], abs=1e-10)
+    assert scored["probability"].mean() == pytest.approx(whole["average_probability"], rel=1e-12)
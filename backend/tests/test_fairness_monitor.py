@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from predict import predict_data
+from predict.predict_data import load_model_bundle, predict_batch, predict_single
+from telemetry.fairness_monitor import FairnessMonitor
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+NOW = 1_000_000.0
+
+GENDER = [1.0, 0.0, np.nan, 1.0, 0.0, 0.0, 1.0, np.nan]
+JOB = ["a", "b", None, "c", "d", "e", "a", "b"]
+PROBS = [0.9, 0.2, 0.5, 0.49, 0.51, 0.7, 0.1, 0.8]
+
+
+def monitor(max_groups=16):
+    return FairnessMonitor(window_seconds=60, max_windows=4, max_groups=max_groups)
+
+
+def groups(snapshot, feature):
+    """{label: [count, approvals, probability sum]} of the current window, rounded."""
+    return {label: [round(v, 9) for v in windows[str(int(NOW // 60))]]
+            for label, windows in snapshot["models"]["m"]["features"][feature].items()}
+
+
+def test_single_rows_add_up_to_the_batch_counters():
+    batch, single = monitor(), monitor()
+    batch.observe("m", {"gender": GENDER, "job": JOB}, PROBS, now=NOW)
+    for g, j, p in zip(GENDER, JOB, PROBS):
+        single.observe_one("m", {"gender": g, "job": j}, p, now=NOW)
+
+    for feature in ("gender", "job"):
+        assert groups(single.snapshot(NOW), feature) == groups(batch.snapshot(NOW), feature)
+
+
+def test_single_row_counters_by_hand():
+    m = monitor(max_groups=4)
+    for g, j, p in zip(GENDER, JOB, PROBS):
+        m.observe_one("m", {"gender": g, "job": j}, p, now=NOW)
+
+    # [count, approvals, probability sum]
+    assert groups(m.snapshot(NOW), "gender") == {
+        "1": [3, 1, 1.49],
+        "0": [3, 2, 1.41],
+        "missing": [2, 2, 1.3],
+    }
+    # Three groups fit, in the order they were seen; c, d and e share the last slot.
+    assert groups(m.snapshot(NOW), "job") == {
+        "a": [2, 1, 1.0],
+        "b": [2, 1, 1.0],
+        "missing": [1, 1, 0.5],
+        "other": [3, 2, 1.7],
+    }
+
+
+def test_predict_single_feeds_the_monitor_like_predict_batch(monkeypatch):
+    bundle = load_model_bundle("logistic_regression", bias_flag=True)
+    adapter = bundle["input_adapter"]
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 4, size=(200, len(adapter.input_features))).astype(float)
+    applicants = [dict(zip(adapter.input_features, row)) for row in X.tolist()]
+    # upper-case keys still find their feature
+    applicants[0] = {k.upper(): v for k, v in applicants[0].items()}
+
+    reports = []
+    for score in (lambda: [predict_single(a, bundle) for a in applicants],
+                  lambda: predict_batch(applicants, bundle)):
+        fresh = monitor()
+        monkeypatch.setattr(predict_data, "fairness_monitor", fresh)
+        monkeypatch.setattr(predict_data, "FAIRNESS_MONITOR_ENABLED", True)
+        score()
+        reports.append(fresh.report())
+    single, batch = reports
+    assert single["models"].keys() == batch["models"].keys()
+    for key, features in batch["models"].items():
+        for feature, stats in features.items():
+            assert single["models"][key][feature]["row_count"] == stats["row_count"] == 200
+            for label, group in stats["groups"].items():
+                got = single["models"][key][feature]["groups"][label]
+                assert got["count"] == group["count"] and got["approvals"] == group["approvals"]
+                assert got["mean_probability"] == pytest.approx(group["mean_probability"], rel=1e-12)
@@ -0,0 +1,67 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from predict.artifact import sample_inputs
+from predict.fast_scorer import bundle_clip, compile_scorer
+from predict.input_adapter import build_input_adapter
+from predict.predict_data import MODEL_DIR
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+TOLERANCE = 1e-12
+
+
+def load(variant, clipped):
+    bundle = joblib.load(os.path.join(MODEL_DIR, variant, "logistic_regression", "bundle.pkl"))
+    metrics = dict(bundle["training_metrics"])
+    if clipped:
+        # fences around the scaler mean for bundles trained without them
+        if not metrics.get("clip_bounds"):
+            mean, scale = bundle["scaler"].mean_, bundle["scaler"].scale_
+            metrics["clip_bounds"] = {f: [float(m - s), float(m + s)]
+                                      for f, m, s in zip(bundle["feature_order"], mean, scale)}
+    else:
+        metrics["clip_bounds"] = None
+    bundle["training_metrics"] = metrics
+    return bundle
+
+
+def expected(bundle, X):
+    clip = bundle_clip(bundle)
+    X = np.clip(X, *clip) if clip is not None else X
+    frame = pd.DataFrame(X, columns=bundle["feature_order"])
+    return bundle["model"].predict_proba(bundle["scaler"].transform(frame))[:, 1]
+
+
+@pytest.mark.parametrize("variant", ["fair", "biased"])
+@pytest.mark.parametrize("clipped", [False, True])
+def test_scorer_matches_sklearn(variant, clipped):
+    bundle = load(variant, clipped)
+    scorer = compile_scorer(bundle)
+    X = sample_inputs(bundle, n=2000)
+    want = expected(bundle, X)
+
+    assert np.abs(scorer.predict_proba(X) - want).max() <= TOLERANCE
+
+
+@pytest.mark.parametrize("variant", ["fair", "biased"])
+@pytest.mark.parametrize("clipped", [False, True])
+def test_score_dict_derives_features_like_the_adapter(variant, clipped):
+    bundle = load(variant, clipped)
+    scorer = compile_scorer(bundle)
+    adapter = build_input_adapter(bundle)
+    X = sample_inputs(bundle, n=500)
+    # Raw inputs at the edges of the recipes: log1p of <= -1 and a zero denominator.
+    X[:3, adapter.input_index] = -1.0
+    X[3:6, adapter.input_index] = 0.0
+    want = expected(bundle, adapter.derive(X.copy()))
+
+    # Payloads carry the raw inputs only.
+    single = [scorer.score_dict(dict(zip(adapter.input_features, row)))
+              for row in X[:, adapter.input_index].tolist()]
+    assert np.abs(np.array(single) - want).max() <= TOLERANCE
+    assert scorer.input_features == adapter.input_features
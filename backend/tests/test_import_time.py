@@ -0,0 +1,14 @@
+import pytest
+
+from bench.bench_import_time import LAZY_MODULES, measure
+
+
+@pytest.mark.parametrize("module", ["app", "predict.predict_data"])
+def test_analysis_packages_stay_lazy(module):
+    assert {"shap", "sklearn", "matplotlib", "fairlearn"} <= set(LAZY_MODULES)
+    result = measure(module)
+    assert result["loaded"] == []
+
+
+def test_probe_sees_eager_imports():
+    assert "sklearn" in measure("train.common")["loaded"]
@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench.bench_prepare_input import legacy_args, legacy_prepare_input
+from predict.input_adapter import build_input_adapter
+from predict.predict_data import load_model_bundle
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "train", "datasets")
+CSV = {False: "loan_approval_dataset.csv", True: "german_credit_data.csv"}
+
+
+def dirty(df, adapter):
+    """The upload with the cells prepare_input had to cope with mixed in."""
+    df = df.head(200).copy()
+    names = {str(c).lower().strip(): c for c in df.columns}
+    raw = {feature: names[k] for k, feature in {**{f: f for f in names}, **adapter.column_mappings}.items()
+           if k in names}
+    for i, feature in enumerate(adapter.input_features):
+        col = raw[feature]
+        df[col] = df[col].astype(object)
+        if feature in adapter.value_mappings:
+            known = next(iter(adapter.value_mappings[feature]))
+            df.loc[i, col] = "  " + known.upper() + " "
+            df.loc[i + 1, col] = "never seen in training"
+            df.loc[i + 2, col] = np.nan
+        else:
+            df.loc[i, col] = "n/a"
+            df.loc[i + 1, col] = np.nan
+            df.loc[i + 2, col] = " 42 "
+    # Header case and padding differ from what the trainer saw.
+    return df.rename(columns=lambda c: f" {str(c).upper()} ")
+
+
+@pytest.mark.parametrize("bias_flag", [False, True])
+def test_adapter_matches_legacy_prepare_input(bias_flag):
+    adapter = build_input_adapter(load_model_bundle("logistic_regression", bias_flag=bias_flag))
+    df = dirty(pd.read_csv(os.path.join(DATASETS_DIR, CSV[bias_flag])), adapter)
+
+    want = legacy_prepare_input(df, *legacy_args(adapter)).to_numpy(dtype=np.float64)
+    got = adapter.transform(df)
+    assert np.array_equal(got[:, adapter.input_index], want)
+
+
+def test_renamed_headers_resolve_through_column_mapping():
+    adapter = build_input_adapter(load_model_bundle("logistic_regression", bias_flag=True))
+    df = pd.read_csv(os.path.join(DATASETS_DIR, CSV[True])).head(5)
+    assert "Sex" in df.columns and "Credit amount" in df.columns
+
+    X = adapter.transform(df)
+    j = adapter.feature_order.index("credit_amount")
+    assert X[:, j].tolist() == df["Credit amount"].astype(float).tolist()
+
+    with pytest.raises(KeyError, match="credit_amount"):
+        adapter.transform(df.drop(columns=["Credit amount"]))
@@ -0,0 +1,75 @@
+import os
+import time
+
+import pytest
+
+from jobs.job_queue import JobQueue, QueueFullError
+
+
+def wait_for_file(path, progress=None):
+    """Job body that runs until the test creates path."""
+    while not os.path.exists(path):
+        time.sleep(0.01)
+    return "finished"
+
+
+def wait_until(condition, timeout=60):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise TimeoutError
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def release(tmp_path):
+    return str(tmp_path / "release")
+
+
+@pytest.fixture
+def queue(release):
+    q = JobQueue(max_workers=1, max_queue_depth=2)
+    yield q
+    # Let any job still waiting finish, so a failed test cannot hang the pool.
+    open(release, "w").close()
+    q.shutdown()
+
+
+def test_queue_depth_is_capped(queue, release):
+    first = queue.submit(wait_for_file, release)
+    queue.submit(wait_for_file, release)
+    with pytest.raises(QueueFullError):
+        queue.submit(wait_for_file, release)
+
+    open(release, "w").close()
+    wait_until(lambda: queue.get(first)["status"] == "done")
+    assert queue.get(first)["result"] == "finished"
+    queue.submit(wait_for_file, release)
+
+
+def test_cancelled_running_job_counts_until_its_worker_finishes(queue, release):
+    running = queue.submit(wait_for_file, release)
+    wait_until(lambda: queue.get(running)["status"] == "running")
+    queued = queue.submit(wait_for_file, release)
+
+    assert queue.cancel(running) == "cancelled"
+    assert queue.stats()["in_flight"] == 2
+    with pytest.raises(QueueFullError):
+        queue.submit(wait_for_file, release)
+
+    open(release, "w").close()
+    wait_until(lambda: queue.stats()["in_flight"] == 0)
+    # The discarded result does not resurrect the job.
+    assert queue.get(running)["status"] == "cancelled"
+    assert queue.get(running)["result"] is None
+    assert queue.get(queued)["status"] == "done"
+    queue.submit(wait_for_file, release)
+
+
+def test_cancel_unknown_and_finished_jobs(queue, release):
+    open(release, "w").close()
+    job_id = queue.submit(wait_for_file, release)
+    wait_until(lambda: queue.get(job_id)["status"] == "done")
+
+    assert queue.cancel(job_id) == "done"
+    assert queue.cancel("no-such-job") is None
@@ -0,0 +1,72 @@
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pytest
+
+from predict.model_registry import ModelRegistry
+from predict.predict_data import MODEL_DIR, read_bundle
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    for model_type in ("logistic_regression", "decision_tree"):
+        target = tmp_path / "fair" / model_type
+        target.mkdir(parents=True)
+        shutil.copy(os.path.join(MODEL_DIR, "fair", model_type, "bundle.pkl"), target / "bundle.pkl")
+    return str(tmp_path)
+
+
+def score(bundle):
+    X = np.ones((1, len(bundle["feature_order"])))
+    return float(bundle["model"].predict_proba(bundle["scaler"].transform(X))[0, 1])
+
+
+def test_changed_bundle_is_reloaded(model_dir):
+    registry = ModelRegistry(model_dir, loader=read_bundle)
+    path = registry.bundle_path("logistic_regression")
+    before = registry.get("logistic_regression")
+    assert registry.get("logistic_regression") is before
+    assert registry.stats()["misses"] == 1 and registry.stats()["hits"] == 1
+
+    # Touched but unchanged: same bundle, no reload.
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert registry.get("logistic_regression") is before
+    assert registry.stats()["reloads"] == 0
+
+    bundle = joblib.load(path)
+    bundle["model"].intercept_ = bundle["model"].intercept_ + 1.0
+    joblib.dump(bundle, path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+
+    after = registry.get("logistic_regression")
+    assert after is not before
+    assert registry.stats()["reloads"] == 1
+    assert score(after) > score(before)
+
+
+def test_failed_reload_keeps_serving_previous_bundle(model_dir):
+    registry = ModelRegistry(model_dir, loader=read_bundle)
+    path = registry.bundle_path("logistic_regression")
+    before = registry.get("logistic_regression")
+
+    with open(path, "wb") as f:
+        f.write(b"half-written")
+    assert registry.get("logistic_regression") is before
+    assert registry.stats()["load_errors"] == 1
+
+
+def test_least_recently_used_bundle_is_evicted(model_dir):
+    registry = ModelRegistry(model_dir, max_entries=1, loader=read_bundle)
+    registry.get("logistic_regression")
+    registry.get("decision_tree")
+    stats = registry.stats()
+    assert stats["evictions"] == 1 and stats["size"] == 1
+    assert [e["model_type"] for e in stats["entries"]] == ["decision_tree"]
+
+    registry.get("logistic_regression")
+    assert registry.stats()["misses"] == 3
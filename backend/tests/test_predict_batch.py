@@ -0,0 +1,67 @@
+import os
+
+import pandas as pd
+import pytest
+
+from app import app
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "train", "datasets")
+
+FEATURES = ["no_of_dependents", "education", "self_employed", "income_annum", "loan_amount", "loan_term",
+            "cibil_score", "residential_assets_value", "commercial_assets_value", "luxury_assets_value",
+            "bank_asset_value"]
+
+
+@pytest.fixture(scope="module")
+def client():
+    return app.test_client()
+
+
+@pytest.fixture(scope="module")
+def applicants():
+    df = pd.read_csv(os.path.join(DATASETS_DIR, "loan_approval_dataset.csv"), nrows=50)
+    df.columns = [c.strip() for c in df.columns]
+    df["education"] = (df["education"].str.strip() == "Graduate").astype(int)
+    df["self_employed"] = (df["self_employed"].str.strip() == "Yes").astype(int)
+    return df[FEATURES].to_dict(orient="records")
+
+
+@pytest.mark.parametrize("model_type", ["logistic_regression", "decision_tree"])
+def test_list_and_columnar_input_agree(client, applicants, model_type):
+    columnar = {f: [a[f] for a in applicants] for f in FEATURES}
+    query = f"?model_type={model_type}"
+
+    as_list = client.post("/predict-batch" + query, json=applicants)
+    as_columns = client.post("/predict-batch" + query, json=columnar)
+    wrapped = client.post("/predict-batch", json={"applicants": columnar, "model_type": model_type})
+
+    assert as_list.status_code == as_columns.status_code == wrapped.status_code == 200
+    assert as_list.get_json()["results"] == as_columns.get_json()["results"] == wrapped.get_json()["results"]
+    assert as_list.get_json()["scored_count"] == len(applicants)
+
+
+def test_invalid_row_gets_its_own_error(client, applicants):
+    batch = [dict(a) for a in applicants[:5]]
+    batch[1]["cibil_score"] = "not a number"
+    del batch[3]["loan_term"]
+
+    response = client.post("/predict-batch", json=batch)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["scored_count"] == 3 and body["error_count"] == 2
+
+    results = body["results"]
+    assert [r["index"] for r in results] == list(range(5))
+    assert "cibil_score" in results[1]["error"]
+    assert "loan_term" in results[3]["error"]
+
+    # The valid rows score as they do on their own.
+    alone = client.post("/predict-batch", json=[batch[0], batch[2], batch[4]]).get_json()["results"]
+    assert [results[i]["probability"] for i in (0, 2, 4)] == [r["probability"] for r in alone]
+
+
+def test_ragged_columnar_input_is_rejected(client):
+    response = client.post("/predict-batch", json={"cibil_score": [700, 710], "loan_term": [12]})
+    assert response.status_code == 400
@@ -0,0 +1,58 @@
+import io
+import os
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import pytest
+
+from app import app
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "train", "datasets",
+                        "loan_approval_dataset.csv")
+
+
+@pytest.fixture(scope="module")
+def client():
+    return app.test_client()
+
+
+def upload(fmt, rows):
+    data = open(CSV_PATH, "rb").read()
+    if rows == 0:
+        data = data.splitlines(keepends=True)[0]
+    if fmt == "csv":
+        return io.BytesIO(data), "upload.csv"
+    table = pacsv.read_csv(io.BytesIO(data))
+    buf = io.BytesIO()
+    if fmt == "parquet":
+        pq.write_table(table, buf)
+        name = "upload.parquet"
+    else:
+        with pa.ipc.new_file(buf, table.schema) as writer:
+            writer.write_table(table)
+        name = "upload.arrow"
+    buf.seek(0)
+    return buf, name
+
+
+@pytest.mark.parametrize("output", ["csv", "ndjson"])
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "arrow"])
+@pytest.mark.parametrize("rows", [0, None])
+def test_unknown_id_column_is_a_bad_request(client, output, fmt, rows):
+    response = client.post("/predict-bulk", data={"file": upload(fmt, rows), "output": output,
+                                                  "id_column": "applicant"})
+    assert response.status_code == 400
+    assert "applicant" in response.get_json()["error"]
+
+
+@pytest.mark.parametrize("output", ["csv", "ndjson"])
+def test_id_column_is_matched_like_other_headers(client, output):
+    response = client.post("/predict-bulk", data={"file": upload("csv", None), "output": output,
+                                                  "id_column": " LOAN_ID ", "chunk_size": "1000"})
+    assert response.status_code == 200
+    body = response.get_data(as_text=True).splitlines()
+    assert len(body) == 4269 + (output == "csv")
+    assert "loan_id" in body[0]
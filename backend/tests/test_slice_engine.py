@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fairness.slice_engine import TN, TP, FN, FP, bin_codes, compute_slices, level_bins, quantile_bins
+
+# Eight rows, two slices. Rows 6-7 have no gender and row 5 no band: they
+# count toward no group of that slice instead of forming a 'nan' group.
+Y_TRUE = [1, 0, 1, 1, 0, 0, 1, 0]
+Y_PRED = [1, 1, 0, 1, 0, 1, 1, 1]
+SLICES = {
+    "gender": pd.Series(["m", "m", "m", "f", "f", "f", None, np.nan], dtype=object),
+    "band": np.array([0, 0, 1, 1, 1, np.nan, 0, 1]),
+}
+
+
+@pytest.fixture(scope="module")
+def slices():
+    return compute_slices(SLICES, Y_TRUE, Y_PRED)
+
+
+def cells(counts):
+    return [{"TP": int(row[TP]), "TN": int(row[TN]), "FP": int(row[FP]), "FN": int(row[FN])} for row in counts]
+
+
+def test_confusion_counts_by_hand(slices):
+    assert slices["gender"]["groups"] == ["m", "f"]
+    assert cells(slices["gender"]["counts"]) == [
+        {"TP": 1, "TN": 0, "FP": 1, "FN": 1},
+        {"TP": 1, "TN": 1, "FP": 1, "FN": 0},
+    ]
+    assert slices["band"]["groups"] == [0.0, 1.0]
+    assert cells(slices["band"]["counts"]) == [
+        {"TP": 2, "TN": 0, "FP": 1, "FN": 0},
+        {"TP": 1, "TN": 1, "FP": 1, "FN": 1},
+    ]
+    assert slices["gender"]["metrics"]["count"] == [3, 3]
+    assert slices["band"]["metrics"]["count"] == [3, 4]
+
+
+def test_group_metrics_by_hand(slices):
+    m = slices["gender"]["metrics"]
+    assert m["accuracy"] == pytest.approx([1 / 3, 2 / 3])
+    assert m["selection_rate"] == pytest.approx([2 / 3, 2 / 3])
+    assert m["TPR"] == [0.5, 1.0]
+    assert m["FPR"] == [1.0, 0.5]
+    assert m["Precision"] == [0.5, 0.5]
+    assert m["Negative_Predictive_Value"] == [0.0, 1.0]
+
+    # Undefined rates (no negatives predicted in band 0) are None, not NaN.
+    b = slices["band"]["metrics"]
+    assert b["Negative_Predictive_Value"] == [None, 0.5]
+    assert b["False_Omission_Rate"] == [None, 0.5]
+
+
+def test_slice_summary_by_hand(slices):
+    assert slices["gender"]["summary"] == pytest.approx({
+        "selection_rate_gap": 0.0,
+        "demographic_parity_difference": 0.0,
+        "statistical_parity_ratio": 1.0,
+        "equal_opportunity_difference": 0.5,
+        "average_odds_difference": 0.5,
+    })
+    assert slices["band"]["summary"] == pytest.approx({
+        "selection_rate_gap": 0.5,
+        "demographic_parity_difference": 0.5,
+        "statistical_parity_ratio": 0.5,
+        "equal_opportunity_difference": 0.5,
+        "average_odds_difference": 0.5,
+    })
+
+
+def test_frozen_bins_drop_missing_and_unseen_values():
+    bins = quantile_bins([1, 2, 3, 4, 5, 6, 7, 8])
+    assert bins["edges"] == [1.0, 2.75, 4.5, 6.25, 8.0]
+    codes = bin_codes([0.0, 1.0, 3.0, 8.0, 100.0, np.nan], bins)
+    assert codes.tolist() == [0, 0, 1, 3, 3, -1]
+
+    levels = level_bins(pd.Series(["b", "a", None, "b"]))
+    assert levels["labels"] == ["a", "b"]
+    assert bin_codes(np.array(["a", "c", "b"], dtype=object), levels).tolist() == [0, -1, 1]
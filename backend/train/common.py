@@ -0,0 +1,204 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier, export_text
+
+from fairness.slice_engine import group_metrics
+from predict.artifact import export_artifact
+
+
+# ============================================================
+# SHARED BY train_fair.py AND train_biased.py
+# ============================================================
+
+# Model types trained by default; each is written to <out_dir>/<model_type>/
+MODEL_TYPES = ("logistic_regression", "decision_tree")
+
+
+def fit_model(model_type, X_train, y_train, X_test, max_iter=1000):
+    """Fits one model type; returns (model, scaler or None, y_pred on X_test)."""
+    if model_type == "logistic_regression":
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+
+        model = LogisticRegression(max_iter=max_iter)
+        model.fit(X_train_scaled, y_train)
+        return model, scaler, model.predict(X_test_scaled)
+
+    if model_type == "decision_tree":
+        model = DecisionTreeClassifier(max_depth=5, random_state=42)
+        model.fit(X_train, y_train)
+        return model, None, model.predict(X_test)
+
+    raise ValueError(f"Unknown model type: {model_type}")
+
+
+def run_model_types(train_fn, model_types, args, max_workers=None):
+    """train_fn(model_type, *args) for every model type, in a process pool when it pays off."""
+    if max_workers is None:
+        max_workers = min(len(model_types), os.cpu_count() or 1)
+    if max_workers <= 1 or len(model_types) <= 1:
+        return {model_type: train_fn(model_type, *args) for model_type in model_types}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {model_type: pool.submit(train_fn, model_type, *args) for model_type in model_types}
+        return {model_type: future.result() for model_type, future in futures.items()}
+
+
+# ============================================================
+# EXPLANATIONS
+# ============================================================
+
+def build_logistic_equation(model, columns):
+    eq = "logit(p) = "
+    for coef, name in zip(model.coef_[0], columns):
+        eq += f"({coef:.4f} * {name}) + "
+    eq += f"(intercept={model.intercept_[0]:.4f})"
+    return eq
+
+
+def explain_model(model_type, model, columns):
+    """(logistic_equation, logistic_coefficients, decision_tree_rules); the unused ones are None."""
+    if model_type != "logistic_regression":
+        return None, None, export_text(model, feature_names=list(columns))
+
+    logistic_equation = build_logistic_equation(model, columns)
+    logistic_coefficients = [
+        {
+            "Feature": name,
+            "Coefficient": float(coef),
+            "Influence": int(np.sign(coef)),
+        }
+        for name, coef in zip(columns, model.coef_[0])
+    ]
+    return logistic_equation, logistic_coefficients, None
+
+
+# ============================================================
+# FAIRNESS SUMMARIES
+# ============================================================
+
+def parity_summary(selection_rates):
+    """(selection_rate_gap, statistical_parity_ratio, bias_flag) over the primary axis groups."""
+    sr = pd.Series(selection_rates)
+    selection_rate_gap = float(sr.max() - sr.min()) if len(sr) > 1 else 0.0
+    statistical_parity_ratio = (
+        float(sr.min() / sr.max()) if len(sr) > 1 and sr.max() != 0 else None
+    )
+    bias_flag = bool(selection_rate_gap > 0.15)
+    return selection_rate_gap, statistical_parity_ratio, bias_flag
+
+
+def slice_report(bins, counts):
+    """fairness_slices entries (non-empty groups, in bin order) from per-slice confusion counts."""
+    slices = {}
+    for feature, b in bins.items():
+        metrics = group_metrics(counts[feature])
+        slices[feature] = {
+            label: {
+                "count": metrics["count"][i],
+                "accuracy": metrics["accuracy"][i],
+                "selection_rate": metrics["selection_rate"][i],
+            }
+            for i, label in enumerate(b["labels"])
+            if metrics["count"][i]
+        }
+    return slices
+
+
+# ============================================================
+# SAVING
+# ============================================================
+
+def save_model(out_dir, model_type_used, model, scaler, columns, preprocessing, evaluation):
+    """
+    Writes <out_dir>/<model_type_used>/bundle.pkl (+ artifact) and
+    metadata.json from a fitted model, the preprocessing it expects (the
+    trainer's column_mapping / value_mapping / clip_bounds / derived_features,
+    stored after "columns" in that order) and its holdout evaluation
+    (overall_accuracy, selection_rates, accuracies, fairness_slices with
+    their slice_bins, sensitive_features, primary_fairness_axis). Returns
+    the metadata.
+    """
+    logistic_equation, logistic_coefficients, decision_tree_rules = explain_model(model_type_used, model, columns)
+    selection_rate_gap, statistical_parity_ratio, bias_flag = parity_summary(evaluation["selection_rates"])
+    demographic_parity_difference = selection_rate_gap
+
+    # --------------------------------------------------------
+    # SAVE MODEL BUNDLE
+    # --------------------------------------------------------
+
+    model_dir = os.path.join(out_dir, model_type_used)
+    os.makedirs(model_dir, exist_ok=True)
+
+    training_metrics = {
+        "columns": columns,
+        **preprocessing,
+        "overall_accuracy": evaluation["overall_accuracy"],
+        "selection_rates": evaluation["selection_rates"],
+        "accuracies": evaluation["accuracies"],
+        "selection_rate_gap": selection_rate_gap,
+        "demographic_parity_difference": demographic_parity_difference,
+        "statistical_parity_ratio": statistical_parity_ratio,
+        "bias_flag": bias_flag,
+        "fairness_slices": evaluation["fairness_slices"],
+        "slice_bins": evaluation["slice_bins"],
+        "sensitive_features": evaluation["sensitive_features"],
+        "primary_fairness_axis": evaluation["primary_fairness_axis"],
+        "logistic_equation": logistic_equation,
+        "logistic_coefficients": logistic_coefficients,
+        "decision_tree_rules": decision_tree_rules,
+    }
+
+    bundle = {
+        "model": model,
+        "scaler": scaler,
+        "feature_order": columns,
+        "training_metrics": training_metrics
+    }
+
+    # Write to a temp file and rename so a running predict server never
+    # picks up a half-written bundle when it hot-reloads.
+    bundle_path = os.path.join(model_dir, "bundle.pkl")
+    joblib.dump(bundle, bundle_path + ".tmp")
+    os.replace(bundle_path + ".tmp", bundle_path)
+
+    # Pickle-free copy (model.json + params.bin) for MODEL_ARTIFACT_FORMAT=artifact.
+    export_artifact(bundle, model_dir)
+
+    # --------------------------------------------------------
+    # METADATA FOR DEBUGGING + UI
+    # --------------------------------------------------------
+
+    metadata = {
+        "model_type": model_type_used,
+        "overall_accuracy": evaluation["overall_accuracy"],
+        "selection_rates": evaluation["selection_rates"],
+        "accuracies": evaluation["accuracies"],
+        "selection_rate_gap": selection_rate_gap,
+        "demographic_parity_difference": demographic_parity_difference,
+        "statistical_parity_ratio": statistical_parity_ratio,
+        "bias_flag": bias_flag,
+        "fairness_slices": evaluation["fairness_slices"],
+        "slice_bins": evaluation["slice_bins"],
+        "sensitive_features": evaluation["sensitive_features"],
+        "primary_fairness_axis": evaluation["primary_fairness_axis"],
+        "columns": columns,
+        **preprocessing,
+        "logistic_equation": logistic_equation,
+        "logistic_coefficients": logistic_coefficients,
+        "decision_tree_rules": decision_tree_rules,
+        "feature_order": columns,
+    }
+
+    with open(os.path.join(model_dir, "metadata.json"), "w") as f:
+        json.dump(metadata, f, indent=4)
+
+    return metadata
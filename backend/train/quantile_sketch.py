@@ -0,0 +1,139 @@
+import math
+
+import numpy as np
+
+
+# ============================================================
+# MERGEABLE STREAMING QUANTILE SKETCH
+# ============================================================
+#
+# A deterministic compactor hierarchy (Manku-Rajagopalan-Lindsay; KLL uses the
+# same structure with random offsets). Level h holds values that each stand
+# for 2^h input values. When a level grows past k items it is sorted and
+# every other item, starting at an offset that alternates between
+# compactions, moves up to level h+1; an odd item out stays behind.
+#
+# Error bound. One compaction at level h changes the number of represented
+# values <= x by at most 2^h, for every x. rank_error sums that over all
+# compactions, so for any q the value returned by quantile(q) has a true rank
+# within rank_error (+1 for the rank rounding) of q * count. A level-h
+# compaction needs more than k items of weight 2^h, so there are at most
+# count / (k * 2^h) of them and
+#
+#     rank_error <= count * ceil(log2(count / k)) / k
+#
+# e.g. k = 4096 and 100M rows: at most 0.37% of the rows, typically far less
+# because the alternating offsets cancel out. While count <= k nothing is
+# compacted and quantile() is exact (numpy's linear interpolation, as
+# pandas.Series.quantile). Memory is O(k log(count / k)) values.
+
+DEFAULT_K = 4096
+
+
+class QuantileSketch:
+    def __init__(self, k=DEFAULT_K):
+        if k < 2:
+            raise ValueError("k must be at least 2.")
+        self.k = k
+        self.count = 0
+        self.rank_error = 0
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self._offsets = [0]
+
+    def update(self, values):
+        """Adds values (NaN ignored, like pandas quantile). Returns self."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.count += len(values)
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """Folds another sketch (same k) into this one; errors add up. Returns self."""
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge sketches with k={self.k} and k={other.k}.")
+        while len(self.levels) < len(other.levels):
+            self._add_level()
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.count += other.count
+        self.rank_error += other.rank_error
+        self._compress()
+        return self
+
+    def _add_level(self):
+        self.levels.append(np.empty(0, dtype=np.float64))
+        self._offsets.append(0)
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) > self.k:
+                level = np.sort(level)
+                odd = len(level) % 2
+                pairs = level[: len(level) - odd]
+                if h + 1 == len(self.levels):
+                    self._add_level()
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], pairs[self._offsets[h]::2]])
+                self.levels[h] = level[len(level) - odd:]
+                self._offsets[h] ^= 1
+                self.rank_error += 1 << h
+            h += 1
+
+    @property
+    def epsilon(self):
+        """rank_error as a fraction of count (0.0 while exact)."""
+        return self.rank_error / self.count if self.count else 0.0
+
+    @staticmethod
+    def error_bound(count, k=DEFAULT_K):
+        """Worst-case rank_error for count values, see the module notes."""
+        if count <= k:
+            return 0
+        return int(count * math.ceil(math.log2(count / k)) / k)
+
+    def quantile(self, q):
+        """Estimated q-quantile(s), q scalar or array in [0, 1]."""
+        if self.count == 0:
+            raise ValueError("Empty sketch.")
+        if self.rank_error == 0:
+            return np.quantile(np.concatenate(self.levels), q)
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 1 << h, dtype=np.int64)
+                                  for h, level in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        values, cumulative = values[order], np.cumsum(weights[order])
+        # first value whose weighted rank reaches q * (count - 1) + 1
+        target = np.asarray(q, dtype=np.float64) * (self.count - 1) + 1
+        idx = np.searchsorted(cumulative, target, side="left").clip(0, len(values) - 1)
+        return values[idx]
+
+
+class ColumnSketches:
+    """One QuantileSketch per column, updated from DataFrame chunks."""
+
+    def __init__(self, columns, k=DEFAULT_K):
+        self.columns = list(columns)
+        self.sketches = {column: QuantileSketch(k) for column in self.columns}
+
+    def update(self, df):
+        for column in self.columns:
+            self.sketches[column].update(df[column].to_numpy(dtype=np.float64, na_value=np.nan))
+        return self
+
+    def merge(self, other):
+        for column in self.columns:
+            self.sketches[column].merge(other.sketches[column])
+        return self
+
+    def quantiles(self, q):
+        """{column: quantile(s)}."""
+        return {column: self.sketches[column].quantile(q) for column in self.columns}
+
+    @property
+    def max_rank_error(self):
+        return max((s.rank_error for s in self.sketches.values()), default=0)
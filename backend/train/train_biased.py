@@ -1,17 +1,21 @@
 import pandas as pd
 import numpy as np
-import joblib
 import json
 import os
+import sys
+import argparse
 
 from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
-from sklearn.tree import DecisionTreeClassifier, export_text
-from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score
 from fairlearn.metrics import MetricFrame, selection_rate
 from imblearn.over_sampling import SMOTE
 
+# backend/ on the path so shared modules import when run from train/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fairness.slice_engine import bin_codes, slice_bins, slice_confusion_counts
+from ingest.tabular import column_spec, detect_format, read_table
+from train.common import MODEL_TYPES, fit_model, run_model_types, save_model, slice_report
+
 
 # ============================================================
 # COLUMN DISCOVERY (flexible mapping)
@@ -26,6 +30,23 @@ COLUMN_MAP = {
     "risk": ["risk", "label", "target", "outcome"],
 }
 
+# Only these columns are parsed, with these types; job stays text so its
+# category labels are the same whatever the file format
+COLUMN_DTYPES = {
+    "age": "float64",
+    "job": "string",
+    "credit_amount": "float64",
+    "duration": "float64",
+    "gender_raw": "string",
+    "risk": "string",
+}
+
+
+def read_dataset(path):
+    """The COLUMN_MAP columns of a CSV / Parquet / Arrow training file."""
+    return read_table(path, detect_format(path), *column_spec(COLUMN_MAP, COLUMN_DTYPES))
+
+
 def find_column(df: pd.DataFrame, options):
     df_cols = [c.lower().strip() for c in df.columns]
     for name in options:
@@ -85,8 +106,11 @@ def preprocess_training_data(df: pd.DataFrame):
         col_risk: "risk"
     }
 
+    # job codes are assigned in order of appearance, so prediction has to
+    # map raw job values through the same table
     value_mapping = {
-        "gender": {"male": 1, "female": 0}
+        "gender": {"male": 1, "female": 0},
+        "job": job_mapping,
     }
 
     return X, y, column_mapping, value_mapping
@@ -110,110 +134,38 @@ def detect_sensitive_features(df: pd.DataFrame):
     return candidates
 
 
+FAIRNESS_FEATURES = ["age", "job", "gender", "credit_amount", "duration"]
+
+
 def compute_fairness_slices(X_test, y_true, y_pred):
     """
     Computes fairness slices for selected numeric and categorical features.
-    For numeric columns, it automatically bins them into quartiles.
-    For categorical columns, it uses their unique values directly.
+    Numeric columns are binned into quartiles, categorical columns grouped by
+    their unique values. Returns the slices and those bins, which the bundle
+    keeps so bulk predictions can be sliced the same way.
     """
+    bins = slice_bins(X_test, FAIRNESS_FEATURES)
+    codes = {feature: (bin_codes(X_test[feature], b), len(b["labels"])) for feature, b in bins.items()}
+    return slice_report(bins, slice_confusion_counts(codes, y_true, y_pred)), bins
 
-    import numpy as np
-    import pandas as pd
-    from sklearn.metrics import accuracy_score
-
-    fairness_features = ["age", "job", "gender", "credit_amount", "duration"]
-
-    slices = {}
-
-    for feature in fairness_features:
-        col = X_test[feature]
-
-        # Numeric columns → bin into quartiles so fairness makes sense
-        if pd.api.types.is_numeric_dtype(col):
-            bins = pd.qcut(col, q=4, duplicates="drop")
-            unique_groups = bins.unique()
-
-            slices[feature] = {}
-
-            for g in unique_groups:
-                idx = bins == g
-                slices[feature][str(g)] = {
-                    "count": int(idx.sum()),
-                    "accuracy": float(accuracy_score(y_true[idx], y_pred[idx])) if idx.sum() > 0 else None,
-                    "selection_rate": float(np.mean(y_pred[idx])) if idx.sum() > 0 else None,
-                }
-
-        # Categorical columns → group by unique values
-        else:
-            slices[feature] = {}
-            for g in col.unique():
-                idx = col == g
-                slices[feature][str(g)] = {
-                    "count": int(idx.sum()),
-                    "accuracy": float(accuracy_score(y_true[idx], y_pred[idx])) if idx.sum() > 0 else None,
-                    "selection_rate": float(np.mean(y_pred[idx])) if idx.sum() > 0 else None,
-                }
-
-    return slices
 
 # ============================================================
-# LOGISTIC FORMATTING
+# MODEL FITTING
 # ============================================================
 
-def build_logistic_equation(model, columns):
-    eq = "logit(p) = "
-    for coef, name in zip(model.coef_[0], columns):
-        eq += f"({coef:.4f} * {name}) + "
-    eq += f"(intercept={model.intercept_[0]:.4f})"
-    return eq
-
-
-# ============================================================
-# MAIN TRAINING FUNCTION
-# ============================================================
-
-def train_and_save_model(csv_path: str, out_dir="./models/biased"):
-    os.makedirs(out_dir, exist_ok=True)
-
-    df = pd.read_csv(csv_path)
-    X, y, column_mapping, value_mapping = preprocess_training_data(df)
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
-
-    sm = SMOTE(random_state=42)
-    X_resampled, y_resampled = sm.fit_resample(X_train, y_train)
-
-    scaler = None
-    logistic_equation = None
-    logistic_coefficients = None
-    decision_tree_rules = None
-
+def train_model_type(model_type, X_train, X_test, y_train, y_test, column_mapping, value_mapping, out_dir):
+    """
+    Fits one model type on the shared (SMOTE-resampled) training split,
+    evaluates it on the untouched test split and writes
+    <out_dir>/<model_type>/bundle.pkl (+ artifact) and metadata.json.
+    Runs in a worker process when several model types train at once.
+    """
     # --------------------------------------------------------
     # MODEL TRAINING
     # --------------------------------------------------------
+    model, scaler, y_pred = fit_model(model_type, X_train, y_train, X_test, max_iter=500)
 
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_resampled)
-    X_test_scaled = scaler.transform(X_test)
-
-    model = LogisticRegression(max_iter=500)
-    model.fit(X_train_scaled, y_resampled)
-    y_pred = model.predict(X_test_scaled)
-
-    logistic_equation = build_logistic_equation(model, X.columns)
-    logistic_coefficients = [
-        {
-            "Feature": name,
-            "Coefficient": float(coef),
-            "Influence": int(np.sign(coef)),
-        }
-        for name, coef in zip(X.columns, model.coef_[0])
-    ]
-
-    model_type_used = "logistic_regression"
-
+    model_type_used = model_type
     # --------------------------------------------------------
     # ACCURACY
     # --------------------------------------------------------
@@ -244,82 +196,52 @@ def train_and_save_model(csv_path: str, out_dir="./models/biased"):
     selection_rates = by_group.get("selection_rate", pd.Series()).to_dict()
     accuracies = by_group.get("accuracy", pd.Series()).to_dict()
 
-    sr = pd.Series(selection_rates)
-    selection_rate_gap = float(sr.max() - sr.min()) if len(sr) > 1 else 0.0
-    demographic_parity_difference = selection_rate_gap
-    statistical_parity_ratio = (
-        float(sr.min() / sr.max()) if len(sr) > 1 and sr.max() != 0 else None
-    )
-    bias_flag = bool(selection_rate_gap > 0.15)
-
-    fairness_slices = compute_fairness_slices(
+    fairness_slices, fairness_bins = compute_fairness_slices(
         X_test, y_test, y_pred
     )
 
-    # --------------------------------------------------------
-    # SAVE MODEL BUNDLE
-    # --------------------------------------------------------
-
-    model_dir = os.path.join(out_dir, model_type_used)
-    os.makedirs(model_dir, exist_ok=True)
-
-    training_metrics = {
-        "columns": list(X.columns),
-        "column_mapping": column_mapping,
-        "value_mapping": value_mapping,
+    return save_model(out_dir, model_type_used, model, scaler, list(X_train.columns),
+                      {"column_mapping": column_mapping, "value_mapping": value_mapping}, {
         "overall_accuracy": overall_accuracy,
         "selection_rates": selection_rates,
         "accuracies": accuracies,
-        "selection_rate_gap": selection_rate_gap,
-        "demographic_parity_difference": demographic_parity_difference,
-        "statistical_parity_ratio": statistical_parity_ratio,
-        "bias_flag": bias_flag,
         "fairness_slices": fairness_slices,
+        "slice_bins": fairness_bins,
         "sensitive_features": sensitive_features,
         "primary_fairness_axis": primary_sensitive,
-        "logistic_equation": logistic_equation,
-        "logistic_coefficients": logistic_coefficients,
-        "decision_tree_rules": decision_tree_rules,
-    }
+    })
 
-    bundle = {
-        "model": model,
-        "scaler": scaler,
-        "feature_order": list(X.columns),
-        "training_metrics": training_metrics
-    }
 
-    joblib.dump(bundle, os.path.join(model_dir, "bundle.pkl"))
+# ============================================================
+# MAIN TRAINING FUNCTION
+# ============================================================
 
-    # --------------------------------------------------------
-    # METADATA FOR DEBUGGING + UI
-    # --------------------------------------------------------
+def train_and_save_model(csv_path: str, out_dir="./models/biased", model_types=MODEL_TYPES, max_workers=None):
+    """
+    Loads and preprocesses the dataset once, then trains every model type in
+    model_types. With more than one model type and worker, they are fitted
+    concurrently in a process pool (max_workers defaults to one per model type,
+    capped at the CPU count). Returns {model_type: metadata}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
 
-    metadata = {
-        "model_type": model_type_used,
-        "overall_accuracy": overall_accuracy,
-        "selection_rates": selection_rates,
-        "accuracies": accuracies,
-        "selection_rate_gap": selection_rate_gap,
-        "demographic_parity_difference": demographic_parity_difference,
-        "statistical_parity_ratio": statistical_parity_ratio,
-        "bias_flag": bias_flag,
-        "fairness_slices": fairness_slices,
-        "sensitive_features": sensitive_features,
-        "primary_fairness_axis": primary_sensitive,
-        "columns": list(X.columns),
-        "column_mapping": column_mapping,
-        "value_mapping": value_mapping,
-        "logistic_equation": logistic_equation,
-        "logistic_coefficients": logistic_coefficients,
-        "decision_tree_rules": decision_tree_rules,
-        "feature_order": list(X.columns),
-    }
+    df = read_dataset(csv_path)
+    X, y, column_mapping, value_mapping = preprocess_training_data(df)
 
-    json.dump(metadata, open(os.path.join(model_dir, "metadata.json"), "w"), indent=4)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42
+    )
 
-    print(f"\n=== {model_type_used} training complete ===")
-    print(json.dumps(metadata, indent=4))
+    sm = SMOTE(random_state=42)
+    X_resampled, y_resampled = sm.fit_resample(X_train, y_train)
+
+    args = (X_resampled, X_test, y_resampled, y_test, column_mapping, value_mapping, out_dir)
+    results = run_model_types(train_model_type, model_types, args, max_workers)
+
+    for model_type_used, metadata in results.items():
+        print(f"\n=== {model_type_used} training complete ===")
+        print(json.dumps(metadata, indent=4))
+    return results
 
 
 # ============================================================
@@ -327,6 +249,8 @@ def train_and_save_model(csv_path: str, out_dir="./models/biased"):
 # ============================================================
 
 if __name__ == "__main__":
-    train_and_save_model("./datasets/german_credit_data.csv")
-
-
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", nargs="+", default=list(MODEL_TYPES), choices=MODEL_TYPES)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    train_and_save_model("./datasets/german_credit_data.csv", model_types=args.models, max_workers=args.workers)
@@ -1,16 +1,23 @@
 import pandas as pd
 import numpy as np
-import joblib
 import json
 import os
+import sys
+import argparse
 
 from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
-from sklearn.tree import DecisionTreeClassifier, export_text
+from sklearn.linear_model import SGDClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score
 from fairlearn.metrics import MetricFrame, selection_rate
 
+# backend/ on the path so shared modules import when run from train/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fairness.slice_engine import bin_codes, group_metrics, level_codes, slice_bins, slice_confusion_counts
+from ingest.tabular import column_spec, detect_format, iter_frames, read_table
+from train.common import MODEL_TYPES, fit_model, run_model_types, save_model, slice_report
+from train.quantile_sketch import DEFAULT_K, ColumnSketches
+
 
 
 # ============================================================
@@ -33,6 +40,28 @@ COLUMN_MAP = {
 }
 
 
+# Only these columns are parsed, with these types (others keep the inferred type)
+COLUMN_DTYPES = {
+    "dependents": "float64",
+    "education": "string",
+    "self_employed": "string",
+    "income": "float64",
+    "loan_amount": "float64",
+    "loan_term": "float64",
+    "cibil_score": "float64",
+    "residential_assets": "float64",
+    "commercial_assets": "float64",
+    "luxury_assets": "float64",
+    "bank_asset_value": "float64",
+    "risk": "string",
+}
+
+
+def read_dataset(path):
+    """The COLUMN_MAP columns of a CSV / Parquet / Arrow training file."""
+    return read_table(path, detect_format(path), *column_spec(COLUMN_MAP, COLUMN_DTYPES))
+
+
 def find_column(df: pd.DataFrame, options):
     df_cols = [c.lower().strip() for c in df.columns]
     for name in options:
@@ -56,7 +85,13 @@ def encode_categorical(series: pd.Series):
 # PREPROCESSING
 # ============================================================
 
-def preprocess_training_data(df: pd.DataFrame):
+def preprocess_training_data(df: pd.DataFrame, mappings=None, ratio_median=None):
+    """
+    Builds the feature frame and labels. mappings / ratio_median fix the
+    category codes and the fill value for the loan-to-income ratio, so chunks
+    of one file encode the same way (incremental training); by default both
+    are derived from df.
+    """
     # Extract columns using flexible matching
     col_dep = find_column(df, COLUMN_MAP["dependents"])
     col_edu = find_column(df, COLUMN_MAP["education"])
@@ -76,8 +111,13 @@ def preprocess_training_data(df: pd.DataFrame):
 
     X = pd.DataFrame()
     X["no_of_dependents"] = df[col_dep].astype(float)
-    X["education"], edu_map = encode_categorical(df[col_edu].astype(str))
-    X["self_employed"], self_map = encode_categorical(df[col_self].astype(str))
+    if mappings is None:
+        X["education"], edu_map = encode_categorical(df[col_edu].astype(str))
+        X["self_employed"], self_map = encode_categorical(df[col_self].astype(str))
+    else:
+        edu_map, self_map = mappings["education"], mappings["self_employed"]
+        X["education"] = df[col_edu].astype(str).map(edu_map).fillna(-1).astype(int)
+        X["self_employed"] = df[col_self].astype(str).map(self_map).fillna(-1).astype(int)
     X["income_annum"] = df[col_income].astype(float)
     X["loan_amount"] = df[col_amount].astype(float)
     X["loan_term"] = df[col_term].astype(float)
@@ -91,10 +131,10 @@ def preprocess_training_data(df: pd.DataFrame):
     X["income_annum_log"] = np.log1p(X["income_annum"])
     X["loan_amount_log"] = np.log1p(X["loan_amount"])
 
-    X["loan_to_income_ratio"] = X["loan_amount"] / X["income_annum"]
-
-    X["loan_to_income_ratio"].replace([np.inf, -np.inf], np.nan, inplace=True)
-    X["loan_to_income_ratio"].fillna(X["loan_to_income_ratio"].median(), inplace=True)
+    X["loan_to_income_ratio"] = loan_to_income_ratio(X["loan_amount"], X["income_annum"])
+    if ratio_median is None:
+        ratio_median = X["loan_to_income_ratio"].median()
+    X["loan_to_income_ratio"] = X["loan_to_income_ratio"].fillna(ratio_median)
 
     y_raw = df[col_risk].astype(str).str.strip().str.lower()
     y = y_raw.apply(lambda v: 1 if v in positive_labels else 0)
@@ -108,6 +148,32 @@ def preprocess_training_data(df: pd.DataFrame):
     return X, y, mappings
 
 
+def loan_to_income_ratio(loan_amount, income):
+    """loan_amount / income, NaN where it is not finite (filled with the median)."""
+    return (loan_amount / income).replace([np.inf, -np.inf], np.nan)
+
+
+def ratio_fill_value(df: pd.DataFrame):
+    """Median loan-to-income ratio of df, the fill value preprocess_training_data uses."""
+    income = df[find_column(df, COLUMN_MAP["income"])].astype(float)
+    amount = df[find_column(df, COLUMN_MAP["loan_amount"])].astype(float)
+    return float(loan_to_income_ratio(amount, income).median())
+
+
+def derived_features(ratio_median):
+    """
+    Recipe for the engineered columns of preprocess_training_data, saved in
+    the bundle so the predict input adapter rebuilds them from the raw
+    (clipped) inputs instead of expecting them in uploads.
+    """
+    return {
+        "income_annum_log": {"op": "log1p", "inputs": ["income_annum"]},
+        "loan_amount_log": {"op": "log1p", "inputs": ["loan_amount"]},
+        "loan_to_income_ratio": {"op": "ratio", "inputs": ["loan_amount", "income_annum"],
+                                 "fill": float(ratio_median)},
+    }
+
+
 # ============================================================
 # FAIRNESS (dynamic, multi-attribute)
 # ============================================================
@@ -126,143 +192,97 @@ def detect_sensitive_features(df: pd.DataFrame):
     return candidates
 
 
+FAIRNESS_FEATURES = [
+    "no_of_dependents",
+    "education",
+    "self_employed",
+    "income_annum",
+    "loan_amount",
+    "loan_term",
+    "cibil_score",
+]
+
+
 def compute_fairness_slices(X_test, y_true, y_pred):
     """
     Computes fairness slices for selected numeric and categorical features.
-    For numeric columns, it automatically bins them into quartiles.
-    For categorical columns, it uses their unique values directly.
+    Numeric columns are binned into quartiles, categorical columns grouped by
+    their unique values. Returns the slices and those bins, which the bundle
+    keeps so bulk predictions can be sliced the same way.
     """
-    fairness_features = [
-        "no_of_dependents",
-        "education",
-        "self_employed",
-        "income_annum",
-        "loan_amount",
-        "loan_term",
-        "cibil_score",
-    ]
-
-    slices = {}
-
-    for feature in fairness_features:
-        col = X_test[feature]
-
-        # Numeric columns → bin into quartiles so fairness makes sense
-        if pd.api.types.is_numeric_dtype(col):
-            bins = pd.qcut(col, q=4, duplicates="drop")
-            unique_groups = bins.unique()
-
-            slices[feature] = {}
-
-            for g in unique_groups:
-                idx = bins == g
-                slices[feature][str(g)] = {
-                    "count": int(idx.sum()),
-                    "accuracy": float(accuracy_score(y_true[idx], y_pred[idx])) if idx.sum() > 0 else None,
-                    "selection_rate": float(np.mean(y_pred[idx])) if idx.sum() > 0 else None,
-                }
-
-        # Categorical columns → group by unique values
-        else:
-            slices[feature] = {}
-            for g in col.unique():
-                idx = col == g
-                slices[feature][str(g)] = {
-                    "count": int(idx.sum()),
-                    "accuracy": float(accuracy_score(y_true[idx], y_pred[idx])) if idx.sum() > 0 else None,
-                    "selection_rate": float(np.mean(y_pred[idx])) if idx.sum() > 0 else None,
-                }
-
-    return slices
+    bins = slice_bins(X_test, FAIRNESS_FEATURES)
+    codes = {feature: (bin_codes(X_test[feature], b), len(b["labels"])) for feature, b in bins.items()}
+    return slice_report(bins, slice_confusion_counts(codes, y_true, y_pred)), bins
 
 # ============================================================
-# LOGISTIC FORMATTING
+# REMOVE OUTLIERS
 # ============================================================
 
-def build_logistic_equation(model, columns):
-    eq = "logit(p) = "
-    for coef, name in zip(model.coef_[0], columns):
-        eq += f"({coef:.4f} * {name}) + "
-    eq += f"(intercept={model.intercept_[0]:.4f})"
-    return eq
+# Every numeric column is clipped to its IQR fences [Q1 - 1.5 IQR, Q3 + 1.5 IQR].
+# The fences are stored in the bundle (training_metrics["clip_bounds"]) and the
+# prediction path clips inputs to the same values.
 
+def iqr_fences(q1, q3):
+    iqr = q3 - q1
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
 
-# ============================================================
-# REMOVE OUTLIERS
-# ============================================================
 
-def remove_outliers_iqr(df, column):
-    Q1 = df[column].quantile(0.25)
-    Q3 = df[column].quantile(0.75)
-    IQR = Q3 - Q1
-    lower = Q1 - 1.5 * IQR
-    upper = Q3 + 1.5 * IQR
-    
-    
-    df[column] = df[column].clip(lower, upper)
-    return df
-
-# ============================================================
-# MAIN TRAINING FUNCTION
-# ============================================================
+def outlier_clip_bounds(df, columns):
+    """{column: [lower, upper]} from exact quartiles of all columns in one quantile call."""
+    quartiles = df[columns].quantile([0.25, 0.75])
+    return {
+        col: [float(v) for v in iqr_fences(quartiles.at[0.25, col], quartiles.at[0.75, col])]
+        for col in columns
+    }
 
-def train_and_save_model(csv_path: str, out_dir="./models/fair"):
-    os.makedirs(out_dir, exist_ok=True)
 
-    df = pd.read_csv(csv_path)
+def sketch_clip_bounds(sketches):
+    """clip bounds from ColumnSketches filled chunk by chunk (error: see quantile_sketch)."""
+    return {
+        col: [float(v) for v in iqr_fences(*quartiles)]
+        for col, quartiles in sketches.quantiles([0.25, 0.75]).items()
+    }
 
-    df.columns = [c.lower().strip() for c in df.columns]
-    
-    num_cols = [
-        'no_of_dependents',
-        'income_annum',
-        'loan_amount',
-        'loan_term',
-        'cibil_score',
-        'residential_assets_value',
-        'commercial_assets_value',
-        'luxury_assets_value',
-        'bank_asset_value',
-    ]
-
-    for col in num_cols:
-        df = remove_outliers_iqr(df, col)
-
-    X, y, value_mapping = preprocess_training_data(df)
 
-    print(X.columns)
+def clip_outliers(df, clip_bounds):
+    columns = list(clip_bounds)
+    lower = pd.Series({col: bounds[0] for col, bounds in clip_bounds.items()})
+    upper = pd.Series({col: bounds[1] for col, bounds in clip_bounds.items()})
+    df[columns] = df[columns].clip(lower=lower, upper=upper, axis=1)
+    return df
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
+# ============================================================
+# MODEL FITTING
+# ============================================================
 
-    scaler = None
-    logistic_equation = None
-    logistic_coefficients = None
-    decision_tree_rules = None
+# Raw numeric columns clipped to their IQR fences before preprocessing
+NUM_COLS = [
+    'no_of_dependents',
+    'income_annum',
+    'loan_amount',
+    'loan_term',
+    'cibil_score',
+    'residential_assets_value',
+    'commercial_assets_value',
+    'luxury_assets_value',
+    'bank_asset_value',
+]
+
+
+def train_model_type(model_type, X_train, X_test, y_train, y_test, value_mapping, out_dir, clip_bounds=None,
+                     derived=None):
+    """
+    Fits one model type on the shared split, evaluates it and writes
+    <out_dir>/<model_type>/bundle.pkl (+ artifact) and metadata.json.
+    Runs in a worker process when several model types train at once.
+    """
 
     # --------------------------------------------------------
     # MODEL TRAINING
     # --------------------------------------------------------
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
-
-    model = LogisticRegression(max_iter=1000)
-    model.fit(X_train_scaled, y_train)
-    y_pred = model.predict(X_test_scaled)
-
-    logistic_equation = build_logistic_equation(model, X.columns)
-    logistic_coefficients = [
-        {
-            "Feature": name,
-            "Coefficient": float(coef),
-            "Influence": int(np.sign(coef)),
-        }
-        for name, coef in zip(X.columns, model.coef_[0])
-    ]
+    model, scaler, y_pred = fit_model(model_type, X_train, y_train, X_test)
 
-    model_type_used = "logistic_regression"
+    model_type_used = model_type
     # --------------------------------------------------------
     # ACCURACY
     # --------------------------------------------------------
@@ -293,80 +313,230 @@ def train_and_save_model(csv_path: str, out_dir="./models/fair"):
     selection_rates = by_group.get("selection_rate", pd.Series()).to_dict()
     accuracies = by_group.get("accuracy", pd.Series()).to_dict()
 
-    sr = pd.Series(selection_rates)
-    selection_rate_gap = float(sr.max() - sr.min()) if len(sr) > 1 else 0.0
-    demographic_parity_difference = selection_rate_gap
-    statistical_parity_ratio = (
-        float(sr.min() / sr.max()) if len(sr) > 1 and sr.max() != 0 else None
-    )
-    bias_flag = bool(selection_rate_gap > 0.15)
-
-    fairness_slices = compute_fairness_slices(
+    fairness_slices, fairness_bins = compute_fairness_slices(
         X_test, y_test, y_pred
     )
 
-    # --------------------------------------------------------
-    # SAVE MODEL BUNDLE
-    # --------------------------------------------------------
-
-    model_dir = os.path.join(out_dir, model_type_used)
-    os.makedirs(model_dir, exist_ok=True)
-
-    training_metrics = {
-        "columns": list(X.columns),
-        "value_mapping": value_mapping,
+    return save_model(out_dir, model_type_used, model, scaler, list(X_train.columns),
+                      {"value_mapping": value_mapping, "clip_bounds": clip_bounds, "derived_features": derived}, {
         "overall_accuracy": overall_accuracy,
         "selection_rates": selection_rates,
         "accuracies": accuracies,
-        "selection_rate_gap": selection_rate_gap,
-        "demographic_parity_difference": demographic_parity_difference,
-        "statistical_parity_ratio": statistical_parity_ratio,
-        "bias_flag": bias_flag,
         "fairness_slices": fairness_slices,
+        "slice_bins": fairness_bins,
         "sensitive_features": sensitive_features,
         "primary_fairness_axis": primary_sensitive,
-        "logistic_equation": logistic_equation,
-        "logistic_coefficients": logistic_coefficients,
-        "decision_tree_rules": decision_tree_rules,
-    }
+    })
 
-    bundle = {
-        "model": model,
-        "scaler": scaler,
-        "feature_order": list(X.columns),
-        "training_metrics": training_metrics
-    }
 
-    joblib.dump(bundle, os.path.join(model_dir, "bundle.pkl"))
+# ============================================================
+# MAIN TRAINING FUNCTION
+# ============================================================
+
+def train_and_save_model(csv_path: str, out_dir="./models/fair", model_types=MODEL_TYPES, max_workers=None):
+    """
+    Loads and preprocesses the dataset once, then trains every model type in
+    model_types. With more than one model type and worker, they are fitted
+    concurrently in a process pool (max_workers defaults to one per model type,
+    capped at the CPU count). Returns {model_type: metadata}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
 
-    # --------------------------------------------------------
-    # METADATA FOR DEBUGGING + UI
-    # --------------------------------------------------------
+    df = read_dataset(csv_path)
+
+    df.columns = [c.lower().strip() for c in df.columns]
+
+    clip_bounds = outlier_clip_bounds(df, NUM_COLS)
+    df = clip_outliers(df, clip_bounds)
+
+    ratio_median = ratio_fill_value(df)
+    X, y, value_mapping = preprocess_training_data(df, ratio_median=ratio_median)
+
+    print(X.columns)
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42
+    )
+
+    args = (X_train, X_test, y_train, y_test, value_mapping, out_dir, clip_bounds, derived_features(ratio_median))
+    results = run_model_types(train_model_type, model_types, args, max_workers)
+
+    for model_type_used, metadata in results.items():
+        print(f"\n=== {model_type_used} training complete ===")
+        print(json.dumps(metadata, indent=4))
+    return results
+
+
+# ============================================================
+# INCREMENTAL (OUT-OF-CORE) TRAINING
+# ============================================================
+#
+# For files larger than memory. The CSV is streamed in chunks several times:
+#   1. profile: category levels (first-appearance order, as encode_categorical
+#      assigns them on the whole file), a quantile sketch per numeric column
+#      for the IQR clip fences, and a bounded uniform row sample from which
+#      the loan-to-income fill value and the fairness slice quartiles are
+#      estimated;
+#   2. scaler: StandardScaler.partial_fit on the training rows;
+#   3. classifier: SGDClassifier(loss="log_loss").partial_fit, `epochs` passes;
+#   4. holdout: confusion counts overall, per primary-axis group and per
+#      slice bin, summed chunk by chunk.
+# Rows go to the holdout by a per-chunk seeded draw, so every pass splits the
+# file the same way. Memory is bounded by chunk_size + sample_size rows.
+# The output is a logistic_regression bundle of the usual shape.
+
+INCREMENTAL_CHUNK_SIZE = 100_000
+PROFILE_SAMPLE_SIZE = 200_000
+INCREMENTAL_EPOCHS = 5
+HOLDOUT_FRACTION = 0.2
+
+
+def read_chunks(csv_path, chunk_size):
+    columns, dtypes = column_spec(COLUMN_MAP, COLUMN_DTYPES)
+    for chunk in iter_frames(csv_path, detect_format(csv_path), columns, dtypes, chunk_size):
+        chunk.columns = [c.lower().strip() for c in chunk.columns]
+        yield chunk
+
+
+def profile_csv(csv_path, chunk_size, sample_size=PROFILE_SAMPLE_SIZE, seed=42, sketch_k=DEFAULT_K):
+    """
+    First pass: (value_mapping, ColumnSketches over NUM_COLS, uniform sample
+    of at most sample_size rows). The sample keeps the rows with the smallest
+    random keys seen so far, so it is merged chunk by chunk without holding
+    the file.
+    """
+    rng = np.random.default_rng(seed)
+    levels = {"education": {}, "self_employed": {}}
+    sketches = ColumnSketches(NUM_COLS, sketch_k)
+    sample = None
+    for chunk in read_chunks(csv_path, chunk_size):
+        sketches.update(chunk)
+        for name, mapping in levels.items():
+            col = find_column(chunk, COLUMN_MAP[name])
+            for value in pd.unique(chunk[col].astype(str)):
+                mapping.setdefault(value, len(mapping))
+
+        chunk = chunk.assign(_sample_key=rng.random(len(chunk)))
+        if sample is not None:
+            chunk = pd.concat([sample, chunk], ignore_index=True)
+        sample = chunk.nsmallest(sample_size, "_sample_key")
 
-    metadata = {
-        "model_type": model_type_used,
+    if sample is None:
+        raise ValueError(f"No rows in {csv_path}")
+    return levels, sketches, sample.drop(columns="_sample_key").reset_index(drop=True)
+
+
+def prepare_chunk(chunk, clip_bounds, value_mapping, ratio_median):
+    chunk = clip_outliers(chunk, clip_bounds)
+    X, y, _ = preprocess_training_data(chunk, mappings=value_mapping, ratio_median=ratio_median)
+    return X, y.to_numpy()
+
+
+def holdout_mask(n, chunk_index, seed=42):
+    rng = np.random.default_rng(np.random.SeedSequence([seed, chunk_index]))
+    return rng.random(n) < HOLDOUT_FRACTION
+
+
+def train_incremental(csv_path: str, out_dir="./models/fair", chunk_size=INCREMENTAL_CHUNK_SIZE,
+                      epochs=INCREMENTAL_EPOCHS, sample_size=PROFILE_SAMPLE_SIZE, seed=42):
+    """
+    Out-of-core logistic regression (SGD, log loss) on a CSV streamed in
+    chunks of chunk_size rows. Writes <out_dir>/logistic_regression/ with the
+    same bundle and metadata as train_and_save_model. Returns the metadata.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    # 1. profile
+    value_mapping, sketches, sample = profile_csv(csv_path, chunk_size, sample_size, seed)
+    clip_bounds = sketch_clip_bounds(sketches)
+    sample = clip_outliers(sample, clip_bounds)
+    ratio_median = ratio_fill_value(sample)
+    X_sample, _, _ = preprocess_training_data(sample, mappings=value_mapping, ratio_median=ratio_median)
+    columns = list(X_sample.columns)
+
+    sensitive_features = detect_sensitive_features(X_sample)
+    if not sensitive_features:
+        sensitive_features = ["gender"]
+    primary_sensitive = sensitive_features[0]
+    primary_levels = np.sort(X_sample[primary_sensitive].unique())
+    fairness_bins = slice_bins(X_sample, FAIRNESS_FEATURES)
+    del sample, X_sample
+
+    def chunks():
+        for i, chunk in enumerate(read_chunks(csv_path, chunk_size)):
+            X, y = prepare_chunk(chunk, clip_bounds, value_mapping, ratio_median)
+            yield i, X, y, holdout_mask(len(X), i, seed)
+
+    # 2. scaler
+    scaler = StandardScaler()
+    for _, X, _, test in chunks():
+        if (~test).any():
+            scaler.partial_fit(X[~test])
+
+    # 3. classifier
+    model = SGDClassifier(loss="log_loss", random_state=seed)
+    rng = np.random.default_rng(seed)
+    for _ in range(epochs):
+        for _, X, y, test in chunks():
+            if not (~test).any():
+                continue
+            order = rng.permutation(int((~test).sum()))
+            model.partial_fit(scaler.transform(X[~test])[order], y[~test][order], classes=[0, 1])
+
+    # 4. holdout
+    overall_counts = np.zeros((1, 4), dtype=np.int64)
+    primary_counts = np.zeros((len(primary_levels), 4), dtype=np.int64)
+    slice_counts = {feature: np.zeros((len(b["labels"]), 4), dtype=np.int64)
+                    for feature, b in fairness_bins.items()}
+    for _, X, y, test in chunks():
+        if not test.any():
+            continue
+        X_test, y_test = X[test], y[test]
+        y_pred = model.predict(scaler.transform(X_test))
+
+        codes = {
+            "_overall": (np.zeros(len(y_test), dtype=np.int64), 1),
+            "_primary": (level_codes(X_test[primary_sensitive], primary_levels), len(primary_levels)),
+        }
+        for feature, b in fairness_bins.items():
+            codes[feature] = (bin_codes(X_test[feature], b), len(b["labels"]))
+        counts = slice_confusion_counts(codes, y_test, y_pred)
+
+        overall_counts += counts.pop("_overall")
+        primary_counts += counts.pop("_primary")
+        for feature, c in counts.items():
+            slice_counts[feature] += c
+
+    if not overall_counts.any():
+        raise ValueError("Holdout split is empty; the file needs more rows.")
+
+    by_group = group_metrics(primary_counts)
+    selection_rates, accuracies = {}, {}
+    for level, count, rate, acc in zip(primary_levels.tolist(), by_group["count"],
+                                       by_group["selection_rate"], by_group["accuracy"]):
+        if count:
+            selection_rates[level] = rate
+            accuracies[level] = acc
+
+    fairness_slices = slice_report(fairness_bins, slice_counts)
+
+    overall_accuracy = group_metrics(overall_counts)["accuracy"][0]
+
+    metadata = save_model(out_dir, "logistic_regression", model, scaler, columns,
+                          {"value_mapping": value_mapping, "clip_bounds": clip_bounds,
+                           "derived_features": derived_features(ratio_median)}, {
         "overall_accuracy": overall_accuracy,
         "selection_rates": selection_rates,
         "accuracies": accuracies,
-        "selection_rate_gap": selection_rate_gap,
-        "demographic_parity_difference": demographic_parity_difference,
-        "statistical_parity_ratio": statistical_parity_ratio,
-        "bias_flag": bias_flag,
         "fairness_slices": fairness_slices,
+        "slice_bins": fairness_bins,
         "sensitive_features": sensitive_features,
         "primary_fairness_axis": primary_sensitive,
-        "columns": list(X.columns),
-        "value_mapping": value_mapping,
-        "logistic_equation": logistic_equation,
-        "logistic_coefficients": logistic_coefficients,
-        "decision_tree_rules": decision_tree_rules,
-        "feature_order": list(X.columns),
-    }
-
-    json.dump(metadata, open(os.path.join(model_dir, "metadata.json"), "w"), indent=4)
+    })
 
-    print(f"\n=== {model_type_used} training complete ===")
+    print("\n=== logistic_regression (incremental) training complete ===")
     print(json.dumps(metadata, indent=4))
+    return metadata
 
 
 # ============================================================
@@ -374,4 +544,16 @@ def train_and_save_model(csv_path: str, out_dir="./models/fair"):
 # ============================================================
 
 if __name__ == "__main__":
-    train_and_save_model("./datasets/loan_approval_dataset.csv")
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default="./datasets/loan_approval_dataset.csv")
+    parser.add_argument("--models", nargs="+", default=list(MODEL_TYPES), choices=MODEL_TYPES)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--incremental", action="store_true",
+                        help="stream the CSV in chunks and fit an SGD logistic regression")
+    parser.add_argument("--chunk-size", type=int, default=INCREMENTAL_CHUNK_SIZE)
+    parser.add_argument("--epochs", type=int, default=INCREMENTAL_EPOCHS)
+    args = parser.parse_args()
+    if args.incremental:
+        train_incremental(args.csv, chunk_size=args.chunk_size, epochs=args.epochs)
+    else:
+        train_and_save_model(args.csv, model_types=args.models, max_workers=args.workers)